@@ -8,6 +8,33 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./focusflow.db"
+    DB_ECHO: bool = False  # Log every SQL statement
+    
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 3600  # seconds
+    DB_POOL_PREWARM: int = 5  # connections opened at startup
+    
+    # SQLite pragmas, applied on every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_FOREIGN_KEYS: bool = True
+    
+    # Statistics result cache
+    STATS_CACHE_SIZE: int = 256  # entries
+    
+    # Plan archive (archive_plans.py)
+    PLAN_ARCHIVE_AFTER_DAYS: int = 90  # days since completion
+    PLAN_ARCHIVE_BATCH_SIZE: int = 200  # plan trees per transaction
+    
+    # Statement import (POST /accounting/import, import_statements.py)
+    IMPORT_BATCH_SIZE: int = 500  # rows per executemany INSERT
     
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
@@ -1,16 +1,56 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import get_settings
 
 settings = get_settings()
 
+
+def _engine_options(url: str) -> dict:
+    """Pool options for the configured database"""
+    database = make_url(url).database
+    if not database or database == ":memory:":
+        # In-memory SQLite keeps the dialect's single shared connection
+        return {}
+    
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": {"timeout": settings.SQLITE_BUSY_TIMEOUT / 1000}
+    }
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
+    echo=settings.DB_ECHO,
+    future=True,
+    **_engine_options(settings.DATABASE_URL)
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite engine profile to every new connection"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE:d}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE:d}")
+    cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT:d}")
+    cursor.execute(f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    cursor.close()
+
+
 # Create async session
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -34,6 +74,22 @@ async def get_db() -> AsyncSession:
 
 
 async def init_db():
-    """Initialize database tables"""
+    """Initialize database tables, and bring a database from an older version up to date"""
+    from app.schema import upgrade, convert_money, without_foreign_keys
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    
+    if engine.dialect.name == "sqlite":
+        # Money columns must hold cents before anything is read or backfilled from them
+        await without_foreign_keys(convert_money)
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade)
+
+
+async def warm_pool():
+    """Open pooled connections up front so early requests skip connect and pragma setup"""
+    count = min(settings.DB_POOL_PREWARM, settings.DB_POOL_SIZE)
+    connections = [await engine.connect() for _ in range(count)]
+    for conn in connections:
+        await conn.close()
@@ -3,8 +3,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
-from app.database import init_db
-from app.routers import plans, projects, timer, statistics, accounting, accounts
+from app.database import engine, init_db, warm_pool, AsyncSessionLocal
+from app.routers import plans, projects, timer, statistics, accounting, accounts, tags
+from app.services.account_service import AccountService
 
 
 @asynccontextmanager
@@ -12,8 +13,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await init_db()
+    await warm_pool()
+    # Month-end balance snapshots for months closed since the last start
+    async with AsyncSessionLocal() as db:
+        await AccountService(db).snapshot_balances()
     yield
     # Shutdown
+    await engine.dispose()
 
 
 settings = get_settings()
@@ -32,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -41,6 +48,7 @@ app.include_router(timer.router, prefix="/api/v1")
 app.include_router(statistics.router, prefix="/api/v1")
 app.include_router(accounting.router, prefix="/api/v1")
 app.include_router(accounts.router, prefix="/api/v1")
+app.include_router(tags.router, prefix="/api/v1")
 
 
 @app.get("/")
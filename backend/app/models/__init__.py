@@ -1,7 +1,14 @@
-from app.models.plan import Plan
+from app.models.plan import Plan, PlanArchive
 from app.models.project import Project
 from app.models.timer import TimerSession
 from app.models.transaction import Transaction, Category
 from app.models.account import Account
+from app.models.time_rollup import DailyTimeRollup
+from app.models.tag import Tag, PlanTag, TransactionTag
+from app.models.ledger import Posting, BalanceSnapshot
+from app.models.finance_summary import MonthlyFinanceSummary
 
-__all__ = ["Plan", "Project", "TimerSession", "Transaction", "Category", "Account"]
+__all__ = [
+    "Plan", "PlanArchive", "Project", "TimerSession", "Transaction", "Category", "Account", "DailyTimeRollup",
+    "Tag", "PlanTag", "TransactionTag", "Posting", "BalanceSnapshot", "MonthlyFinanceSummary"
+]
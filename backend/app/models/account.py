@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, func
 from app.database import Base
+from app.models.money import Money
 
 
 class Account(Base):
@@ -10,9 +11,9 @@ class Account(Base):
     name = Column(String(100), nullable=False)  # 账户名称
     type = Column(String(20), nullable=False)  # asset(资产), liability(负债)
     sub_type = Column(String(50), nullable=True)  # bank_card, wechat, alipay, credit_card, loan, etc.
-    balance = Column(Numeric(12, 2), default=0, nullable=False)  # 当前余额
-    initial_balance = Column(Numeric(12, 2), default=0, nullable=False)  # 初始余额
-    credit_limit = Column(Numeric(12, 2), nullable=True)  # 信用额度（信用卡）
+    balance = Column(Money, default=0, nullable=False)  # 当前余额（以分存储）
+    initial_balance = Column(Money, default=0, nullable=False)  # 初始余额
+    credit_limit = Column(Money, nullable=True)  # 信用额度（信用卡）
     icon = Column(String(50), nullable=True)
     color = Column(String(7), nullable=True)
     description = Column(String(500), nullable=True)
@@ -0,0 +1,87 @@
+from sqlalchemy import Column, Integer, String, Date, Index, DDL, event
+from app.database import Base
+from app.models.money import Money
+from app.models.transaction import Transaction
+
+
+class MonthlyFinanceSummary(Base):
+    """Per-month transaction totals, by type, category and accounts.
+
+    Kept in sync with transactions by triggers: a write only adjusts the rows
+    of the month it falls in (both months when an update moves it), so closed
+    months are read as stored. Readers aggregate, like daily_time_rollup.
+    """
+    __tablename__ = "monthly_finance_summary"
+    __table_args__ = (
+        Index(
+            "ix_monthly_finance_summary_key",
+            "month", "type", "category_id", "from_account_id", "to_account_id"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    month = Column(Date, nullable=False)  # first day of the month
+    type = Column(String(20), nullable=False)
+    category_id = Column(Integer, nullable=True)
+    from_account_id = Column(Integer, nullable=True)
+    to_account_id = Column(Integer, nullable=True)
+
+    total = Column(Money, default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+
+
+_KEY = (
+    "month = date({row}.transaction_date, 'start of month') AND type = {row}.type "
+    "AND category_id IS {row}.category_id AND from_account_id IS {row}.from_account_id "
+    "AND to_account_id IS {row}.to_account_id"
+)
+
+_ADD = (
+    "INSERT INTO monthly_finance_summary "
+    "(month, type, category_id, from_account_id, to_account_id, total, transaction_count) "
+    "SELECT date(NEW.transaction_date, 'start of month'), NEW.type, NEW.category_id, "
+    "NEW.from_account_id, NEW.to_account_id, 0, 0 "
+    f"WHERE NOT EXISTS (SELECT 1 FROM monthly_finance_summary WHERE {_KEY.format(row='NEW')}); "
+    "UPDATE monthly_finance_summary "
+    "SET total = total + NEW.amount, transaction_count = transaction_count + 1 "
+    f"WHERE {_KEY.format(row='NEW')}; "
+)
+
+_REMOVE = (
+    "UPDATE monthly_finance_summary "
+    "SET total = total - OLD.amount, transaction_count = transaction_count - 1 "
+    f"WHERE {_KEY.format(row='OLD')}; "
+    f"DELETE FROM monthly_finance_summary WHERE {_KEY.format(row='OLD')} AND transaction_count = 0; "
+)
+
+finance_summary_ddl = [
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_finance_summary_insert AFTER INSERT ON transactions BEGIN "
+        f"{_ADD}END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_finance_summary_update "
+        "AFTER UPDATE OF type, amount, category_id, from_account_id, to_account_id, transaction_date "
+        "ON transactions BEGIN "
+        f"{_REMOVE}{_ADD}END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_finance_summary_delete AFTER DELETE ON transactions BEGIN "
+        f"{_REMOVE}END"
+    ),
+]
+
+# Used by migrate_indexes.py for databases created before the summary
+finance_summary_backfill = [
+    DDL("DELETE FROM monthly_finance_summary"),
+    DDL(
+        "INSERT INTO monthly_finance_summary "
+        "(month, type, category_id, from_account_id, to_account_id, total, transaction_count) "
+        "SELECT date(transaction_date, 'start of month'), type, category_id, from_account_id, to_account_id, "
+        "sum(amount), count(*) FROM transactions "
+        "GROUP BY 1, type, category_id, from_account_id, to_account_id"
+    ),
+]
+
+for statement in finance_summary_ddl:
+    event.listen(Transaction.__table__, "after_create", statement.execute_if(dialect="sqlite"))
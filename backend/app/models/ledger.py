@@ -0,0 +1,102 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, DDL, event
+from app.database import Base
+from app.models.money import Money
+from app.models.transaction import Transaction
+
+
+class Posting(Base):
+    """One account leg of a transaction: signed amount moved on transaction_date.
+
+    Kept in sync with transactions by triggers, using the same rules as
+    AccountingService._balance_deltas, so an account's balance on any day is
+    its initial balance plus the postings up to that day.
+    """
+    __tablename__ = "postings"
+    __table_args__ = (
+        # Covers per-account sums over a date range and running balances in
+        # (posting_date, transaction_id) order, the transaction list's order
+        Index("ix_postings_account_order", "account_id", "posting_date", "transaction_id", "amount"),
+        Index("ix_postings_transaction_id", "transaction_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    amount = Column(Money, nullable=False)  # positive into the account
+    posting_date = Column(Date, nullable=False)
+
+
+class BalanceSnapshot(Base):
+    """Account balance at the end of snapshot_date, for months with postings.
+
+    Written by AccountService.snapshot_balances; a posting trigger shifts every
+    later snapshot, so they stay exact when back-dated transactions change.
+    """
+    __tablename__ = "account_balance_snapshots"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    snapshot_date = Column(Date, primary_key=True)
+    balance = Column(Money, nullable=False)
+
+
+_LEGS = (
+    "INSERT INTO postings (transaction_id, account_id, amount, posting_date) "
+    "SELECT {row}.id, {row}.to_account_id, {row}.amount, {row}.transaction_date "
+    "WHERE {row}.type IN ('income', 'transfer', 'repayment') AND {row}.to_account_id IS NOT NULL; "
+    "INSERT INTO postings (transaction_id, account_id, amount, posting_date) "
+    "SELECT {row}.id, {row}.from_account_id, -{row}.amount, {row}.transaction_date "
+    "WHERE {row}.type IN ('expense', 'transfer', 'repayment') AND {row}.from_account_id IS NOT NULL; "
+)
+
+ledger_ddl = [
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_postings_insert AFTER INSERT ON transactions BEGIN "
+        f"{_LEGS.format(row='NEW')}END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_postings_update "
+        "AFTER UPDATE OF type, amount, from_account_id, to_account_id, transaction_date ON transactions BEGIN "
+        "DELETE FROM postings WHERE transaction_id = OLD.id; "
+        f"{_LEGS.format(row='NEW')}END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transactions_postings_delete AFTER DELETE ON transactions BEGIN "
+        "DELETE FROM postings WHERE transaction_id = OLD.id; "
+        "END"
+    ),
+]
+
+balance_snapshots_ddl = [
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS postings_snapshots_insert AFTER INSERT ON postings BEGIN "
+        "UPDATE account_balance_snapshots SET balance = balance + NEW.amount "
+        "WHERE account_id = NEW.account_id AND snapshot_date >= NEW.posting_date; "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS postings_snapshots_delete AFTER DELETE ON postings BEGIN "
+        "UPDATE account_balance_snapshots SET balance = balance - OLD.amount "
+        "WHERE account_id = OLD.account_id AND snapshot_date >= OLD.posting_date; "
+        "END"
+    ),
+]
+
+# Used by migrate_indexes.py for databases created before the ledger; snapshots
+# are dropped first and written again by AccountService.snapshot_balances
+ledger_backfill = [
+    DDL("DELETE FROM account_balance_snapshots"),
+    DDL("DELETE FROM postings"),
+    DDL(
+        "INSERT INTO postings (transaction_id, account_id, amount, posting_date) "
+        "SELECT id, to_account_id, amount, transaction_date FROM transactions "
+        "WHERE type IN ('income', 'transfer', 'repayment') AND to_account_id IS NOT NULL "
+        "UNION ALL "
+        "SELECT id, from_account_id, -amount, transaction_date FROM transactions "
+        "WHERE type IN ('expense', 'transfer', 'repayment') AND from_account_id IS NOT NULL"
+    ),
+]
+
+for statement in ledger_ddl:
+    event.listen(Transaction.__table__, "after_create", statement.execute_if(dialect="sqlite"))
+for statement in balance_snapshots_ddl:
+    event.listen(Posting.__table__, "after_create", statement.execute_if(dialect="sqlite"))
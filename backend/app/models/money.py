@@ -0,0 +1,38 @@
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+class Money(TypeDecorator):
+    """Amount stored as an integer number of cents, read back as Decimal.
+
+    SQLite has no decimal type: Numeric columns are stored as REAL, so sums
+    drift and every value is converted back from float. Integer cents sum
+    exactly in SQL and take one scaleb() per value on the way out. Raw SQL
+    over these columns works in cents too. Databases from before the switch
+    are converted at startup (app.schema.convert_money).
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(Decimal(str(value)).quantize(CENT, ROUND_HALF_UP).scaleb(2))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, int):
+            # A REAL left by the old NUMERIC columns; int() would silently truncate it
+            raise ValueError(f"Money column holds {value!r} instead of integer cents")
+        return Decimal(value).scaleb(-2)
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    @property
+    def python_type(self):
+        return Decimal
@@ -1,10 +1,22 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, DDL, event, func
+from sqlalchemy.sql import table, column
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Plan(Base):
     __tablename__ = "plans"
+    __table_args__ = (
+        Index("ix_plans_parent_status_created", "parent_id", "status", "created_at"),
+        # Covers plan counts by status/priority over a created_at range
+        Index("ix_plans_created_status_priority", "created_at", "status", "priority_matrix"),
+        Index("ix_plans_status_updated", "status", "updated_at"),
+        Index("ix_plans_project_status", "project_id", "status"),
+        # Keyset pagination order for top-level plans in /plans
+        Index("ix_plans_parent_created_id", "parent_id", "created_at", "id"),
+        # Ids are never reused, so references to archived plans stay unambiguous
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -29,4 +41,135 @@ class Plan(Base):
     # Relationships
     project = relationship("Project", back_populates="plans")
     children = relationship("Plan", backref="parent", remote_side=[id])
-    timer_sessions = relationship("TimerSession", back_populates="plan")
+    timer_sessions = relationship(
+        "TimerSession",
+        primaryjoin="Plan.id == foreign(TimerSession.plan_id)",
+        back_populates="plan"
+    )
+
+
+class PlanArchive(Base):
+    """Completed plans moved out of plans by PlanService.archive_completed.
+
+    Whole trees are archived together, keyed by the id of their root, and keep
+    their ids so timer sessions and transactions still point at them. Archived
+    plans are read by the archive view and statistics only; writing to one
+    moves its tree back into plans first.
+    """
+    __tablename__ = "plans_archive"
+    __table_args__ = (
+        Index("ix_plans_archive_root_id", "root_id"),
+        # Same shapes as the plans indexes the statistics and archive view use
+        Index("ix_plans_archive_created_status_priority", "created_at", "status", "priority_matrix"),
+        Index("ix_plans_archive_status_updated", "status", "updated_at"),
+        Index("ix_plans_archive_project_status", "project_id", "status"),
+        Index("ix_plans_archive_parent_created_id", "parent_id", "created_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    root_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    parent_id = Column(Integer, nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    
+    priority_matrix = Column(String(30))
+    status = Column(String(20))
+    
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    estimated_duration = Column(Integer, nullable=True)  # minutes
+    actual_duration = Column(Integer)  # minutes
+    
+    tags = Column(JSON)
+    
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now())
+
+
+# R*Tree of [start_time, end_time] (epoch seconds) for plans that can still
+# conflict, kept in sync by triggers. R*Tree coordinates are 32-bit floats
+# rounded outwards, so it narrows the candidates and the exact check runs on plans.
+plan_intervals = table("plan_intervals", column("id"), column("start_ts"), column("end_ts"))
+
+_INTERVAL_ACTIVE = (
+    "{row}.start_time IS NOT NULL AND {row}.end_time IS NOT NULL "
+    "AND {row}.status NOT IN ('completed', 'cancelled')"
+)
+_INTERVAL_VALUES = (
+    "{row}.id, "
+    "min(CAST(strftime('%%s', {row}.start_time) AS INTEGER), CAST(strftime('%%s', {row}.end_time) AS INTEGER)), "
+    "max(CAST(strftime('%%s', {row}.start_time) AS INTEGER), CAST(strftime('%%s', {row}.end_time) AS INTEGER))"
+)
+
+plan_intervals_ddl = [
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS plan_intervals USING rtree(id, start_ts, end_ts)"),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_intervals_insert AFTER INSERT ON plans "
+        f"WHEN {_INTERVAL_ACTIVE.format(row='NEW')} BEGIN "
+        f"INSERT INTO plan_intervals (id, start_ts, end_ts) VALUES ({_INTERVAL_VALUES.format(row='NEW')}); "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_intervals_update "
+        "AFTER UPDATE OF start_time, end_time, status ON plans BEGIN "
+        "DELETE FROM plan_intervals WHERE id = OLD.id; "
+        f"INSERT INTO plan_intervals (id, start_ts, end_ts) SELECT {_INTERVAL_VALUES.format(row='NEW')} "
+        f"WHERE {_INTERVAL_ACTIVE.format(row='NEW')}; "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_intervals_delete AFTER DELETE ON plans BEGIN "
+        "DELETE FROM plan_intervals WHERE id = OLD.id; "
+        "END"
+    ),
+]
+
+# Fills plan_intervals for databases created before it existed
+plan_intervals_backfill = DDL(
+    "INSERT OR REPLACE INTO plan_intervals (id, start_ts, end_ts) "
+    f"SELECT {_INTERVAL_VALUES.format(row='plans')} FROM plans WHERE {_INTERVAL_ACTIVE.format(row='plans')}"
+)
+
+
+# FTS5 index over title, description and tags (the JSON text) that reads its
+# content from plans; triggers keep it in step with every plan write. The
+# trigram tokenizer matches any substring of 3+ characters, so Chinese text,
+# which has no spaces between words, is searchable by the words inside it.
+plans_fts = table(
+    "plans_fts", column("rowid"), column("plans_fts"), column("title"), column("description"), column("tags")
+)
+
+plans_fts_ddl = [
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS plans_fts USING fts5("
+        "title, description, tags, content='plans', content_rowid='id', tokenize='trigram')"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_fts_insert AFTER INSERT ON plans BEGIN "
+        "INSERT INTO plans_fts (rowid, title, description, tags) "
+        "VALUES (NEW.id, NEW.title, NEW.description, NEW.tags); "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_fts_update AFTER UPDATE OF title, description, tags ON plans BEGIN "
+        "INSERT INTO plans_fts (plans_fts, rowid, title, description, tags) "
+        "VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.tags); "
+        "INSERT INTO plans_fts (rowid, title, description, tags) "
+        "VALUES (NEW.id, NEW.title, NEW.description, NEW.tags); "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS plans_fts_delete AFTER DELETE ON plans BEGIN "
+        "INSERT INTO plans_fts (plans_fts, rowid, title, description, tags) "
+        "VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.tags); "
+        "END"
+    ),
+]
+
+# Reindexes every plan; used for databases created before plans_fts existed
+plans_fts_rebuild = DDL("INSERT INTO plans_fts (plans_fts) VALUES ('rebuild')")
+
+for statement in plan_intervals_ddl + plans_fts_ddl:
+    event.listen(Plan.__table__, "after_create", statement.execute_if(dialect="sqlite"))
@@ -16,6 +16,10 @@ class Project(Base):
     end_date = Column(Date, nullable=True)
     progress = Column(Numeric(5, 2), default=0)
     
+    # Maintained by PlanService on every plan write; rebuilt by reconcile_projects.py
+    plan_total = Column(Integer, default=0, server_default="0", nullable=False)  # plans not cancelled
+    plan_completed = Column(Integer, default=0, server_default="0", nullable=False)
+    
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
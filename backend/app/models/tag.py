@@ -0,0 +1,106 @@
+from sqlalchemy import Column, Integer, String, Index, DDL, event
+from app.database import Base
+from app.models.plan import Plan, PlanArchive
+from app.models.transaction import Transaction
+
+
+class Tag(Base):
+    """Tag names used by plans and transactions.
+
+    Plan.tags and Transaction.tags stay the source of truth; triggers on
+    plans, plans_archive and transactions mirror them into
+    plan_tags/transaction_tags so tag filters and reports are index lookups
+    instead of JSON scans.
+    """
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+
+class PlanTag(Base):
+    __tablename__ = "plan_tags"
+    __table_args__ = (
+        Index("ix_plan_tags_plan_id", "plan_id"),
+    )
+
+    tag_id = Column(Integer, primary_key=True)
+    plan_id = Column(Integer, primary_key=True)
+
+
+class TransactionTag(Base):
+    __tablename__ = "transaction_tags"
+    __table_args__ = (
+        Index("ix_transaction_tags_transaction_id", "transaction_id"),
+    )
+
+    tag_id = Column(Integer, primary_key=True)
+    transaction_id = Column(Integer, primary_key=True)
+
+
+def _tag_sync_ddl(table: str, link_table: str, key: str):
+    """Triggers mirroring table.tags (a JSON array) into link_table"""
+    # json_each over anything but valid JSON would abort the write
+    tags = "json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags END)"
+    insert = (
+        f"INSERT OR IGNORE INTO tags (name) "
+        f"SELECT value FROM {tags} WHERE type = 'text'; "
+        f"INSERT OR IGNORE INTO {link_table} (tag_id, {key}) "
+        f"SELECT tags.id, NEW.id FROM {tags} AS item JOIN tags ON tags.name = item.value "
+        f"WHERE item.type = 'text'; "
+    )
+
+    return [
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_tags_insert AFTER INSERT ON {table} BEGIN "
+            f"{insert}END"
+        ),
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_tags_update AFTER UPDATE OF tags ON {table} BEGIN "
+            f"DELETE FROM {link_table} WHERE {key} = OLD.id; "
+            f"{insert}END"
+        ),
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_tags_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {link_table} WHERE {key} = OLD.id; "
+            f"END"
+        ),
+    ]
+
+
+def _tag_backfill_ddl(table: str, link_table: str, key: str):
+    """Add every row's tags to link_table"""
+    tags = f"json_each(CASE WHEN json_valid({table}.tags) THEN {table}.tags END)"
+    return [
+        DDL(
+            f"INSERT OR IGNORE INTO tags (name) "
+            f"SELECT item.value FROM {table}, {tags} AS item WHERE item.type = 'text'"
+        ),
+        DDL(
+            f"INSERT OR IGNORE INTO {link_table} (tag_id, {key}) "
+            f"SELECT tags.id, {table}.id FROM {table}, {tags} AS item "
+            f"JOIN tags ON tags.name = item.value WHERE item.type = 'text'"
+        ),
+    ]
+
+
+plan_tags_ddl = _tag_sync_ddl("plans", "plan_tags", "plan_id")
+# Moving a plan in or out of the archive deletes it from one table and inserts
+# it into the other, so its links survive the move
+plans_archive_tags_ddl = _tag_sync_ddl("plans_archive", "plan_tags", "plan_id")
+transaction_tags_ddl = _tag_sync_ddl("transactions", "transaction_tags", "transaction_id")
+
+# Used by migrate_indexes.py for databases created before the tag tables
+tags_backfill = (
+    [DDL("DELETE FROM plan_tags"), DDL("DELETE FROM transaction_tags")]
+    + _tag_backfill_ddl("plans", "plan_tags", "plan_id")
+    + _tag_backfill_ddl("plans_archive", "plan_tags", "plan_id")
+    + _tag_backfill_ddl("transactions", "transaction_tags", "transaction_id")
+)
+
+for statement in plan_tags_ddl:
+    event.listen(Plan.__table__, "after_create", statement.execute_if(dialect="sqlite"))
+for statement in plans_archive_tags_ddl:
+    event.listen(PlanArchive.__table__, "after_create", statement.execute_if(dialect="sqlite"))
+for statement in transaction_tags_ddl:
+    event.listen(Transaction.__table__, "after_create", statement.execute_if(dialect="sqlite"))
@@ -0,0 +1,82 @@
+from sqlalchemy import Column, Integer, Date, Numeric, Index, Select, func, literal_column, select, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import Base
+from app.models.timer import TimerSession
+from app.models.plan import Plan
+
+
+class DailyTimeRollup(Base):
+    """Per-day totals of finished timer sessions, by project and plan.
+    
+    Maintained incrementally by TimerService.stop_timer and rebuilt from
+    timer_sessions by TimerService.rebuild_daily_rollup. Each (day, project,
+    plan) has a single row, NULLs included, so writes go through add_to_rollup.
+    """
+    __tablename__ = "daily_time_rollup"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    project_id = Column(Integer, nullable=True)
+    plan_id = Column(Integer, nullable=True)
+    
+    total_duration = Column(Integer, default=0, nullable=False)  # seconds
+    session_count = Column(Integer, default=0, nullable=False)
+    focus_score_sum = Column(Numeric(12, 2), default=0, nullable=False)
+    focus_score_count = Column(Integer, default=0, nullable=False)
+    interrupt_count = Column(Integer, default=0, nullable=False)
+
+
+# NULL never equals NULL in a unique index, so the key maps it to 0
+ROLLUP_KEY = (
+    DailyTimeRollup.day,
+    func.coalesce(DailyTimeRollup.project_id, literal_column("0")),
+    func.coalesce(DailyTimeRollup.plan_id, literal_column("0")),
+)
+
+Index("ux_daily_time_rollup_key", *ROLLUP_KEY, unique=True)
+
+ROLLUP_COLUMNS = [
+    'day', 'project_id', 'plan_id', 'total_duration', 'session_count',
+    'focus_score_sum', 'focus_score_count', 'interrupt_count'
+]
+
+
+def add_to_rollup(rows):
+    """INSERT of rollup rows (a select over ROLLUP_COLUMNS, or a dict of values) that adds them to existing keys"""
+    statement = sqlite_insert(DailyTimeRollup)
+    statement = statement.from_select(ROLLUP_COLUMNS, rows) if isinstance(rows, Select) else statement.values(**rows)
+    return statement.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            name: getattr(DailyTimeRollup, name) + getattr(statement.excluded, name)
+            for name in ROLLUP_COLUMNS[3:]
+        }
+    )
+
+
+_project_id = func.coalesce(TimerSession.project_id, Plan.project_id)
+_session_day = func.date(TimerSession.start_time, type_=Date)
+
+# Fills an empty daily_time_rollup from the finished sessions
+daily_rollup_backfill = insert(DailyTimeRollup).from_select(
+    ROLLUP_COLUMNS,
+    select(
+        _session_day,
+        _project_id,
+        TimerSession.plan_id,
+        func.coalesce(func.sum(TimerSession.duration), 0),
+        func.count(TimerSession.id),
+        func.coalesce(func.sum(TimerSession.focus_score), 0),
+        func.count(TimerSession.focus_score),
+        func.coalesce(func.sum(TimerSession.interrupt_count), 0)
+    ).outerjoin(
+        Plan,
+        Plan.id == TimerSession.plan_id
+    ).where(
+        TimerSession.end_time.isnot(None)
+    ).group_by(
+        _session_day,
+        _project_id,
+        TimerSession.plan_id
+    )
+)
@@ -1,13 +1,22 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Text, Boolean, func
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Text, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class TimerSession(Base):
     __tablename__ = "timer_sessions"
+    __table_args__ = (
+        # Covers the date-range aggregates in StatisticsService
+        Index("ix_timer_sessions_range", "start_time", "end_time", "duration", "focus_score"),
+        Index("ix_timer_sessions_project_start", "project_id", "start_time"),
+        Index("ix_timer_sessions_plan_id", "plan_id"),
+        # Keyset pagination order for /timer/sessions
+        Index("ix_timer_sessions_start_id", "start_time", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=True)
+    # No foreign key: the plan may have moved to plans_archive
+    plan_id = Column(Integer, nullable=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
     start_time = Column(DateTime, nullable=False)
@@ -21,5 +30,9 @@ class TimerSession(Base):
     created_at = Column(DateTime, server_default=func.now())
     
     # Relationships
-    plan = relationship("Plan", back_populates="timer_sessions")
+    plan = relationship(
+        "Plan",
+        primaryjoin="foreign(TimerSession.plan_id) == Plan.id",
+        back_populates="timer_sessions"
+    )
     project = relationship("Project", back_populates="timer_sessions")
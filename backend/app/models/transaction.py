@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, JSON, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.money import Money
 
 
 class Category(Base):
@@ -12,28 +13,44 @@ class Category(Base):
     icon = Column(String(50), nullable=True)
     color = Column(String(7), nullable=True)
     parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
-    budget_limit = Column(Numeric(10, 2), nullable=True)
+    budget_limit = Column(Money, nullable=True)
     
     created_at = Column(DateTime, server_default=func.now())
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Covers income/expense aggregates over a transaction_date range
+        Index("ix_transactions_type_date", "type", "transaction_date", "amount", "category_id"),
+        # Keyset pagination order for /accounting/transactions
+        Index("ix_transactions_date_id", "transaction_date", "id"),
+        # Covers per-project income/expense totals
+        Index("ix_transactions_project_type", "project_id", "type", "amount"),
+        # Per-account balance totals (reconcile) read these in account order
+        Index("ix_transactions_to_account", "to_account_id", "type", "amount"),
+        Index("ix_transactions_from_account", "from_account_id", "type", "amount"),
+        # Statement imports skip lines already imported
+        Index("ux_transactions_import_hash", "import_hash", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String(20), nullable=False)  # income, expense, transfer, repayment
-    amount = Column(Numeric(10, 2), nullable=False)
+    amount = Column(Money, nullable=False)  # 以分存储
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     
     # 账户相关
     from_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)  # 转出账户
     to_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)  # 转入账户
     
-    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=True)
+    # No foreign key: the plan may have moved to plans_archive
+    plan_id = Column(Integer, nullable=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     transaction_date = Column(Date, nullable=False)
     description = Column(String(500), nullable=True)
     tags = Column(JSON, default=list)
+    # Content hash of the statement line this transaction was imported from
+    import_hash = Column(String(64), nullable=True)
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -42,5 +59,5 @@ class Transaction(Base):
     category = relationship("Category")
     from_account = relationship("Account", foreign_keys=[from_account_id])
     to_account = relationship("Account", foreign_keys=[to_account_id])
-    plan = relationship("Plan")
+    plan = relationship("Plan", primaryjoin="foreign(Transaction.plan_id) == Plan.id")
     project = relationship("Project")
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import io
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
+from decimal import Decimal
 from app.database import get_db
 from app.schemas.accounting import (
     TransactionCreate, TransactionUpdate, TransactionResponse,
-    CategoryCreate, CategoryResponse, FinanceSummary
+    CategoryCreate, CategoryResponse, FinanceSummary, ImportResult
 )
-from app.services.accounting_service import AccountingService
+from app.services.accounting_service import AccountingService, TRANSACTION_FIELDS
+from app.utils.statements import parse_statement
+
+# Uploads larger than this are spooled to a temporary file while parsing
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+
+def _json_value(value):
+    """Encode a column value the way TransactionResponse serializes it"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
 
 router = APIRouter(prefix="/accounting", tags=["accounting"])
 
@@ -43,19 +60,37 @@ async def get_transactions(
     account_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    tag: Optional[List[str]] = Query(None, description="Only transactions carrying every given tag; repeat to combine"),
+    running_balance: bool = Query(False, description="Add account_id's balance after each transaction"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get transactions with filters"""
     service = AccountingService(db)
-    return await service.get_transactions(
-        skip=skip,
-        limit=limit,
-        type=type,
-        category_id=category_id,
-        account_id=account_id,
-        start_date=start_date,
-        end_date=end_date
-    )
+    try:
+        transactions = await service.get_transactions(
+            skip=skip,
+            limit=limit,
+            type=type,
+            category_id=category_id,
+            account_id=account_id,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            tags=tag,
+            running_balance=running_balance
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Rows are already in response shape; skip per-row model validation
+    response = JSONResponse([
+        {name: _json_value(value) for name, value in zip(TRANSACTION_FIELDS, row)}
+        for row in transactions
+    ])
+    if transactions.next_cursor:
+        response.headers["X-Next-Cursor"] = transactions.next_cursor
+    return response
 
 
 @router.post("/transactions", response_model=TransactionResponse, status_code=201)
@@ -68,6 +103,36 @@ async def create_transaction(
     return await service.create(transaction)
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_statement(
+    request: Request,
+    account_id: int,
+    format: str = Query(..., regex="^(csv|ofx|qif)$"),
+    encoding: str = Query("utf-8-sig", description="Text encoding of the file, e.g. gbk"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import a bank statement sent as the raw request body.
+    
+    Lines already imported are skipped, so the same or an overlapping
+    statement can be imported again.
+    """
+    service = AccountingService(db)
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        
+        try:
+            lines = io.TextIOWrapper(spool, encoding=encoding, newline="")
+            result = await service.import_statement(account_id, parse_statement(lines, format))
+        except (ValueError, LookupError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return result
+
+
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
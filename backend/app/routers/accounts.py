@@ -1,15 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import date
 from app.database import get_db
 from app.schemas.account import (
-    AccountCreate, AccountUpdate, AccountResponse, AccountSummary
+    AccountCreate, AccountUpdate, AccountResponse, AccountSummary, BalancePoint, NetWorthPoint,
+    BalanceReconciliation
 )
 from app.services.account_service import AccountService
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 
+async def _account_response(service: AccountService, account_id: int) -> AccountResponse:
+    """单个账户的响应，与列表共用同一列投影"""
+    accounts = await service.get_responses(account_id=account_id)
+    if not accounts:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return accounts[0]
+
+
 @router.get("", response_model=List[AccountResponse])
 async def get_accounts(
     type: Optional[str] = Query(None, regex="^(asset|liability)$"),
@@ -18,45 +29,81 @@ async def get_accounts(
 ):
     """获取所有账户"""
     service = AccountService(db)
-    accounts = await service.get_all(type=type, is_active=is_active)
+    accounts = await service.get_responses(type=type, is_active=is_active)
     
-    # 转换为响应模型
-    result = []
-    for account in accounts:
-        if account.type == 'asset':
-            available_balance = account.balance
-        else:  # liability
-            if account.credit_limit:
-                available_balance = account.credit_limit + account.balance
-            else:
-                available_balance = account.balance
-        
-        result.append(AccountResponse(
-            id=account.id,
-            name=account.name,
-            type=account.type,
-            sub_type=account.sub_type,
-            balance=account.balance,
-            initial_balance=account.initial_balance,
-            credit_limit=account.credit_limit,
-            icon=account.icon,
-            color=account.color,
-            description=account.description,
-            is_active=account.is_active,
-            is_default=account.is_default,
-            available_balance=available_balance,
-            created_at=account.created_at,
-            updated_at=account.updated_at
-        ))
-    
-    return result
+    # Responses are already validated; skip the second validation and encoding pass
+    return JSONResponse([account.model_dump(mode="json") for account in accounts])
 
 
 @router.get("/summary", response_model=AccountSummary)
 async def get_account_summary(db: AsyncSession = Depends(get_db)):
     """获取账户汇总"""
     service = AccountService(db)
-    return await service.get_summary()
+    summary = await service.get_summary()
+    # Already validated, like the account list
+    return JSONResponse(summary.model_dump(mode="json"))
+
+
+@router.get("/reconcile", response_model=BalanceReconciliation)
+async def check_balances(db: AsyncSession = Depends(get_db)):
+    """核对账户余额：按初始余额和全部交易重算，列出有偏差的账户"""
+    service = AccountService(db)
+    return await service.reconcile_balances()
+
+
+@router.post("/reconcile", response_model=BalanceReconciliation)
+async def reconcile_balances(db: AsyncSession = Depends(get_db)):
+    """核对并修正账户余额，所有修正在同一事务中完成"""
+    service = AccountService(db)
+    return await service.reconcile_balances(fix=True)
+
+
+@router.get("/net-worth", response_model=List[NetWorthPoint])
+async def get_net_worth(
+    start_date: date,
+    end_date: Optional[date] = None,
+    interval: str = Query("month", regex="^(month|day)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """净资产序列：按月为每月月末，按日为每天，最后一点为 end_date（默认今天）"""
+    service = AccountService(db)
+    try:
+        return await service.get_net_worth_series(start_date, end_date or date.today(), interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{account_id}/balance", response_model=BalancePoint)
+async def get_account_balance_at(
+    account_id: int,
+    at: Optional[date] = Query(None, description="日期，默认今天"),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取账户在某日结束时的余额"""
+    service = AccountService(db)
+    day = at or date.today()
+    balance = await service.get_balance_at(account_id, day)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return BalancePoint(date=day, balance=balance)
+
+
+@router.get("/{account_id}/balance-history", response_model=List[BalancePoint])
+async def get_account_balance_history(
+    account_id: int,
+    start_date: date,
+    end_date: Optional[date] = None,
+    interval: str = Query("month", regex="^(month|day)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取账户余额序列，用于余额走势图"""
+    service = AccountService(db)
+    if not await service.get_by_id(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+    try:
+        return await service.get_balance_history(account_id, start_date, end_date or date.today(), interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{account_id}", response_model=AccountResponse)
@@ -66,36 +113,7 @@ async def get_account(
 ):
     """获取账户详情"""
     service = AccountService(db)
-    account = await service.get_by_id(account_id)
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    # 计算可用余额
-    if account.type == 'asset':
-        available_balance = account.balance
-    else:  # liability
-        if account.credit_limit:
-            available_balance = account.credit_limit + account.balance
-        else:
-            available_balance = account.balance
-    
-    return AccountResponse(
-        id=account.id,
-        name=account.name,
-        type=account.type,
-        sub_type=account.sub_type,
-        balance=account.balance,
-        initial_balance=account.initial_balance,
-        credit_limit=account.credit_limit,
-        icon=account.icon,
-        color=account.color,
-        description=account.description,
-        is_active=account.is_active,
-        is_default=account.is_default,
-        available_balance=available_balance,
-        created_at=account.created_at,
-        updated_at=account.updated_at
-    )
+    return await _account_response(service, account_id)
 
 
 @router.post("", response_model=AccountResponse, status_code=201)
@@ -106,33 +124,7 @@ async def create_account(
     """创建账户"""
     service = AccountService(db)
     created = await service.create(account)
-    
-    # 计算可用余额
-    if created.type == 'asset':
-        available_balance = created.balance
-    else:  # liability
-        if created.credit_limit:
-            available_balance = created.credit_limit + created.balance
-        else:
-            available_balance = created.balance
-    
-    return AccountResponse(
-        id=created.id,
-        name=created.name,
-        type=created.type,
-        sub_type=created.sub_type,
-        balance=created.balance,
-        initial_balance=created.initial_balance,
-        credit_limit=created.credit_limit,
-        icon=created.icon,
-        color=created.color,
-        description=created.description,
-        is_active=created.is_active,
-        is_default=created.is_default,
-        available_balance=available_balance,
-        created_at=created.created_at,
-        updated_at=created.updated_at
-    )
+    return await _account_response(service, created.id)
 
 
 @router.put("/{account_id}", response_model=AccountResponse)
@@ -146,33 +138,7 @@ async def update_account(
     updated = await service.update(account_id, account)
     if not updated:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    # 计算可用余额
-    if updated.type == 'asset':
-        available_balance = updated.balance
-    else:  # liability
-        if updated.credit_limit:
-            available_balance = updated.credit_limit + updated.balance
-        else:
-            available_balance = updated.balance
-    
-    return AccountResponse(
-        id=updated.id,
-        name=updated.name,
-        type=updated.type,
-        sub_type=updated.sub_type,
-        balance=updated.balance,
-        initial_balance=updated.initial_balance,
-        credit_limit=updated.credit_limit,
-        icon=updated.icon,
-        color=updated.color,
-        description=updated.description,
-        is_active=updated.is_active,
-        is_default=updated.is_default,
-        available_balance=available_balance,
-        created_at=updated.created_at,
-        updated_at=updated.updated_at
-    )
+    return await _account_response(service, account_id)
 
 
 @router.delete("/{account_id}")
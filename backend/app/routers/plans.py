@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.database import get_db
-from app.schemas.plan import PlanCreate, PlanUpdate, PlanResponse
+from app.schemas.plan import (
+    PlanCreate, PlanUpdate, PlanResponse, PlanTree,
+    ConflictCheck, SlotConflicts, PlanBulk, PlanBulkResult
+)
 from app.services.plan_service import PlanService
 
 router = APIRouter(prefix="/plans", tags=["plans"])
@@ -10,6 +13,7 @@ router = APIRouter(prefix="/plans", tags=["plans"])
 
 @router.get("", response_model=List[PlanResponse])
 async def get_plans(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     project_id: Optional[int] = None,
@@ -17,32 +21,65 @@ async def get_plans(
     priority: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    exclude_completed: bool = Query(True, description="Exclude completed plans"),
+    exclude_completed: bool = Query(True, description="Exclude completed plans; when false, archived plans are listed too"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    q: Optional[str] = Query(None, description="Full-text search over title, description and tags, ranked; includes subtasks but not archived plans"),
+    tag: Optional[List[str]] = Query(None, description="Only plans carrying every given tag; repeat to combine"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all plans with filters"""
     service = PlanService(db)
-    plans = await service.get_all(
-        skip=skip,
-        limit=limit,
-        project_id=project_id,
-        status=status,
-        priority=priority,
-        start_date=start_date,
-        end_date=end_date,
-        exclude_completed=exclude_completed
-    )
+    try:
+        plans = await service.get_all(
+            skip=skip,
+            limit=limit,
+            project_id=project_id,
+            status=status,
+            priority=priority,
+            start_date=start_date,
+            end_date=end_date,
+            exclude_completed=exclude_completed,
+            cursor=cursor,
+            q=q,
+            tags=tag
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if plans.next_cursor:
+        response.headers["X-Next-Cursor"] = plans.next_cursor
     return plans
 
 
-@router.get("/tree", response_model=List[PlanResponse])
+@router.get("/tree", response_model=List[PlanTree])
 async def get_plan_tree(
     project_id: Optional[int] = None,
+    max_depth: Optional[int] = Query(None, ge=1, description="Levels to include; 1 returns only root plans"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get plan tree structure"""
     service = PlanService(db)
-    return await service.get_tree(project_id=project_id)
+    return await service.get_tree(project_id=project_id, max_depth=max_depth)
+
+
+@router.post("/conflicts", response_model=List[SlotConflicts])
+async def check_plan_conflicts(
+    data: ConflictCheck,
+    db: AsyncSession = Depends(get_db)
+):
+    """Check several proposed time slots for conflicts at once"""
+    service = PlanService(db)
+    return await service.check_time_conflicts(data.slots)
+
+
+@router.post("/bulk", response_model=PlanBulkResult)
+async def bulk_plans(
+    data: PlanBulk,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create, update and delete many plans in one transaction"""
+    service = PlanService(db)
+    return await service.bulk(data)
 
 
 @router.post("", response_model=PlanResponse, status_code=201)
@@ -70,9 +107,9 @@ async def get_plan(
     plan_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get plan by ID"""
+    """Get plan by ID, including archived plans"""
     service = PlanService(db)
-    plan = await service.get_by_id(plan_id)
+    plan = await service.get_by_id(plan_id, include_archived=True)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     return plan
@@ -12,11 +12,12 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 async def get_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    include_stats: bool = Query(False, description="Include tracked time and income/expense per project"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all projects"""
     service = ProjectService(db)
-    projects = await service.get_all(skip=skip, limit=limit)
+    projects = await service.get_all(skip=skip, limit=limit, include_stats=include_stats)
     return projects
 
 
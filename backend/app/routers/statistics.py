@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import date, datetime, timedelta
 from app.database import get_db
 from app.services.statistics_service import StatisticsService
+from app.utils.cache import statistics_cache
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
@@ -78,11 +79,12 @@ async def get_heatmap(
 async def get_finance_trend(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    interval: str = Query("day", regex="^(day|month)$"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get finance trend data"""
     service = StatisticsService(db)
-    return await service.get_finance_trend(start_date, end_date)
+    return await service.get_finance_trend(start_date, end_date, interval)
 
 
 @router.get("/expense-category")
@@ -116,3 +118,27 @@ async def get_priority_distribution(
     """Get plan priority distribution"""
     service = StatisticsService(db)
     return await service.get_priority_distribution(start_date, end_date)
+
+
+@router.get("/dashboard")
+async def get_dashboard(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    heatmap_start_date: Optional[date] = None,
+    heatmap_end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all dashboard statistics in one request"""
+    service = StatisticsService(db)
+    return await service.get_dashboard(
+        start_date,
+        end_date,
+        heatmap_start_date,
+        heatmap_end_date
+    )
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get statistics cache size and hit/miss counters"""
+    return statistics_cache.stats()
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.database import get_db
+from app.schemas.tag import TagStats
+from app.services.tag_service import TagService
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("", response_model=List[TagStats])
+async def get_tags(
+    db: AsyncSession = Depends(get_db)
+):
+    """Get tags in use with plan/transaction counts, tracked time and income/expense"""
+    service = TagService(db)
+    return await service.get_stats()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
@@ -86,22 +86,31 @@ async def delete_timer(
 
 @router.get("/sessions", response_model=List[TimerResponse])
 async def get_timer_sessions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=1000),
     plan_id: Optional[int] = None,
     project_id: Optional[int] = None,
     date: Optional[date] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get timer sessions, optionally filtered by date"""
     service = TimerService(db)
-    sessions = await service.get_sessions(
-        skip=skip,
-        limit=limit,
-        plan_id=plan_id,
-        project_id=project_id,
-        date=date
-    )
+    try:
+        sessions = await service.get_sessions(
+            skip=skip,
+            limit=limit,
+            plan_id=plan_id,
+            project_id=project_id,
+            date=date,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if sessions.next_cursor:
+        response.headers["X-Next-Cursor"] = sessions.next_cursor
     return sessions
 
 
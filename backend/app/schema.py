@@ -0,0 +1,212 @@
+"""
+数据库结构升级 - 为旧版本创建的数据库补齐后来加入的字段、索引、触发器和派生表
+
+create_all 只创建缺失的表；触发器、虚拟表和索引随各自的表一起创建，旧数据库里
+没有它们。upgrade() 在每次启动时（init_db）补建缺失的对象并按源表回填，
+在此之前 convert_money() 把仍按 NUMERIC 存储的金额列换算为整数分。
+migrate_indexes.py 复用这里的各个步骤，不论是否缺失都重建一遍。
+"""
+import re
+from sqlalchemy import delete
+from sqlalchemy.schema import CreateTable
+from app.config import get_settings
+from app.database import engine, Base
+from app.models.money import Money
+import app.models  # noqa: F401
+import app.models.active_timer  # noqa: F401
+from app.models.plan import plan_intervals_ddl, plan_intervals_backfill, plans_fts_ddl, plans_fts_rebuild
+from app.models.tag import plan_tags_ddl, plans_archive_tags_ddl, transaction_tags_ddl, tags_backfill
+from app.models.ledger import ledger_ddl, balance_snapshots_ddl, ledger_backfill
+from app.models.finance_summary import finance_summary_ddl, finance_summary_backfill
+from app.models.time_rollup import DailyTimeRollup, daily_rollup_backfill
+from app.services.project_service import recount_plans
+
+# 名称在 DDL 中给出的对象（触发器、虚拟表）
+_CREATED_NAME = re.compile(r"CREATE (?:VIRTUAL TABLE|TRIGGER) IF NOT EXISTS (\w+)")
+
+
+def add_columns(sync_conn):
+    """为旧数据库补充后来加入的字段（需在建索引之前）"""
+    columns = {row[1] for row in sync_conn.exec_driver_sql("PRAGMA table_info(transactions)")}
+    if "import_hash" not in columns:
+        sync_conn.exec_driver_sql("ALTER TABLE transactions ADD COLUMN import_hash VARCHAR(64)")
+        print("✓ transactions: import_hash")
+
+    columns = {row[1] for row in sync_conn.exec_driver_sql("PRAGMA table_info(projects)")}
+    counters = [column for column in ("plan_total", "plan_completed") if column not in columns]
+    for column in counters:
+        sync_conn.exec_driver_sql(f"ALTER TABLE projects ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        print(f"✓ projects: {column}")
+    if counters:
+        # 计数此后由计划写入增量维护，先按现有计划算出起点
+        sync_conn.execute(recount_plans())
+
+
+def rebuild_daily_rollup(sync_conn):
+    """按计时记录重建每日计时汇总（旧版本可能写入了重复的键），需在建唯一索引之前"""
+    sync_conn.execute(delete(DailyTimeRollup))
+    sync_conn.execute(daily_rollup_backfill)
+    # Superseded by ux_daily_time_rollup_key
+    sync_conn.exec_driver_sql("DROP INDEX IF EXISTS ix_daily_time_rollup_day_project_plan")
+    print("✓ timer_sessions: daily_time_rollup")
+
+
+def _indexes(sync_conn) -> set:
+    return set(sync_conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+def create_indexes(sync_conn):
+    """为已存在的表补建模型中声明的索引"""
+    existing = _indexes(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(sync_conn)
+                print(f"✓ {table.name}: {index.name}")
+
+
+def create_plan_intervals(sync_conn):
+    """创建计划时间区间的 R*Tree 索引及同步触发器，并填入现有计划"""
+    for statement in plan_intervals_ddl:
+        sync_conn.execute(statement)
+    sync_conn.execute(plan_intervals_backfill)
+    print("✓ plans: plan_intervals")
+
+
+def create_plans_fts(sync_conn):
+    """创建计划全文索引及同步触发器，并重建索引内容（已有的索引按当前分词方式重建）"""
+    sync_conn.exec_driver_sql("DROP TABLE IF EXISTS plans_fts")
+    for statement in plans_fts_ddl:
+        sync_conn.execute(statement)
+    sync_conn.execute(plans_fts_rebuild)
+    print("✓ plans: plans_fts")
+
+
+def create_tag_links(sync_conn):
+    """创建标签同步触发器，并按计划（含归档）和交易的 tags 重建标签关联表"""
+    for statement in plan_tags_ddl + plans_archive_tags_ddl + transaction_tags_ddl + tags_backfill:
+        sync_conn.execute(statement)
+    print("✓ plans, transactions: plan_tags, transaction_tags")
+
+
+def create_ledger(sync_conn):
+    """创建记账分录同步触发器，并按交易重建分录（余额快照随后重新生成）"""
+    for statement in ledger_ddl + balance_snapshots_ddl + ledger_backfill:
+        sync_conn.execute(statement)
+    # Superseded by ix_postings_account_order
+    sync_conn.exec_driver_sql("DROP INDEX IF EXISTS ix_postings_account_date")
+    print("✓ transactions: postings")
+
+
+def create_finance_summary(sync_conn):
+    """创建月度收支汇总同步触发器，并按交易重建汇总"""
+    for statement in finance_summary_ddl + finance_summary_backfill:
+        sync_conn.execute(statement)
+    print("✓ transactions: monthly_finance_summary")
+
+
+def rebuild_table(sync_conn, table, expressions=None):
+    """按模型定义重建表并保留数据（SQLite 不能修改已有约束和列类型），expressions 给出需换算列的取值"""
+    expressions = expressions or {}
+    columns = {row[1] for row in sync_conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+    names = [column.name for column in table.columns if column.name in columns]
+    values = ", ".join(expressions.get(name, name) for name in names)
+
+    create = str(CreateTable(table).compile(dialect=sync_conn.dialect))
+    sync_conn.exec_driver_sql(
+        create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {table.name}_new ", 1)
+    )
+    sync_conn.exec_driver_sql(
+        f"INSERT INTO {table.name}_new ({', '.join(names)}) SELECT {values} FROM {table.name}"
+    )
+    # 旧表的索引和触发器随表删除，由调用方重新创建
+    sync_conn.exec_driver_sql(f"DROP TABLE {table.name}")
+    sync_conn.exec_driver_sql(f"ALTER TABLE {table.name}_new RENAME TO {table.name}")
+    for index in table.indexes:
+        index.create(sync_conn)
+    print(f"✓ Rebuilt {table.name}")
+
+
+def convert_money(sync_conn) -> bool:
+    """把仍按 NUMERIC（SQLite 中为浮点数）存储的金额列换算为整数分，并重建分录和汇总"""
+    tables = []
+    for table in Base.metadata.sorted_tables:
+        names = [column.name for column in table.columns if isinstance(column.type, Money)]
+        declared = {row[1]: row[2] for row in sync_conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+        if any(declared.get(name, "INTEGER") != "INTEGER" for name in names):
+            tables.append((table, names))
+    if not tables:
+        return False
+
+    sync_conn.exec_driver_sql("BEGIN")
+    # 这些表上的触发器引用其他待重建的表，重命名时会因引用的表暂不存在而失败，先删除后重建
+    rebuilt = ", ".join(f"'{table.name}'" for table, _ in tables)
+    triggers = sync_conn.exec_driver_sql(
+        f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({rebuilt})"
+    ).scalars().all()
+    for trigger in triggers:
+        sync_conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+    for table, names in tables:
+        rebuild_table(sync_conn, table, {name: f"CAST(round({name} * 100) AS INTEGER)" for name in names})
+    # 恢复触发器，分录、快照和月度汇总按换算后的金额重新生成
+    create_tag_links(sync_conn)
+    create_ledger(sync_conn)
+    create_finance_summary(sync_conn)
+
+    violations = sync_conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+    if violations:
+        raise RuntimeError(f"Foreign key violations after rebuild: {violations}")
+    return True
+
+
+async def without_foreign_keys(rebuild) -> bool:
+    """在关闭外键检查的连接上重建表（该设置只能在事务外修改），有改动时提交"""
+    settings = get_settings()
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            changed = await conn.run_sync(rebuild)
+            if changed:
+                await conn.commit()
+        finally:
+            await conn.exec_driver_sql(
+                f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}"
+            )
+    return changed
+
+
+def _missing(sync_conn, statements) -> bool:
+    """statements 创建的触发器或虚拟表是否有缺失"""
+    names = {match.group(1) for match in (_CREATED_NAME.match(s.statement) for s in statements) if match}
+    existing = set(sync_conn.exec_driver_sql("SELECT name FROM sqlite_master").scalars())
+    return not names <= existing
+
+
+def _fts_outdated(sync_conn) -> bool:
+    """plans_fts 是否仍用旧版本的 unicode61 分词（中文连续的字整段是一个词，搜不到其中的词）"""
+    sql = sync_conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'plans_fts'").scalar()
+    return sql is not None and "trigram" not in sql
+
+
+# 随表创建的派生对象：创建它们的 DDL，以及缺失时创建并回填的步骤
+DERIVED_OBJECTS = [
+    (plan_intervals_ddl, create_plan_intervals),
+    (plans_fts_ddl, create_plans_fts),
+    (plan_tags_ddl + plans_archive_tags_ddl + transaction_tags_ddl, create_tag_links),
+    (ledger_ddl + balance_snapshots_ddl, create_ledger),
+    # Whole months are read from the summary alone, so it must be complete
+    (finance_summary_ddl, create_finance_summary),
+]
+
+
+def upgrade(sync_conn):
+    """补建旧数据库缺失的字段、索引和派生对象（已存在的不重复创建或回填）"""
+    add_columns(sync_conn)
+    if "ux_daily_time_rollup_key" not in _indexes(sync_conn):
+        rebuild_daily_rollup(sync_conn)
+    create_indexes(sync_conn)
+    for statements, create in DERIVED_OBJECTS:
+        if _missing(sync_conn, statements):
+            create(sync_conn)
+    if _fts_outdated(sync_conn):
+        create_plans_fts(sync_conn)
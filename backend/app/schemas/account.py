@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, date
 from decimal import Decimal
 
 
@@ -50,3 +50,33 @@ class AccountSummary(BaseModel):
     net_worth: Decimal  # 净资产
     asset_accounts: list[AccountResponse]
     liability_accounts: list[AccountResponse]
+
+
+class BalancePoint(BaseModel):
+    """某日结束时的账户余额"""
+    date: date
+    balance: Decimal
+
+
+class NetWorthPoint(BaseModel):
+    """某日结束时的资产、负债和净资产"""
+    date: date
+    total_assets: Decimal
+    total_liabilities: Decimal
+    net_worth: Decimal
+
+
+class BalanceDrift(BaseModel):
+    """存储余额与按交易重算的余额不一致的账户"""
+    account_id: int
+    name: str
+    balance: Decimal  # 当前存储的余额
+    expected_balance: Decimal  # 初始余额 + 全部交易
+    drift: Decimal  # balance - expected_balance
+
+
+class BalanceReconciliation(BaseModel):
+    """余额核对结果"""
+    checked: int  # 核对的账户数
+    drifted: list[BalanceDrift]
+    fixed: int  # 已修正的账户数
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -64,6 +64,7 @@ class TransactionResponse(TransactionBase):
     category_color: Optional[str] = None
     from_account_name: Optional[str] = None
     to_account_name: Optional[str] = None
+    running_balance: Optional[Decimal] = None  # 账户在该笔交易后的余额，仅按账户查询时返回
     
     class Config:
         from_attributes = True
@@ -74,3 +75,11 @@ class FinanceSummary(BaseModel):
     total_expense: Decimal
     balance: Decimal
     period: str
+
+
+class ImportResult(BaseModel):
+    """Outcome of a statement import"""
+    imported: int  # new transactions
+    duplicates: int  # lines already imported earlier
+    skipped: int  # zero-amount lines
+    balance_changes: Dict[int, Decimal]  # account_id -> balance delta
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -41,6 +41,7 @@ class PlanResponse(PlanBase):
     updated_at: datetime
     project_name: Optional[str] = None
     children_count: int = 0
+    snippet: Optional[str] = None  # safe HTML: escaped matched text with <mark> highlights, for ?q= searches
     
     class Config:
         from_attributes = True
@@ -51,3 +52,54 @@ class PlanTree(PlanResponse):
     
     class Config:
         from_attributes = True
+
+
+class PlanBulkUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    project_id: Optional[int] = None
+    priority_matrix: Optional[str] = None
+    status: Optional[str] = None
+    tags: Optional[List[str]] = None
+    
+    @field_validator("priority_matrix", "status", "tags")
+    @classmethod
+    def not_null(cls, value):
+        """These may be left out but not set to null; project_id null unassigns the project"""
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class PlanBulk(BaseModel):
+    create: List[PlanCreate] = []
+    update: List[PlanBulkUpdate] = []
+    delete: List[int] = []  # subtrees are deleted too
+
+
+class PlanBulkResult(BaseModel):
+    created: List[PlanResponse]
+    updated: int
+    deleted: int
+
+
+class TimeSlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    exclude_id: Optional[int] = None  # plan being rescheduled
+
+
+class ConflictCheck(BaseModel):
+    slots: List[TimeSlot] = Field(..., min_length=1, max_length=200)
+
+
+class PlanConflict(BaseModel):
+    id: int
+    title: str
+    start_time: datetime
+    end_time: datetime
+
+
+class SlotConflicts(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    conflicts: List[PlanConflict] = []
@@ -31,9 +31,15 @@ class ProjectResponse(ProjectBase):
     id: int
     status: str
     progress: Decimal
+    plan_total: int = 0
+    plan_completed: int = 0
     created_at: datetime
     updated_at: datetime
     plan_count: int = 0
+    # Only filled in by GET /projects?include_stats=true
+    tracked_seconds: Optional[int] = None
+    total_income: Optional[Decimal] = None
+    total_expense: Optional[Decimal] = None
     
     class Config:
         from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from decimal import Decimal
+
+
+class TagStats(BaseModel):
+    id: int
+    name: str
+    plan_count: int = 0
+    transaction_count: int = 0
+    tracked_seconds: int = 0
+    total_income: Decimal = Decimal("0")
+    total_expense: Decimal = Decimal("0")
+    
+    class Config:
+        from_attributes = True
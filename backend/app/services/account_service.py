@@ -1,13 +1,69 @@
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, insert, func, and_, or_, case, true, union_all, bindparam, type_coerce
 from typing import List, Optional
 from decimal import Decimal
+from datetime import date, timedelta
 from app.models.account import Account
+from app.models.ledger import Posting, BalanceSnapshot
+from app.models.money import Money
 from app.models.transaction import Transaction
-from app.schemas.account import AccountCreate, AccountUpdate, AccountSummary, AccountResponse
+from app.schemas.account import (
+    AccountCreate, AccountUpdate, AccountSummary, AccountResponse, BalancePoint, NetWorthPoint,
+    BalanceDrift, BalanceReconciliation
+)
+from app.utils.cache import statistics_cache
+
+# 余额序列最多返回的时间点数
+MAX_SERIES_POINTS = 1000
+
+# 增加转入账户余额、减少转出账户余额的交易类型（与 AccountingService._balance_deltas 一致）
+INFLOW_TYPES = ('income', 'transfer', 'repayment')
+OUTFLOW_TYPES = ('expense', 'transfer', 'repayment')
+
+# Columns of the account responses, in AccountResponse field order
+ACCOUNT_FIELDS = list(AccountResponse.model_fields)
+
+# 可用余额：负债账户为信用额度 + 余额（余额为负表示欠款，无额度即为余额），资产账户为余额
+AVAILABLE_BALANCE = case(
+    (Account.type == 'liability', Account.balance + func.coalesce(Account.credit_limit, 0)),
+    else_=Account.balance
+)
+
+
+def account_response(row) -> AccountResponse:
+    """由 ACCOUNT_FIELDS 顺序的查询行构造响应"""
+    return AccountResponse.model_validate(dict(zip(ACCOUNT_FIELDS, row)))
+
+
+def series_points(start_date: date, end_date: date, interval: str = "month") -> List[date]:
+    """余额序列的时间点：按日，或每月月末（最后一点为 end_date）"""
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    
+    points = []
+    day = start_date
+    while day < end_date and len(points) <= MAX_SERIES_POINTS:
+        if interval == "day":
+            points.append(day)
+            day += timedelta(days=1)
+        else:
+            month_end = (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            if month_end >= end_date:
+                break
+            points.append(month_end)
+            day = month_end + timedelta(days=1)
+    points.append(end_date)
+    
+    if len(points) > MAX_SERIES_POINTS:
+        raise ValueError(f"Too many points, at most {MAX_SERIES_POINTS} per series")
+    return points
 
 
 class AccountService:
+    # 本进程最近一次写快照时所在月份的第一天；跨月后第一次读余额时补写上月快照
+    _snapshot_month: Optional[date] = None
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -28,6 +84,36 @@ class AccountService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def get_responses(
+        self,
+        type: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        account_id: Optional[int] = None
+    ) -> List[AccountResponse]:
+        """账户列表或详情的响应，按列投影查询（含可用余额），不加载 ORM 对象"""
+        query = self._response_query()
+        
+        if type:
+            query = query.where(Account.type == type)
+        if is_active is not None:
+            query = query.where(Account.is_active == is_active)
+        if account_id is not None:
+            query = query.where(Account.id == account_id)
+        
+        result = await self.db.execute(query)
+        return [account_response(row) for row in result.all()]
+    
+    def _response_query(self, *columns):
+        """ACCOUNT_FIELDS 顺序的列投影（可追加列），排序与 get_all 一致"""
+        fields = {
+            **{column.key: column for column in Account.__table__.columns},
+            'available_balance': AVAILABLE_BALANCE,
+        }
+        return (
+            select(*(fields[name].label(name) for name in ACCOUNT_FIELDS), *columns)
+            .order_by(Account.is_default.desc(), Account.created_at.desc())
+        )
+    
     async def get_by_id(self, account_id: int) -> Optional[Account]:
         """根据ID获取账户"""
         result = await self.db.execute(
@@ -47,6 +133,7 @@ class AccountService:
         self.db.add(account)
         await self.db.commit()
         await self.db.refresh(account)
+        statistics_cache.invalidate("accounts")
         return account
     
     async def update(self, account_id: int, data: AccountUpdate) -> Optional[Account]:
@@ -66,6 +153,7 @@ class AccountService:
         
         await self.db.commit()
         await self.db.refresh(account)
+        statistics_cache.invalidate("accounts")
         return account
     
     async def delete(self, account_id: int) -> bool:
@@ -92,6 +180,7 @@ class AccountService:
             await self.db.delete(account)
             await self.db.commit()
         
+        statistics_cache.invalidate("accounts")
         return True
     
     async def update_balance(
@@ -99,57 +188,300 @@ class AccountService:
         account_id: int,
         amount: Decimal,
         operation: str = 'add'
-    ) -> Optional[Account]:
-        """更新账户余额"""
-        account = await self.get_by_id(account_id)
-        if not account:
-            return None
-        
+    ) -> bool:
+        """在当前事务中原子地更新账户余额，由调用方提交"""
         if operation == 'add':
-            account.balance += amount
+            delta = amount
         elif operation == 'subtract':
-            account.balance -= amount
+            delta = -amount
         else:
             raise ValueError(f"Invalid operation: {operation}")
         
-        await self.db.commit()
-        await self.db.refresh(account)
-        return account
+        result = await self.db.execute(
+            update(Account)
+            .where(Account.id == account_id)
+            .values(balance=Account.balance + delta)
+        )
+        return result.rowcount > 0
     
-    async def get_summary(self) -> AccountSummary:
-        """获取账户汇总"""
-        # 获取所有活跃账户
-        accounts = await self.get_all(is_active=True)
+    async def reconcile_balances(self, fix: bool = False) -> BalanceReconciliation:
+        """按初始余额和全部交易重算账户余额，报告偏差；fix=True 时在同一事务中修正"""
+        result = await self.db.execute(self._expected_balances())
+        rows = result.all()
         
-        asset_accounts = []
-        liability_accounts = []
-        total_assets = Decimal('0')
-        total_liabilities = Decimal('0')
+        drifted = []
+        for account_id, name, balance, expected_balance in rows:
+            if balance != expected_balance:
+                drifted.append(BalanceDrift(
+                    account_id=account_id,
+                    name=name,
+                    balance=balance,
+                    expected_balance=expected_balance,
+                    drift=balance - expected_balance
+                ))
         
-        for account in accounts:
-            # 计算可用余额
-            if account.type == 'asset':
-                available_balance = account.balance
-                total_assets += account.balance
-                asset_accounts.append(self._to_response(account, available_balance))
-            else:  # liability
-                # 负债账户：余额为负数表示欠款
-                if account.credit_limit:
-                    # 信用卡：可用额度 = 信用额度 + 余额（余额为负）
-                    available_balance = account.credit_limit + account.balance
-                else:
-                    # 普通负债：可用余额就是余额
-                    available_balance = account.balance
-                
-                total_liabilities += abs(account.balance)
-                liability_accounts.append(self._to_response(account, available_balance))
+        fixed = 0
+        if fix and drifted:
+            # 减去偏差而不是直接赋值：期间写入的交易同时改变余额和应得余额，偏差不变
+            accounts = Account.__table__
+            await self.db.execute(
+                update(accounts)
+                .where(accounts.c.id == bindparam("account_id"))
+                .values(balance=accounts.c.balance - bindparam("drift")),
+                [{"account_id": item.account_id, "drift": item.drift} for item in drifted]
+            )
+            fixed = len(drifted)
+            await self.db.commit()
+            statistics_cache.invalidate("accounts")
+        
+        return BalanceReconciliation(checked=len(rows), drifted=drifted, fixed=fixed)
+    
+    def _expected_balances(self):
+        """每个账户的存储余额和按交易应得的余额
+        
+        转入、转出两侧各按账户分组汇总一次，均走 (账户, type, amount) 覆盖索引，
+        按索引顺序聚合，无需回表或排序。
+        """
+        inflow = (
+            select(
+                Transaction.to_account_id.label("account_id"),
+                func.sum(case((Transaction.type.in_(INFLOW_TYPES), Transaction.amount), else_=0))
+                .label("amount")
+            )
+            .group_by(Transaction.to_account_id)
+        )
+        outflow = (
+            select(
+                Transaction.from_account_id,
+                -func.sum(case((Transaction.type.in_(OUTFLOW_TYPES), Transaction.amount), else_=0))
+            )
+            .group_by(Transaction.from_account_id)
+        )
+        legs = union_all(inflow, outflow).subquery()
+        totals = (
+            select(legs.c.account_id, func.sum(legs.c.amount).label("amount"))
+            .group_by(legs.c.account_id)
+            .subquery()
+        )
+        
+        return (
+            select(
+                Account.id,
+                Account.name,
+                Account.balance,
+                Account.initial_balance + func.coalesce(totals.c.amount, 0)
+            )
+            .outerjoin(totals, totals.c.account_id == Account.id)
+            .order_by(Account.id)
+        )
+    
+    async def snapshot_balances(self, today: Optional[date] = None) -> int:
+        """为上月及之前有分录的月份补写月末余额快照，返回写入条数
         
+        每个账户从最近一个快照（没有则从初始余额）起按月累加分录，一条
+        INSERT ... SELECT 完成；之后的分录变动由触发器同步到快照。
+        """
+        today = today or date.today()
+        last_month_end = today.replace(day=1) - timedelta(days=1)
+        # 先记下月份，并发的读取不会重复触发
+        AccountService._snapshot_month = today.replace(day=1)
+        
+        latest = (
+            select(
+                BalanceSnapshot.account_id,
+                func.max(BalanceSnapshot.snapshot_date).label("snapshot_date")
+            )
+            .group_by(BalanceSnapshot.account_id)
+            .subquery()
+        )
+        month_end = func.date(Posting.posting_date, "start of month", "+1 month", "-1 day")
+        months = (
+            select(
+                Posting.account_id,
+                month_end.label("snapshot_date"),
+                func.sum(Posting.amount).label("amount")
+            )
+            .outerjoin(latest, latest.c.account_id == Posting.account_id)
+            .where(
+                or_(latest.c.snapshot_date.is_(None), Posting.posting_date > latest.c.snapshot_date),
+                Posting.posting_date <= last_month_end
+            )
+            .group_by(Posting.account_id, month_end)
+            .subquery()
+        )
+        base = func.coalesce(
+            select(BalanceSnapshot.balance)
+            .where(
+                BalanceSnapshot.account_id == months.c.account_id,
+                BalanceSnapshot.snapshot_date == latest.c.snapshot_date
+            )
+            .scalar_subquery(),
+            Account.initial_balance
+        )
+        running = func.sum(months.c.amount).over(
+            partition_by=months.c.account_id,
+            order_by=months.c.snapshot_date
+        )
+        rows = (
+            select(
+                months.c.account_id,
+                months.c.snapshot_date,
+                base + running
+            )
+            .join(Account, Account.id == months.c.account_id)
+            .outerjoin(latest, latest.c.account_id == months.c.account_id)
+        )
+        
+        try:
+            # 其他进程可能刚写入同一月份的快照
+            result = await self.db.execute(
+                insert(BalanceSnapshot).prefix_with("OR IGNORE").from_select(
+                    ["account_id", "snapshot_date", "balance"], rows
+                )
+            )
+            await self.db.commit()
+        except Exception:
+            AccountService._snapshot_month = None
+            raise
+        return result.rowcount
+    
+    async def get_balance_at(self, account_id: int, day: date) -> Optional[Decimal]:
+        """账户在某日结束时的余额：最近快照 + 其后的分录（按索引查找，不回放全部交易）"""
+        rows = await self._balance_series([day], account_id)
+        return rows[0]["balance"] if rows else None
+    
+    async def get_balance_history(
+        self,
+        account_id: int,
+        start_date: date,
+        end_date: date,
+        interval: str = "month"
+    ) -> List[BalancePoint]:
+        """账户余额序列"""
+        rows = await self._balance_series(series_points(start_date, end_date, interval), account_id)
+        return [BalancePoint(date=row["date"], balance=row["balance"]) for row in rows]
+    
+    async def get_net_worth_series(
+        self,
+        start_date: date,
+        end_date: date,
+        interval: str = "month"
+    ) -> List[NetWorthPoint]:
+        """净资产序列，包含已停用账户在停用前的余额"""
+        rows = await self._balance_series(series_points(start_date, end_date, interval))
+        
+        points = {}
+        for row in rows:
+            point = points.setdefault(row["date"], [Decimal('0'), Decimal('0')])
+            if row["type"] == 'asset':
+                point[0] += row["balance"]
+            else:
+                point[1] += abs(row["balance"])
+        
+        return [
+            NetWorthPoint(
+                date=day,
+                total_assets=assets,
+                total_liabilities=liabilities,
+                net_worth=assets - liabilities
+            )
+            for day, (assets, liabilities) in points.items()
+        ]
+    
+    async def _balance_series(
+        self,
+        points: List[date],
+        account_id: Optional[int] = None
+    ) -> List[dict]:
+        """各账户在每个时间点的余额，一条查询完成
+        
+        余额 = 该点之前最近的快照（没有则为初始余额）+ 快照之后到该点的分录，
+        快照和分录都按 (account_id, 日期) 索引查找。
+        """
+        if AccountService._snapshot_month != date.today().replace(day=1):
+            # 进程跨月运行：补写刚结束月份的快照，免得从更早的快照起累加分录
+            await self.snapshot_balances()
+        
+        days = func.json_each(json.dumps([day.isoformat() for day in points])).table_valued("value")
+        latest = (
+            select(func.max(BalanceSnapshot.snapshot_date))
+            .where(
+                BalanceSnapshot.account_id == Account.id,
+                BalanceSnapshot.snapshot_date <= days.c.value
+            )
+            .scalar_subquery()
+        )
+        grid = (
+            select(
+                days.c.value.label("day"),
+                Account.id.label("account_id"),
+                Account.type,
+                Account.initial_balance,
+                latest.label("snapshot_date")
+            )
+            .select_from(days)
+            .join(Account, true())
+        )
+        if account_id is not None:
+            grid = grid.where(Account.id == account_id)
+        grid = grid.subquery()
+        
+        base = func.coalesce(
+            select(BalanceSnapshot.balance)
+            .where(
+                BalanceSnapshot.account_id == grid.c.account_id,
+                BalanceSnapshot.snapshot_date == grid.c.snapshot_date
+            )
+            .scalar_subquery(),
+            grid.c.initial_balance
+        )
+        delta = (
+            select(func.coalesce(func.sum(Posting.amount), 0))
+            .where(
+                Posting.account_id == grid.c.account_id,
+                Posting.posting_date <= grid.c.day,
+                or_(grid.c.snapshot_date.is_(None), Posting.posting_date > grid.c.snapshot_date)
+            )
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(grid.c.day, grid.c.account_id, grid.c.type, type_coerce(base + delta, Money))
+            .order_by(grid.c.day, grid.c.account_id)
+        )
+        
+        return [
+            {
+                "date": date.fromisoformat(day),
+                "account_id": id,
+                "type": type,
+                "balance": balance
+            }
+            for day, id, type, balance in result.all()
+        ]
+    
+    async def get_summary(self) -> AccountSummary:
+        """获取活跃账户汇总，一条查询完成
+        
+        每个账户的可用余额由 AVAILABLE_BALANCE 计算，总资产、总负债是同一查询上的
+        窗口求和，不再加载 ORM 对象逐个累加。
+        """
+        total_assets = func.sum(case((Account.type == 'asset', Account.balance), else_=0)).over()
+        total_liabilities = func.sum(
+            case((Account.type == 'liability', type_coerce(func.abs(Account.balance), Money)), else_=0)
+        ).over()
+        result = await self.db.execute(
+            self._response_query(total_assets, total_liabilities).where(Account.is_active == True)
+        )
+        rows = result.all()
+        
+        total_assets, total_liabilities = rows[0][-2:] if rows else (Decimal('0'), Decimal('0'))
+        accounts = [account_response(row) for row in rows]
         return AccountSummary(
             total_assets=total_assets,
             total_liabilities=total_liabilities,
             net_worth=total_assets - total_liabilities,
-            asset_accounts=asset_accounts,
-            liability_accounts=liability_accounts
+            asset_accounts=[account for account in accounts if account.type == 'asset'],
+            liability_accounts=[account for account in accounts if account.type == 'liability']
         )
     
     async def _clear_default_accounts(self, account_type: str):
@@ -166,23 +498,3 @@ class AccountService:
         for account in accounts:
             account.is_default = False
         await self.db.commit()
-    
-    def _to_response(self, account: Account, available_balance: Decimal) -> AccountResponse:
-        """转换为响应模型"""
-        return AccountResponse(
-            id=account.id,
-            name=account.name,
-            type=account.type,
-            sub_type=account.sub_type,
-            balance=account.balance,
-            initial_balance=account.initial_balance,
-            credit_limit=account.credit_limit,
-            icon=account.icon,
-            color=account.color,
-            description=account.description,
-            is_active=account.is_active,
-            is_default=account.is_default,
-            available_balance=available_balance,
-            created_at=account.created_at,
-            updated_at=account.updated_at
-        )
@@ -1,12 +1,91 @@
+import hashlib
+from itertools import islice
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract
-from typing import List, Optional
+from sqlalchemy import select, insert, func, and_, extract, null, tuple_, type_coerce, union_all, Date, String
+from sqlalchemy.orm import aliased
+from typing import Dict, Iterable, List, Optional
 from datetime import date, timedelta
 from decimal import Decimal
+from app.config import get_settings
 from app.models.transaction import Transaction, Category
 from app.models.account import Account
-from app.schemas.accounting import TransactionCreate, TransactionUpdate, CategoryCreate, FinanceSummary
+from app.models.ledger import Posting
+from app.models.money import Money
+from app.models.finance_summary import MonthlyFinanceSummary
+from app.schemas.accounting import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, CategoryCreate, FinanceSummary, ImportResult
+)
 from app.services.account_service import AccountService
+from app.services.tag_service import tagged_transactions
+from app.utils.cache import statistics_cache
+from app.utils.pagination import Page, decode_cursor, keyset_paginate, row_page
+from app.utils.statements import StatementRow
+
+# Columns of the transaction list, in response order
+TRANSACTION_FIELDS = list(TransactionResponse.model_fields)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def finance_totals(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    keys: List[str],
+    types: List[str]
+):
+    """UNION ALL of transaction totals per keys, for types, within a range.
+    
+    Months wholly inside the range are read from monthly_finance_summary; only
+    the days of a partial first or last month are summed from transactions.
+    keys name summary columns; callers add up the rows that share a key.
+    """
+    summary = MonthlyFinanceSummary
+    full_start = start_date
+    if start_date and start_date.day != 1:
+        full_start = _next_month(start_date)
+    # Exclusive: the month after end_date's, unless end_date ends its month
+    full_end = end_date and (end_date + timedelta(days=1)).replace(day=1)
+    
+    parts = []
+    if full_start and full_end and full_start >= full_end:
+        partial = [(start_date, end_date)]
+    else:
+        partial = [
+            (low, high) for low, high in (
+                (start_date, full_start and full_start - timedelta(days=1)),
+                (full_end, end_date)
+            )
+            if low and high and low <= high
+        ]
+        columns = [getattr(summary, key) for key in keys]
+        months = select(
+            *columns, func.sum(summary.total).label('total')
+        ).where(summary.type.in_(types))
+        if full_start:
+            months = months.where(summary.month >= full_start)
+        if full_end:
+            months = months.where(summary.month < full_end)
+        parts.append(months.group_by(*columns))
+    
+    columns = [
+        func.date(Transaction.transaction_date, 'start of month', type_=Date).label(key)
+        if key == 'month' else getattr(Transaction, key)
+        for key in keys
+    ]
+    for low, high in partial:
+        parts.append(
+            select(
+                *columns, func.sum(Transaction.amount).label('total')
+            ).where(
+                Transaction.type.in_(types),
+                Transaction.transaction_date >= low,
+                Transaction.transaction_date <= high
+            ).group_by(*columns)
+        )
+    
+    return union_all(*parts) if len(parts) > 1 else parts[0]
 
 
 class AccountingService:
@@ -33,6 +112,7 @@ class AccountingService:
         self.db.add(category)
         await self.db.commit()
         await self.db.refresh(category)
+        statistics_cache.invalidate("categories")
         return category
     
     # Transaction operations
@@ -44,15 +124,36 @@ class AccountingService:
         category_id: Optional[int] = None,
         account_id: Optional[int] = None,
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
-    ) -> List[Transaction]:
-        """Get transactions with filters"""
-        from sqlalchemy.orm import selectinload
-        
-        query = select(Transaction).options(
-            selectinload(Transaction.category),
-            selectinload(Transaction.from_account),
-            selectinload(Transaction.to_account)
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        running_balance: bool = False
+    ) -> Page:
+        """Get transactions with filters, newest first.
+        
+        One joined column projection, in TransactionResponse field order; rows
+        are returned as-is, without ORM objects or relationship loading.
+        running_balance adds account_id's balance after each row.
+        """
+        if running_balance and not account_id:
+            raise ValueError("running_balance requires account_id")
+        
+        from_account = aliased(Account)
+        to_account = aliased(Account)
+        columns = {
+            **{column.key: column for column in Transaction.__table__.columns},
+            'category_name': Category.name,
+            'category_icon': Category.icon,
+            'category_color': Category.color,
+            'from_account_name': from_account.name,
+            'to_account_name': to_account.name,
+            'running_balance': null(),
+        }
+        query = (
+            select(*(columns[name].label(name) for name in TRANSACTION_FIELDS))
+            .outerjoin(Category, Category.id == Transaction.category_id)
+            .outerjoin(from_account, from_account.id == Transaction.from_account_id)
+            .outerjoin(to_account, to_account.id == Transaction.to_account_id)
         )
         
         if type:
@@ -68,23 +169,65 @@ class AccountingService:
             query = query.where(Transaction.transaction_date >= start_date)
         if end_date:
             query = query.where(Transaction.transaction_date <= end_date)
+        if tags:
+            query = query.where(Transaction.id.in_(tagged_transactions(tags)))
         
-        query = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit)
+        query = keyset_paginate(
+            query, Transaction.transaction_date, Transaction.id, limit, cursor
+        ).offset(skip)
+        if running_balance:
+            query = self._with_running_balance(query, account_id, cursor)
         result = await self.db.execute(query)
-        transactions = list(result.scalars().all())
-        
-        # Populate account names
-        for transaction in transactions:
-            if transaction.category:
-                transaction.category_name = transaction.category.name
-                transaction.category_icon = transaction.category.icon
-                transaction.category_color = transaction.category.color
-            if transaction.from_account:
-                transaction.from_account_name = transaction.from_account.name
-            if transaction.to_account:
-                transaction.to_account_name = transaction.to_account.name
-        
-        return transactions
+        return row_page(result.all(), limit)
+    
+    def _with_running_balance(self, query, account_id: int, cursor: Optional[str] = None):
+        """Fill in running_balance for one page of the transaction list.
+        
+        The window runs over all of the account's postings, but only rows of
+        this page leave it, so the join stays the size of the page.
+        """
+        page = query.cte("page")
+        balances = self._running_balances(account_id, cursor)
+        balances = (
+            select(balances)
+            .where(balances.c.transaction_id.in_(select(page.c.id)))
+            # One row per transaction, whichever leg it came from
+            .distinct()
+            .subquery()
+        )
+        columns = {name: page.c[name] for name in TRANSACTION_FIELDS}
+        columns['running_balance'] = balances.c.balance
+        return (
+            select(*(columns[name].label(name) for name in TRANSACTION_FIELDS), page.c.cursor_key)
+            .outerjoin(balances, balances.c.transaction_id == page.c.id)
+            .order_by(page.c.cursor_key.desc(), page.c.id.desc())
+        )
+    
+    def _running_balances(self, account_id: int, cursor: Optional[str] = None):
+        """Balance of account_id after each of its transactions, up to cursor.
+        
+        A running sum over the account's postings in list order, read straight
+        from ix_postings_account_order; postings from the cursor on are left
+        out, since rows of later pages only depend on what precedes them.
+        """
+        query = select(Posting.transaction_id).where(Posting.account_id == account_id)
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(type_coerce(Posting.posting_date, String), Posting.transaction_id)
+                < tuple_(value, last_id)
+            )
+        initial_balance = (
+            select(Account.initial_balance).where(Account.id == account_id).scalar_subquery()
+        )
+        # Both legs of a transfer within one account are peers in the default
+        # RANGE frame, so both get the balance after the whole transaction
+        running = func.sum(Posting.amount).over(
+            order_by=(Posting.posting_date, Posting.transaction_id)
+        )
+        return query.add_columns(
+            type_coerce(initial_balance + running, Money).label("balance")
+        ).subquery()
     
     async def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID"""
@@ -98,54 +241,12 @@ class AccountingService:
         transaction = Transaction(**data.model_dump())
         self.db.add(transaction)
         
-        # 更新账户余额
-        if data.type == 'income':
-            # 收入：增加目标账户余额
-            if data.to_account_id:
-                await self.account_service.update_balance(
-                    data.to_account_id,
-                    data.amount,
-                    'add'
-                )
-        elif data.type == 'expense':
-            # 支出：减少源账户余额
-            if data.from_account_id:
-                await self.account_service.update_balance(
-                    data.from_account_id,
-                    data.amount,
-                    'subtract'
-                )
-        elif data.type == 'transfer':
-            # 转账：减少源账户，增加目标账户
-            if data.from_account_id:
-                await self.account_service.update_balance(
-                    data.from_account_id,
-                    data.amount,
-                    'subtract'
-                )
-            if data.to_account_id:
-                await self.account_service.update_balance(
-                    data.to_account_id,
-                    data.amount,
-                    'add'
-                )
-        elif data.type == 'repayment':
-            # 还款：减少源账户（资产），增加目标账户（负债，使其接近0）
-            if data.from_account_id:
-                await self.account_service.update_balance(
-                    data.from_account_id,
-                    data.amount,
-                    'subtract'
-                )
-            if data.to_account_id:
-                await self.account_service.update_balance(
-                    data.to_account_id,
-                    data.amount,
-                    'add'
-                )
+        # 更新账户余额，与交易写入同一事务提交
+        await self._apply_balance_deltas(self._balance_deltas(transaction))
         
         await self.db.commit()
         await self.db.refresh(transaction)
+        self._invalidate_statistics(transaction.transaction_date)
         return transaction
     
     async def update(
@@ -158,19 +259,24 @@ class AccountingService:
         if not transaction:
             return None
         
-        # 先恢复原来的账户余额
-        await self._revert_transaction_balance(transaction)
+        old_date = transaction.transaction_date
+        
+        # 先撤销原来的账户余额影响
+        deltas = self._balance_deltas(transaction, sign=-1)
         
         # 更新交易数据
         update_data = data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(transaction, field, value)
         
-        # 应用新的账户余额变化
-        await self._apply_transaction_balance(transaction)
+        # 合并新的账户余额变化，每个账户只更新一次
+        for account_id, delta in self._balance_deltas(transaction).items():
+            deltas[account_id] = deltas.get(account_id, Decimal('0')) + delta
+        await self._apply_balance_deltas(deltas)
         
         await self.db.commit()
         await self.db.refresh(transaction)
+        self._invalidate_statistics(old_date, transaction.transaction_date)
         return transaction
     
     async def delete(self, transaction_id: int) -> bool:
@@ -180,97 +286,167 @@ class AccountingService:
             return False
         
         # 恢复账户余额
-        await self._revert_transaction_balance(transaction)
+        await self._apply_balance_deltas(self._balance_deltas(transaction, sign=-1))
         
         await self.db.delete(transaction)
         await self.db.commit()
+        self._invalidate_statistics(transaction.transaction_date)
         return True
     
-    async def _revert_transaction_balance(self, transaction: Transaction):
-        """恢复交易对账户余额的影响"""
-        if transaction.type == 'income':
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
-        elif transaction.type == 'expense':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'add'
-                )
-        elif transaction.type == 'transfer':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'add'
-                )
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
-        elif transaction.type == 'repayment':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'add'
-                )
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
+    async def import_statement(
+        self,
+        account_id: int,
+        rows: Iterable[StatementRow],
+        batch_size: Optional[int] = None
+    ) -> Optional[ImportResult]:
+        """Import statement rows for one account in a single transaction.
+        
+        Rows are consumed lazily and inserted batch by batch with executemany;
+        lines whose content hash is already stored are skipped. Balances are
+        adjusted once per account after the last batch.
+        """
+        account = await self.account_service.get_by_id(account_id)
+        if not account:
+            return None
+        batch_size = batch_size or get_settings().IMPORT_BATCH_SIZE
+        
+        result = await self.db.execute(select(Account.id, Account.name, Account.type))
+        accounts = {name.lower(): (id, type) for id, name, type in result.all()}
+        result = await self.db.execute(select(Category.id, Category.name, Category.type))
+        categories = {(type, name.lower()): id for id, name, type in result.all()}
+        
+        imported = duplicates = skipped = 0
+        deltas: Dict[int, Decimal] = {}
+        days = set()
+        seen: Dict[str, int] = {}
+        
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            values = []
+            for row in batch:
+                if not row.amount:
+                    skipped += 1
+                    continue
+                if row.account and row.account.lower() not in accounts:
+                    raise ValueError(f"Line {row.line}: unknown account {row.account!r}")
+                
+                other = accounts.get(row.account.lower()) if row.account else None
+                values.append(self._import_values(
+                    account, other, categories, row, self._import_hash(account_id, row, seen)
+                ))
+            
+            # One indexed lookup per batch; a reference repeated in the batch counts once
+            unique = {}
+            for value in values:
+                unique.setdefault(value['import_hash'], value)
+            result = await self.db.execute(
+                select(Transaction.import_hash).where(Transaction.import_hash.in_(list(unique)))
+            )
+            existing = set(result.scalars().all())
+            parsed = len(values)
+            values = [value for hash, value in unique.items() if hash not in existing]
+            duplicates += parsed - len(values)
+            if not values:
+                continue
+            
+            await self.db.execute(insert(Transaction), values)
+            imported += len(values)
+            for value in values:
+                for id, delta in self._balance_deltas(Transaction(**value)).items():
+                    deltas[id] = deltas.get(id, Decimal('0')) + delta
+                days.add(value['transaction_date'])
+        
+        await self._apply_balance_deltas(deltas)
+        await self.db.commit()
+        if days:
+            self._invalidate_statistics(*sorted(days))
+        
+        return ImportResult(
+            imported=imported,
+            duplicates=duplicates,
+            skipped=skipped,
+            balance_changes={id: delta for id, delta in sorted(deltas.items()) if delta}
+        )
+    
+    def _import_values(
+        self,
+        account: Account,
+        other: Optional[tuple],
+        categories: Dict,
+        row: StatementRow,
+        import_hash: str
+    ) -> dict:
+        """Transaction columns for a statement row of account"""
+        amount = abs(row.amount)
+        values = {
+            'amount': amount,
+            'transaction_date': row.transaction_date,
+            'description': row.description,
+            'category_id': None,
+            'tags': [],
+            'import_hash': import_hash
+        }
+        
+        if other:
+            # Money moved between two of our accounts
+            other_id, other_type = other
+            if row.amount > 0:
+                from_id, from_type, to_id, to_type = other_id, other_type, account.id, account.type
+            else:
+                from_id, from_type, to_id, to_type = account.id, account.type, other_id, other_type
+            is_repayment = from_type == 'asset' and to_type == 'liability'
+            values.update(
+                type='repayment' if is_repayment else 'transfer',
+                from_account_id=from_id,
+                to_account_id=to_id
+            )
+        elif row.amount > 0:
+            values.update(type='income', from_account_id=None, to_account_id=account.id)
+        else:
+            values.update(type='expense', from_account_id=account.id, to_account_id=None)
+        
+        if row.category and values['type'] in ('income', 'expense'):
+            values['category_id'] = categories.get((values['type'], row.category.lower()))
+        return values
+    
+    def _import_hash(self, account_id: int, row: StatementRow, seen: Dict[str, int]) -> str:
+        """Content hash identifying a statement line across repeated imports"""
+        if row.reference:
+            key = f"{account_id}|ref|{row.reference}"
+        else:
+            key = f"{account_id}|{row.transaction_date}|{row.amount}|{row.description or ''}"
+            # Identical lines on one statement (two coffees that day) get their own hash
+            seen[key] = seen.get(key, 0) + 1
+            key = f"{key}|{seen[key]}"
+        return hashlib.sha256(key.encode()).hexdigest()
     
-    async def _apply_transaction_balance(self, transaction: Transaction):
-        """应用交易对账户余额的影响"""
-        if transaction.type == 'income':
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'add'
-                )
-        elif transaction.type == 'expense':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
-        elif transaction.type == 'transfer':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'add'
-                )
-        elif transaction.type == 'repayment':
-            if transaction.from_account_id:
-                await self.account_service.update_balance(
-                    transaction.from_account_id,
-                    transaction.amount,
-                    'subtract'
-                )
-            if transaction.to_account_id:
-                await self.account_service.update_balance(
-                    transaction.to_account_id,
-                    transaction.amount,
-                    'add'
-                )
+    def _invalidate_statistics(self, *days: date):
+        """Drop cached statistics affected by a transaction write"""
+        for day in days:
+            statistics_cache.invalidate("transactions", day)
+        statistics_cache.invalidate("accounts")
+    
+    def _balance_deltas(self, transaction: Transaction, sign: int = 1) -> Dict[int, Decimal]:
+        """交易对各账户余额的影响，sign=-1 表示撤销"""
+        amount = Decimal(transaction.amount) * sign
+        deltas = {}
+        
+        # 收入、转账、还款：增加目标账户余额（负债账户还款后接近0）
+        if transaction.type in ('income', 'transfer', 'repayment') and transaction.to_account_id:
+            deltas[transaction.to_account_id] = amount
+        
+        # 支出、转账、还款：减少源账户余额
+        if transaction.type in ('expense', 'transfer', 'repayment') and transaction.from_account_id:
+            account_id = transaction.from_account_id
+            deltas[account_id] = deltas.get(account_id, Decimal('0')) - amount
+        
+        return deltas
+    
+    async def _apply_balance_deltas(self, deltas: Dict[int, Decimal]):
+        """以 balance = balance + delta 更新账户余额，不提交事务"""
+        for account_id in sorted(deltas):
+            if deltas[account_id]:
+                await self.account_service.update_balance(account_id, deltas[account_id], 'add')
     
     async def get_summary(
         self,
@@ -278,20 +454,13 @@ class AccountingService:
         end_date: Optional[date] = None
     ) -> FinanceSummary:
         """Get financial summary"""
-        query = select(
-            Transaction.type,
-            func.sum(Transaction.amount)
-        ).where(Transaction.type.in_(['income', 'expense']))
-        
-        if start_date:
-            query = query.where(Transaction.transaction_date >= start_date)
-        if end_date:
-            query = query.where(Transaction.transaction_date <= end_date)
-        
-        query = query.group_by(Transaction.type)
-        result = await self.db.execute(query)
+        result = await self.db.execute(
+            finance_totals(start_date, end_date, ['type'], ['income', 'expense'])
+        )
         
-        totals = {row[0]: row[1] for row in result.all()}
+        totals = {}
+        for row in result.all():
+            totals[row.type] = totals.get(row.type, Decimal('0')) + row.total
         
         total_income = totals.get('income', Decimal('0'))
         total_expense = totals.get('expense', Decimal('0'))
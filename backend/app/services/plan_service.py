@@ -1,10 +1,24 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
-from typing import List, Optional
-from datetime import datetime
-from app.models.plan import Plan
-from app.schemas.plan import PlanCreate, PlanUpdate
+from sqlalchemy import select, insert, update, delete, func, case, or_, and_, false, literal, null, union_all
+from sqlalchemy.orm import aliased
+import calendar
+import html
+from typing import Dict, List, Optional, Union
+from datetime import datetime, timedelta
+from app.models.plan import Plan, PlanArchive, plan_intervals, plans_fts
+from app.models.project import Project
+from app.models.timer import TimerSession
+from app.models.active_timer import ActiveTimer
+from app.models.transaction import Transaction
+from app.models.time_rollup import DailyTimeRollup, ROLLUP_COLUMNS, add_to_rollup
+from app.schemas.plan import (
+    PlanCreate, PlanUpdate, PlanResponse, PlanTree,
+    TimeSlot, PlanConflict, SlotConflicts, PlanBulk, PlanBulkResult
+)
 from app.services.project_service import ProjectService
+from app.services.tag_service import tagged_plans
+from app.utils.cache import statistics_cache
+from app.utils.pagination import Page, keyset_paginate, page
 
 
 class PlanService:
@@ -20,131 +34,455 @@ class PlanService:
         priority: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        exclude_completed: bool = True
-    ) -> List[Plan]:
-        """Get all plans with filters"""
-        query = select(Plan).where(Plan.parent_id.is_(None))
+        exclude_completed: bool = True,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> Page:
+        """Get top-level plans with filters, newest first, or search all plans by q"""
+        match = _fts_query(q) if q else None
+        
+        # Completed plans may have moved to plans_archive; only listings that
+        # can include them (the archive view) read it as well
+        plans = Plan
+        if match is None and not exclude_completed and status in (None, "completed"):
+            plans = aliased(Plan, _with_archive())
+        
+        query = select(plans)
+        if match is None:
+            query = query.where(plans.parent_id.is_(None))
         
         # Exclude completed plans by default
         if exclude_completed:
-            query = query.where(Plan.status != "completed")
+            query = query.where(plans.status != "completed")
         
         if project_id:
-            query = query.where(Plan.project_id == project_id)
+            query = query.where(plans.project_id == project_id)
         if status:
-            query = query.where(Plan.status == status)
+            query = query.where(plans.status == status)
         if priority:
-            query = query.where(Plan.priority_matrix == priority)
+            query = query.where(plans.priority_matrix == priority)
+        if tags:
+            query = query.where(plans.id.in_(tagged_plans(tags)))
         
         # Filter by creation date range
         if start_date:
             try:
                 start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                query = query.where(Plan.created_at >= start_dt)
+                query = query.where(plans.created_at >= start_dt)
             except ValueError:
                 pass
         
         if end_date:
             try:
                 end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                query = query.where(Plan.created_at <= end_dt)
+                query = query.where(plans.created_at <= end_dt)
             except ValueError:
                 pass
         
-        query = query.order_by(Plan.created_at.desc()).offset(skip).limit(limit)
+        if match is not None:
+            return await self._search(query, match, skip, limit, cursor)
+        
+        query = keyset_paginate(query, plans.created_at, plans.id, limit, cursor).offset(skip)
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return page(result.all(), limit)
     
-    async def get_by_id(self, plan_id: int) -> Optional[Plan]:
-        """Get plan by ID"""
+    async def _search(self, query, match, skip: int, limit: int, cursor: Optional[str]) -> Page:
+        """Rank plans matching an FTS5 query, best first, with a highlighted snippet"""
+        if cursor:
+            raise ValueError("cursor cannot be combined with q; use skip")
+        
+        query = query.add_columns(
+            # Trigram tokens are single characters apart, so this is about 32 characters
+            func.snippet(plans_fts.c.plans_fts, -1, _MARK_START, _MARK_END, '…', 32)
+        ).join(
+            plans_fts,
+            plans_fts.c.rowid == Plan.id
+        ).where(
+            match
+        ).order_by(
+            # Title hits weigh more than description, description more than tags
+            func.bm25(plans_fts.c.plans_fts, 10.0, 5.0, 2.0),
+            Plan.id
+        ).offset(skip).limit(limit)
+        
+        result = await self.db.execute(query)
+        
+        plans = Page()
+        for plan, snippet in result.all():
+            plan.snippet = _highlight(snippet)
+            plans.append(plan)
+        return plans
+    
+    async def get_by_id(self, plan_id: int, include_archived: bool = False) -> Optional[Union[Plan, PlanArchive]]:
+        """Get plan by ID, falling back to plans_archive if include_archived"""
         result = await self.db.execute(select(Plan).where(Plan.id == plan_id))
-        return result.scalar_one_or_none()
+        plan = result.scalar_one_or_none()
+        if plan is None and include_archived:
+            result = await self.db.execute(select(PlanArchive).where(PlanArchive.id == plan_id))
+            plan = result.scalar_one_or_none()
+        return plan
+    
+    async def _get_for_write(self, plan_id: int) -> Optional[Plan]:
+        """Get a plan to modify, moving its tree back out of plans_archive if archived"""
+        plan = await self.get_by_id(plan_id)
+        if plan is None and await self._restore([plan_id]):
+            plan = await self.get_by_id(plan_id)
+        return plan
     
-    async def get_tree(self, project_id: Optional[int] = None) -> List[Plan]:
-        """Get plan tree structure"""
-        query = select(Plan).where(Plan.parent_id.is_(None))
+    async def get_tree(
+        self,
+        project_id: Optional[int] = None,
+        max_depth: Optional[int] = None
+    ) -> List[PlanTree]:
+        """Get nested plan trees under the root plans, in one query"""
+        roots = select(
+            Plan.id,
+            literal(1).label('depth')
+        ).where(Plan.parent_id.is_(None))
         if project_id:
-            query = query.where(Plan.project_id == project_id)
+            roots = roots.where(Plan.project_id == project_id)
+        tree = roots.cte('plan_tree', recursive=True)
         
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        descendants = select(
+            Plan.id,
+            (tree.c.depth + 1).label('depth')
+        ).join(tree, Plan.parent_id == tree.c.id)
+        if max_depth:
+            descendants = descendants.where(tree.c.depth < max_depth)
+        tree = tree.union_all(descendants)
+        
+        child = aliased(Plan)
+        children_count = select(
+            func.count(child.id)
+        ).where(child.parent_id == Plan.id).scalar_subquery()
+        
+        result = await self.db.execute(
+            select(
+                Plan,
+                Project.name,
+                children_count
+            ).join(
+                tree,
+                tree.c.id == Plan.id
+            ).outerjoin(
+                Project,
+                Project.id == Plan.project_id
+            ).order_by(tree.c.depth, Plan.created_at, Plan.id)
+        )
+        
+        # Parents come before their children, so one pass links every node
+        nodes = {}
+        roots = []
+        for plan, project_name, count in result.all():
+            plan.project_name = project_name
+            plan.children_count = count
+            node = PlanTree(**PlanResponse.model_validate(plan).model_dump())
+            nodes[plan.id] = node
+            
+            parent = nodes.get(plan.parent_id)
+            if parent:
+                parent.children.append(node)
+            else:
+                roots.append(node)
+        
+        return roots
     
     async def create(self, plan_data: PlanCreate) -> Plan:
         """Create new plan"""
+        if plan_data.parent_id:
+            await self._restore([plan_data.parent_id])
+        
         plan = Plan(**plan_data.model_dump())
         self.db.add(plan)
+        
+        counts = {}
+        self._count(counts, plan.project_id, plan.status, 1)
+        await self._apply_counts(counts)
+        
         await self.db.commit()
         await self.db.refresh(plan)
-        
-        # Update project progress if linked
-        if plan.project_id:
-            project_service = ProjectService(self.db)
-            await project_service.update_progress(plan.project_id)
+        statistics_cache.invalidate("plans", plan.created_at.date())
         
         return plan
     
     async def update(self, plan_id: int, plan_data: PlanUpdate) -> Optional[Plan]:
         """Update plan"""
-        plan = await self.get_by_id(plan_id)
+        plan = await self._get_for_write(plan_id)
         if not plan:
             return None
         
-        old_project_id = plan.project_id
-        update_data = plan_data.model_dump(exclude_unset=True)
+        counts = {}
+        self._count(counts, plan.project_id, plan.status, -1)
         
+        update_data = plan_data.model_dump(exclude_unset=True)
+        if update_data.get('parent_id'):
+            await self._restore([update_data['parent_id']])
         for field, value in update_data.items():
             setattr(plan, field, value)
         
+        self._count(counts, plan.project_id, plan.status, 1)
+        await self._apply_counts(counts)
+        
         await self.db.commit()
         await self.db.refresh(plan)
-        
-        # Update project progress
-        project_service = ProjectService(self.db)
-        if old_project_id and old_project_id != plan.project_id:
-            await project_service.update_progress(old_project_id)
-        if plan.project_id:
-            await project_service.update_progress(plan.project_id)
+        statistics_cache.invalidate("plans", plan.created_at.date())
         
         return plan
     
     async def delete(self, plan_id: int) -> bool:
         """Delete plan and its children"""
-        plan = await self.get_by_id(plan_id)
+        plan = await self._get_for_write(plan_id)
         if not plan:
             return False
         
-        project_id = plan.project_id
+        counts = {}
+        await self._delete_subtrees([plan_id], counts)
+        await self._apply_counts(counts)
+        
+        await self.db.commit()
+        self.db.expunge(plan)
+        statistics_cache.invalidate("plans")
+        
+        return True
+    
+    async def bulk(self, data: PlanBulk) -> PlanBulkResult:
+        """Apply many creates, updates and deletes in one transaction"""
+        counts = {}
+        
+        # Anything touched must be in plans, including parents of new subtasks
+        await self._restore(
+            [plan_data.parent_id for plan_data in data.create if plan_data.parent_id]
+            + [plan_id for change in data.update for plan_id in change.ids]
+            + data.delete
+        )
         
-        # Delete children recursively
-        await self._delete_children(plan_id)
+        plans = []
+        if data.create:
+            # ORM bulk INSERT ... RETURNING, batched into a few statements
+            result = await self.db.scalars(
+                insert(Plan).returning(Plan),
+                [plan_data.model_dump() for plan_data in data.create]
+            )
+            plans = sorted(result.all(), key=lambda plan: plan.id)
+            for plan in plans:
+                self._count(counts, plan.project_id, plan.status, 1)
         
-        await self.db.delete(plan)
+        updated = 0
+        for change in data.update:
+            values = change.model_dump(exclude_unset=True, exclude={'ids'})
+            if not values:
+                continue
+            
+            # Only a new project or status moves plans between counters
+            if 'project_id' in values or 'status' in values:
+                result = await self.db.execute(
+                    select(Plan.project_id, Plan.status).where(Plan.id.in_(change.ids))
+                )
+                for project_id, status in result.all():
+                    self._count(counts, project_id, status, -1)
+                    self._count(
+                        counts,
+                        values.get('project_id', project_id),
+                        values.get('status', status),
+                        1
+                    )
+            
+            result = await self.db.execute(
+                update(Plan)
+                .where(Plan.id.in_(change.ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        
+        deleted = 0
+        if data.delete:
+            deleted = await self._delete_subtrees(data.delete, counts)
+        
+        await self._apply_counts(counts)
         await self.db.commit()
+        statistics_cache.invalidate("plans")
         
-        # Update project progress
-        if project_id:
-            project_service = ProjectService(self.db)
-            await project_service.update_progress(project_id)
+        return PlanBulkResult(
+            created=[PlanResponse.model_validate(plan) for plan in plans],
+            updated=updated,
+            deleted=deleted
+        )
+    
+    async def _delete_subtrees(self, plan_ids: List[int], counts: Dict) -> int:
+        """Delete plans and their descendants, unlinking what references them; returns rows deleted"""
+        # Per-project counts of the subtrees, taken off the project counters
+        result = await self.db.execute(
+            select(
+                Plan.project_id,
+                func.sum(case((Plan.status != "cancelled", 1), else_=0)),
+                func.sum(case((Plan.status == "completed", 1), else_=0))
+            ).where(
+                Plan.id.in_(self._subtree_ids(plan_ids)),
+                Plan.project_id.isnot(None)
+            ).group_by(Plan.project_id)
+        )
+        for project_id, total, completed in result.all():
+            project_counts = counts.setdefault(project_id, [0, 0])
+            project_counts[0] -= total
+            project_counts[1] -= completed
         
-        return True
+        # Rollup rows of the subtree are added to the plan-less row of their day and project
+        await self.db.execute(add_to_rollup(
+            select(
+                DailyTimeRollup.day,
+                DailyTimeRollup.project_id,
+                null(),
+                *(func.sum(getattr(DailyTimeRollup, name)) for name in ROLLUP_COLUMNS[3:])
+            ).where(
+                DailyTimeRollup.plan_id.in_(self._subtree_ids(plan_ids))
+            ).group_by(DailyTimeRollup.day, DailyTimeRollup.project_id)
+        ))
+        await self.db.execute(
+            delete(DailyTimeRollup)
+            .where(DailyTimeRollup.plan_id.in_(self._subtree_ids(plan_ids)))
+            .execution_options(synchronize_session=False)
+        )
+        for model in (TimerSession, ActiveTimer, Transaction):
+            await self.db.execute(
+                update(model)
+                .where(model.plan_id.in_(self._subtree_ids(plan_ids)))
+                .values(plan_id=None)
+                .execution_options(synchronize_session=False)
+            )
+        result = await self.db.execute(
+            delete(Plan)
+            .where(Plan.id.in_(self._subtree_ids(plan_ids)))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
     
-    async def _delete_children(self, parent_id: int) -> None:
-        """Recursively delete child plans"""
-        result = await self.db.execute(select(Plan).where(Plan.parent_id == parent_id))
-        children = result.scalars().all()
+    async def archive_completed(self, older_than_days: int, batch_size: int) -> int:
+        """Move plan trees completed over older_than_days ago to plans_archive.
+        
+        A tree moves as a whole, once every plan in it is completed, none was
+        updated within the window and none has an active timer. Root plans are
+        taken batch_size at a time in id order, one transaction per batch.
+        Returns the number of plans moved.
+        """
+        # updated_at is written by SQLite's CURRENT_TIMESTAMP, which is UTC
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        archivable = and_(
+            Plan.status == "completed",
+            Plan.updated_at < cutoff,
+            Plan.id.notin_(
+                select(ActiveTimer.plan_id).where(ActiveTimer.plan_id.isnot(None))
+            )
+        )
         
-        for child in children:
-            await self._delete_children(child.id)
-            await self.db.delete(child)
+        moved = 0
+        after = 0
+        while True:
+            roots = select(Plan.id).where(
+                Plan.parent_id.is_(None),
+                Plan.id > after,
+                archivable
+            ).order_by(Plan.id).limit(batch_size).subquery()
+            
+            tree = select(
+                roots.c.id.label('root_id'),
+                roots.c.id
+            ).cte('archive_tree', recursive=True)
+            tree = tree.union_all(
+                select(tree.c.root_id, Plan.id).join(tree, Plan.parent_id == tree.c.id)
+            )
+            
+            result = await self.db.execute(
+                select(tree.c.root_id, tree.c.id, archivable).join(Plan, Plan.id == tree.c.id)
+            )
+            trees: Dict[int, List] = {}
+            for root_id, plan_id, plan_archivable in result.all():
+                trees.setdefault(root_id, []).append((plan_id, plan_archivable))
+            if not trees:
+                return moved
+            after = max(trees)
+            
+            root_of = {
+                plan_id: root_id
+                for root_id, members in trees.items()
+                if all(plan_archivable for _, plan_archivable in members)
+                for plan_id, _ in members
+            }
+            if not root_of:
+                continue
+            
+            result = await self.db.execute(
+                delete(Plan)
+                .where(Plan.id.in_(root_of))
+                .returning(*Plan.__table__.columns)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.execute(
+                insert(PlanArchive),
+                [dict(row._asdict(), root_id=root_of[row.id]) for row in result.all()]
+            )
+            await self.db.commit()
+            statistics_cache.invalidate("plans")
+            moved += len(root_of)
     
-    async def check_time_conflict(
+    async def _restore(self, plan_ids: List[int]) -> int:
+        """Move the archived trees containing plan_ids back into plans, without committing"""
+        if not plan_ids:
+            return 0
+        
+        result = await self.db.execute(
+            delete(PlanArchive)
+            .where(PlanArchive.root_id.in_(
+                select(PlanArchive.root_id).where(PlanArchive.id.in_(plan_ids))
+            ))
+            .returning(*(PlanArchive.__table__.c[column.name] for column in Plan.__table__.columns))
+            .execution_options(synchronize_session=False)
+        )
+        rows = [row._asdict() for row in result.all()]
+        if rows:
+            await self.db.execute(insert(Plan), _parents_first(rows))
+        return len(rows)
+    
+    def _count(self, counts: Dict, project_id: Optional[int], status: str, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one plan in counts, keyed by project"""
+        if project_id:
+            project_counts = counts.setdefault(project_id, [0, 0])
+            project_counts[0] += sign * (status != "cancelled")
+            project_counts[1] += sign * (status == "completed")
+    
+    async def _apply_counts(self, counts: Dict) -> None:
+        """Write accumulated counter deltas, one UPDATE per affected project"""
+        project_service = ProjectService(self.db)
+        for project_id, (total, completed) in counts.items():
+            if total or completed:
+                await project_service.adjust_plan_counts(project_id, total, completed)
+    
+    def _subtree_ids(self, plan_ids: List[int]):
+        """Recursive CTE selecting plan_ids and the ids of all their descendants"""
+        # Nested so the WITH sits inside the IN (...) and the statement still
+        # starts with UPDATE/DELETE, which sqlite3 needs to report rowcount
+        subtree = select(Plan.id).where(Plan.id.in_(plan_ids)).cte(
+            'plan_subtree', recursive=True, nesting=True
+        )
+        subtree = subtree.union(
+            select(Plan.id).join(subtree, Plan.parent_id == subtree.c.id)
+        )
+        return select(subtree.c.id)
+    
+    def _conflict_query(
         self,
         start_time: datetime,
         end_time: datetime,
         exclude_id: Optional[int] = None
-    ) -> List[Plan]:
-        """Check for time conflicts"""
-        query = select(Plan).where(
+    ):
+        """Active plans overlapping [start_time, end_time], looked up through plan_intervals"""
+        query = select(Plan).join(
+            plan_intervals,
+            plan_intervals.c.id == Plan.id
+        ).where(
+            plan_intervals.c.start_ts <= _epoch(end_time),
+            plan_intervals.c.end_ts >= _epoch(start_time),
             Plan.status.notin_(["completed", "cancelled"]),
             or_(
                 and_(Plan.start_time <= start_time, Plan.end_time > start_time),
@@ -156,5 +494,115 @@ class PlanService:
         if exclude_id:
             query = query.where(Plan.id != exclude_id)
         
-        result = await self.db.execute(query)
+        return query
+    
+    async def check_time_conflict(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_id: Optional[int] = None
+    ) -> List[Plan]:
+        """Check for time conflicts"""
+        result = await self.db.execute(self._conflict_query(start_time, end_time, exclude_id))
         return list(result.scalars().all())
+    
+    async def check_time_conflicts(self, slots: List[TimeSlot]) -> List[SlotConflicts]:
+        """Check many proposed time slots for conflicts in one query"""
+        query = union_all(*(
+            self._conflict_query(
+                slot.start_time,
+                slot.end_time,
+                slot.exclude_id
+            ).with_only_columns(
+                literal(index).label('slot'),
+                Plan.id,
+                Plan.title,
+                Plan.start_time,
+                Plan.end_time
+            )
+            for index, slot in enumerate(slots)
+        ))
+        result = await self.db.execute(query.order_by('slot', 'start_time'))
+        
+        conflicts = [[] for _ in slots]
+        for row in result.all():
+            conflicts[row.slot].append(PlanConflict(
+                id=row.id,
+                title=row.title,
+                start_time=row.start_time,
+                end_time=row.end_time
+            ))
+        
+        return [
+            SlotConflicts(
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                conflicts=slot_conflicts
+            )
+            for slot, slot_conflicts in zip(slots, conflicts)
+        ]
+
+
+def _with_archive():
+    """plans and plans_archive as one subquery with the columns of plans"""
+    columns = [column.name for column in Plan.__table__.columns]
+    return union_all(
+        select(*(Plan.__table__.c[name] for name in columns)),
+        select(*(PlanArchive.__table__.c[name] for name in columns))
+    ).subquery('plans_with_archive')
+
+
+def _parents_first(rows: List[Dict]) -> List[Dict]:
+    """Order plan rows of whole trees so every parent is inserted before its children"""
+    parents = {row['id']: row['parent_id'] for row in rows}
+    
+    def depth(plan_id: int) -> int:
+        levels = 0
+        while parents[plan_id] in parents:
+            plan_id = parents[plan_id]
+            levels += 1
+        return levels
+    
+    return sorted(rows, key=lambda row: depth(row['id']))
+
+
+# Control characters that snippet() puts around matches; they are turned into
+# <mark> tags only after the plan text itself has been escaped
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet() result, then mark its matches with <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _fts_query(q: str):
+    """Turn free text into a plans_fts condition: every word must occur somewhere in a field
+    
+    Words of 3+ characters go to the trigram index; shorter ones (such as a
+    two-character Chinese word) are below its token size and are LIKE-matched
+    instead. Words without a letter or digit would only hit the JSON of tags,
+    so they match nothing.
+    """
+    terms = q.split()
+    if not all(any(char.isalnum() for char in term) for term in terms):
+        return false()
+    
+    conditions = []
+    indexed = ['"' + term.replace('"', '""') + '"' for term in terms if len(term) >= 3]
+    if indexed:
+        conditions.append(plans_fts.c.plans_fts.op('MATCH')(" ".join(indexed)))
+    for term in terms:
+        if len(term) < 3:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append(or_(*(
+                plans_fts.c[name].like(pattern, escape="\\") for name in ("title", "description", "tags")
+            )))
+    return and_(*conditions) if conditions else None
+
+
+def _epoch(value: datetime) -> int:
+    """Seconds since the epoch of a datetime's wall-clock fields, as SQLite's strftime('%s') reads them"""
+    return calendar.timegm(value.timetuple())
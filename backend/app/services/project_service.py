@@ -1,30 +1,78 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func, case, union_all
 from typing import List, Optional
 from app.models.project import Project
-from app.models.plan import Plan
+from app.models.plan import Plan, PlanArchive
+from app.models.timer import TimerSession
+from app.models.transaction import Transaction
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.utils.cache import statistics_cache
 
 
 class ProjectService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Project]:
-        """Get all projects with plan count"""
-        result = await self.db.execute(
-            select(Project).where(Project.status != "deleted").offset(skip).limit(limit)
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include_stats: bool = False
+    ) -> List[Project]:
+        """Get all projects with plan count, and tracked time and income/expense if asked"""
+        # Archived plans still belong to their project
+        plan_projects = union_all(
+            select(Plan.project_id),
+            select(PlanArchive.project_id)
+        ).subquery()
+        plan_counts = select(
+            plan_projects.c.project_id,
+            func.count().label('plan_count')
+        ).group_by(plan_projects.c.project_id).subquery()
+        
+        query = select(
+            Project,
+            func.coalesce(plan_counts.c.plan_count, 0)
+        ).outerjoin(
+            plan_counts,
+            plan_counts.c.project_id == Project.id
         )
-        projects = result.scalars().all()
         
-        # Get plan count for each project
-        for project in projects:
-            plan_count_result = await self.db.execute(
-                select(func.count(Plan.id)).where(Plan.project_id == project.id)
+        if include_stats:
+            tracked = select(
+                TimerSession.project_id,
+                func.sum(TimerSession.duration).label('seconds')
+            ).group_by(TimerSession.project_id).subquery()
+            
+            money = select(
+                Transaction.project_id,
+                func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
+                func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense')
+            ).group_by(Transaction.project_id).subquery()
+            
+            query = query.add_columns(
+                func.coalesce(tracked.c.seconds, 0),
+                func.coalesce(money.c.income, 0),
+                func.coalesce(money.c.expense, 0)
+            ).outerjoin(
+                tracked,
+                tracked.c.project_id == Project.id
+            ).outerjoin(
+                money,
+                money.c.project_id == Project.id
             )
-            project.plan_count = plan_count_result.scalar()
         
-        return list(projects)
+        query = query.where(Project.status != "deleted").order_by(Project.id).offset(skip).limit(limit)
+        result = await self.db.execute(query)
+        
+        projects = []
+        for project, plan_count, *stats in result.all():
+            project.plan_count = plan_count
+            if include_stats:
+                project.tracked_seconds, project.total_income, project.total_expense = stats
+            projects.append(project)
+        
+        return projects
     
     async def get_by_id(self, project_id: int) -> Optional[Project]:
         """Get project by ID"""
@@ -39,6 +87,7 @@ class ProjectService:
         self.db.add(project)
         await self.db.commit()
         await self.db.refresh(project)
+        statistics_cache.invalidate("projects")
         return project
     
     async def update(self, project_id: int, project_data: ProjectUpdate) -> Optional[Project]:
@@ -53,6 +102,7 @@ class ProjectService:
         
         await self.db.commit()
         await self.db.refresh(project)
+        statistics_cache.invalidate("projects")
         return project
     
     async def delete(self, project_id: int) -> bool:
@@ -63,30 +113,56 @@ class ProjectService:
         
         project.status = "deleted"
         await self.db.commit()
+        statistics_cache.invalidate("projects")
         return True
     
-    async def update_progress(self, project_id: int) -> None:
-        """Update project progress based on plans"""
-        result = await self.db.execute(
-            select(func.count(Plan.id)).where(
-                Plan.project_id == project_id,
-                Plan.status != "cancelled"
-            )
-        )
-        total_plans = result.scalar()
-        
-        if total_plans == 0:
-            return
+    async def adjust_plan_counts(self, project_id: int, total: int, completed: int) -> None:
+        """Shift a project's plan counters and progress by a delta, without committing"""
+        plan_total = Project.plan_total + total
+        plan_completed = Project.plan_completed + completed
         
-        result = await self.db.execute(
-            select(func.count(Plan.id)).where(
-                Plan.project_id == project_id,
-                Plan.status == "completed"
-            )
+        await self.db.execute(
+            update(Project).where(Project.id == project_id).values(
+                plan_total=plan_total,
+                plan_completed=plan_completed,
+                progress=_progress(plan_total, plan_completed)
+            ).execution_options(synchronize_session=False)
         )
-        completed_plans = result.scalar()
-        
-        project = await self.get_by_id(project_id)
-        if project:
-            project.progress = round((completed_plans / total_plans) * 100, 2)
-            await self.db.commit()
+    
+    async def reconcile_plan_counts(self) -> int:
+        """Recount plan_total/plan_completed and progress of every project from plans and plans_archive"""
+        result = await self.db.execute(recount_plans())
+        await self.db.commit()
+        return result.rowcount
+
+
+def recount_plans():
+    """UPDATE that sets plan_total/plan_completed and progress of every project from plans and plans_archive"""
+    plan_total = sum(
+        select(func.count(plans.id)).where(
+            plans.project_id == Project.id,
+            plans.status != "cancelled"
+        ).scalar_subquery()
+        for plans in (Plan, PlanArchive)
+    )
+    plan_completed = sum(
+        select(func.count(plans.id)).where(
+            plans.project_id == Project.id,
+            plans.status == "completed"
+        ).scalar_subquery()
+        for plans in (Plan, PlanArchive)
+    )
+    
+    return update(Project).values(
+        plan_total=plan_total,
+        plan_completed=plan_completed,
+        progress=_progress(plan_total, plan_completed)
+    ).execution_options(synchronize_session=False)
+
+
+def _progress(plan_total, plan_completed):
+    """Completed share of plans as a percentage; unchanged while a project has no plans"""
+    return case(
+        (plan_total > 0, func.round(plan_completed * 100.0 / plan_total, 2)),
+        else_=Project.progress
+    )
@@ -1,13 +1,40 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, cast, Date, extract, case
+from sqlalchemy import select, func, Date, case, union_all
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from app.models.timer import TimerSession
-from app.models.plan import Plan
+from app.models.time_rollup import DailyTimeRollup
+from app.models.plan import Plan, PlanArchive
 from app.models.project import Project
 from app.models.transaction import Transaction, Category
 from app.models.account import Account
+from app.services.accounting_service import finance_totals
+from app.utils.helpers import day_range
+from app.utils.cache import cached
+
+STATUS_NAMES = {
+    'todo': '待办',
+    'in_progress': '进行中',
+    'completed': '已完成',
+    'cancelled': '已取消'
+}
+
+# Order of the priority distribution series
+PRIORITIES = [
+    'urgent_important',
+    'not_urgent_important',
+    'urgent_not_important',
+    'not_urgent_not_important'
+]
+
+
+def _plans_and_archive(query):
+    """UNION ALL of query(Plan) and query(PlanArchive).
+
+    Each side is aggregated on its own indexes; callers add up the rows that
+    share a key.
+    """
+    return union_all(query(Plan), query(PlanArchive))
 
 
 class StatisticsService:
@@ -22,6 +49,29 @@ class StatisticsService:
             start_date = date(end_date.year, end_date.month, 1)
         return start_date, end_date
     
+    def _date_series(self, start_date: date, end_date: date) -> List[date]:
+        """Every date from start_date to end_date inclusive"""
+        return [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        ]
+    
+    def _weekday_hours(self, durations: Dict[date, int]) -> List[float]:
+        """Total hours per weekday, Monday first"""
+        weekday_duration = [0] * 7
+        for day, duration in durations.items():
+            weekday_duration[day.weekday()] += duration
+        return [round(duration / 3600, 1) for duration in weekday_duration]
+    
+    def _priority_percentages(self, counts: Dict[str, int]) -> List[float]:
+        """Share of plans per priority, in PRIORITIES order"""
+        total = sum(counts.values()) or 1
+        return [
+            round((counts.get(p, 0) / total) * 100, 1)
+            for p in PRIORITIES
+        ]
+    
+    @cached("timer_sessions", "plans", "transactions", "accounts")
     async def get_overview(
         self,
         start_date: Optional[date] = None,
@@ -32,31 +82,30 @@ class StatisticsService:
         
         # Timer stats
         timer_query = select(
-            func.sum(TimerSession.duration).label('total_duration'),
-            func.count(TimerSession.id).label('session_count'),
-            func.avg(TimerSession.focus_score).label('avg_focus_score')
+            func.sum(DailyTimeRollup.total_duration).label('total_duration'),
+            func.sum(DailyTimeRollup.session_count).label('session_count'),
+            func.sum(DailyTimeRollup.focus_score_sum).label('focus_score_sum'),
+            func.sum(DailyTimeRollup.focus_score_count).label('focus_score_count')
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None)
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
         )
         
         timer_result = await self.db.execute(timer_query)
         timer_row = timer_result.first()
         
         # Plan stats
-        plan_query = select(
-            func.count(Plan.id).label('total_plans'),
+        plan_query = _plans_and_archive(lambda plans: select(
+            func.count(plans.id).label('total_plans'),
             func.sum(
-                case((Plan.status == 'completed', 1), else_=0)
+                case((plans.status == 'completed', 1), else_=0)
             ).label('completed_plans')
         ).where(
-            cast(Plan.created_at, Date) >= start_date,
-            cast(Plan.created_at, Date) <= end_date
-        )
+            *day_range(plans.created_at, start_date, end_date)
+        ))
         
         plan_result = await self.db.execute(plan_query)
-        plan_row = plan_result.first()
+        plan_rows = plan_result.all()
         
         # Finance stats
         income_query = select(
@@ -94,14 +143,18 @@ class StatisticsService:
         return {
             'total_duration': int(timer_row.total_duration or 0),
             'session_count': int(timer_row.session_count or 0),
-            'avg_focus_score': float(timer_row.avg_focus_score or 0),
-            'completed_plans': int(plan_row.completed_plans or 0),
-            'total_plans': int(plan_row.total_plans or 0),
+            'avg_focus_score': (
+                float(timer_row.focus_score_sum) / timer_row.focus_score_count
+                if timer_row.focus_score_count else 0.0
+            ),
+            'completed_plans': sum(int(row.completed_plans or 0) for row in plan_rows),
+            'total_plans': sum(int(row.total_plans or 0) for row in plan_rows),
             'total_income': float(total_income),
             'total_expense': float(total_expense),
             'net_worth': float(total_assets - total_liabilities)
         }
     
+    @cached("timer_sessions", "plans")
     async def get_time_trend(
         self,
         start_date: Optional[date] = None,
@@ -110,38 +163,33 @@ class StatisticsService:
         """Get time trend data"""
         start_date, end_date = self._get_date_range(start_date, end_date)
         
-        # Generate date range
-        dates = []
-        current = start_date
-        while current <= end_date:
-            dates.append(current)
-            current += timedelta(days=1)
+        dates = self._date_series(start_date, end_date)
         
         # Get timer data
         timer_query = select(
-            cast(TimerSession.start_time, Date).label('date'),
-            func.sum(TimerSession.duration).label('duration')
+            DailyTimeRollup.day.label('date'),
+            func.sum(DailyTimeRollup.total_duration).label('duration')
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None)
-        ).group_by(cast(TimerSession.start_time, Date))
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
+        ).group_by(DailyTimeRollup.day)
         
         timer_result = await self.db.execute(timer_query)
         timer_data = {row.date: row.duration for row in timer_result.all()}
         
         # Get plan completion data
-        plan_query = select(
-            cast(Plan.updated_at, Date).label('date'),
-            func.count(Plan.id).label('completed')
+        plan_query = _plans_and_archive(lambda plans: select(
+            func.date(plans.updated_at, type_=Date).label('date'),
+            func.count(plans.id).label('completed')
         ).where(
-            Plan.status == 'completed',
-            cast(Plan.updated_at, Date) >= start_date,
-            cast(Plan.updated_at, Date) <= end_date
-        ).group_by(cast(Plan.updated_at, Date))
+            plans.status == 'completed',
+            *day_range(plans.updated_at, start_date, end_date)
+        ).group_by(func.date(plans.updated_at, type_=Date)))
         
         plan_result = await self.db.execute(plan_query)
-        plan_data = {row.date: row.completed for row in plan_result.all()}
+        plan_data: Dict[date, int] = {}
+        for row in plan_result.all():
+            plan_data[row.date] = plan_data.get(row.date, 0) + row.completed
         
         return [
             {
@@ -152,6 +200,7 @@ class StatisticsService:
             for d in dates
         ]
     
+    @cached("plans")
     async def get_plan_completion(
         self,
         start_date: Optional[date] = None,
@@ -160,32 +209,27 @@ class StatisticsService:
         """Get plan completion statistics"""
         start_date, end_date = self._get_date_range(start_date, end_date)
         
-        query = select(
-            Plan.status,
-            func.count(Plan.id).label('count')
+        query = _plans_and_archive(lambda plans: select(
+            plans.status,
+            func.count(plans.id).label('count')
         ).where(
-            cast(Plan.created_at, Date) >= start_date,
-            cast(Plan.created_at, Date) <= end_date
-        ).group_by(Plan.status)
+            *day_range(plans.created_at, start_date, end_date)
+        ).group_by(plans.status))
         
         result = await self.db.execute(query)
-        data = result.all()
-        
-        status_names = {
-            'todo': '待办',
-            'in_progress': '进行中',
-            'completed': '已完成',
-            'cancelled': '已取消'
-        }
+        data: Dict[str, int] = {}
+        for row in result.all():
+            data[row.status] = data.get(row.status, 0) + row.count
         
         return [
             {
-                'name': status_names.get(row.status, row.status),
-                'value': row.count
+                'name': STATUS_NAMES.get(status, status),
+                'value': count
             }
-            for row in data
+            for status, count in data.items()
         ]
     
+    @cached("timer_sessions", "projects")
     async def get_project_time(
         self,
         start_date: Optional[date] = None,
@@ -198,18 +242,17 @@ class StatisticsService:
             Project.id,
             Project.name,
             Project.color,
-            func.sum(TimerSession.duration).label('duration')
+            func.sum(DailyTimeRollup.total_duration).label('duration')
         ).join(
-            TimerSession,
-            Project.id == TimerSession.project_id
+            DailyTimeRollup,
+            Project.id == DailyTimeRollup.project_id
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None)
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
         ).group_by(
             Project.id
         ).order_by(
-            func.sum(TimerSession.duration).desc()
+            func.sum(DailyTimeRollup.total_duration).desc()
         ).limit(10)
         
         result = await self.db.execute(query)
@@ -223,6 +266,7 @@ class StatisticsService:
             for row in result.all()
         ]
     
+    @cached("timer_sessions")
     async def get_focus_trend(
         self,
         start_date: Optional[date] = None,
@@ -232,17 +276,18 @@ class StatisticsService:
         start_date, end_date = self._get_date_range(start_date, end_date)
         
         query = select(
-            cast(TimerSession.start_time, Date).label('date'),
-            func.avg(TimerSession.focus_score).label('focus_score')
+            DailyTimeRollup.day.label('date'),
+            func.sum(DailyTimeRollup.focus_score_sum).label('focus_score_sum'),
+            func.sum(DailyTimeRollup.focus_score_count).label('focus_score_count')
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None),
-            TimerSession.focus_score.isnot(None)
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
         ).group_by(
-            cast(TimerSession.start_time, Date)
+            DailyTimeRollup.day
+        ).having(
+            func.sum(DailyTimeRollup.focus_score_count) > 0
         ).order_by(
-            cast(TimerSession.start_time, Date)
+            DailyTimeRollup.day
         )
         
         result = await self.db.execute(query)
@@ -250,11 +295,12 @@ class StatisticsService:
         return [
             {
                 'date': str(row.date),
-                'focus_score': round(float(row.focus_score), 1)
+                'focus_score': round(float(row.focus_score_sum) / row.focus_score_count, 1)
             }
             for row in result.all()
         ]
     
+    @cached("timer_sessions")
     async def get_heatmap(
         self,
         start_date: Optional[date] = None,
@@ -267,14 +313,13 @@ class StatisticsService:
             start_date = date(end_date.year, 1, 1)
         
         query = select(
-            cast(TimerSession.start_time, Date).label('date'),
-            func.sum(TimerSession.duration).label('duration')
+            DailyTimeRollup.day.label('date'),
+            func.sum(DailyTimeRollup.total_duration).label('duration')
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None)
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
         ).group_by(
-            cast(TimerSession.start_time, Date)
+            DailyTimeRollup.day
         )
         
         result = await self.db.execute(query)
@@ -287,20 +332,19 @@ class StatisticsService:
             for row in result.all()
         ]
     
+    @cached("transactions")
     async def get_finance_trend(
         self,
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        interval: str = "day"
     ) -> List[Dict[str, Any]]:
-        """Get finance trend data"""
+        """Get finance trend data, one point per day or per month"""
         start_date, end_date = self._get_date_range(start_date, end_date)
+        if interval == "month":
+            return await self._monthly_finance_trend(start_date, end_date)
         
-        # Generate date range
-        dates = []
-        current = start_date
-        while current <= end_date:
-            dates.append(current)
-            current += timedelta(days=1)
+        dates = self._date_series(start_date, end_date)
         
         # Get income data
         income_query = select(
@@ -337,6 +381,29 @@ class StatisticsService:
             for d in dates
         ]
     
+    async def _monthly_finance_trend(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Income and expense per month, labelled with the month's first day"""
+        query = finance_totals(start_date, end_date, ['month', 'type'], ['income', 'expense'])
+        amounts: Dict[tuple, Decimal] = {}
+        for row in (await self.db.execute(query)).all():
+            key = (row.month, row.type)
+            amounts[key] = amounts.get(key, 0) + row.total
+        
+        months = []
+        month = start_date.replace(day=1)
+        while month <= end_date:
+            months.append(month)
+            month = (month + timedelta(days=32)).replace(day=1)
+        return [
+            {
+                'date': str(month),
+                'income': float(amounts.get((month, 'income'), 0)),
+                'expense': float(amounts.get((month, 'expense'), 0))
+            }
+            for month in months
+        ]
+    
+    @cached("transactions", "categories")
     async def get_expense_category(
         self,
         start_date: Optional[date] = None,
@@ -345,34 +412,29 @@ class StatisticsService:
         """Get expense category distribution"""
         start_date, end_date = self._get_date_range(start_date, end_date)
         
-        query = select(
-            Category.name,
-            Category.color,
-            func.sum(Transaction.amount).label('amount')
-        ).join(
-            Transaction,
-            Category.id == Transaction.category_id
-        ).where(
-            Transaction.type == 'expense',
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date <= end_date
-        ).group_by(
-            Category.id
-        ).order_by(
-            func.sum(Transaction.amount).desc()
-        )
+        query = finance_totals(start_date, end_date, ['category_id'], ['expense'])
+        amounts: Dict[int, Decimal] = {}
+        for row in (await self.db.execute(query)).all():
+            if row.category_id is not None:
+                amounts[row.category_id] = amounts.get(row.category_id, 0) + row.total
+        if not amounts:
+            return []
         
-        result = await self.db.execute(query)
+        result = await self.db.execute(
+            select(Category.id, Category.name, Category.color).where(Category.id.in_(amounts))
+        )
+        categories = sorted(result.all(), key=lambda row: amounts[row.id], reverse=True)
         
         return [
             {
                 'name': row.name,
-                'value': float(row.amount),
+                'value': float(amounts[row.id]),
                 'itemStyle': {'color': row.color}
             }
-            for row in result.all()
+            for row in categories
         ]
     
+    @cached("timer_sessions")
     async def get_daily_distribution(
         self,
         start_date: Optional[date] = None,
@@ -382,31 +444,20 @@ class StatisticsService:
         start_date, end_date = self._get_date_range(start_date, end_date)
         
         query = select(
-            extract('dow', TimerSession.start_time).label('weekday'),
-            func.sum(TimerSession.duration).label('duration')
+            DailyTimeRollup.day,
+            func.sum(DailyTimeRollup.total_duration).label('duration')
         ).where(
-            cast(TimerSession.start_time, Date) >= start_date,
-            cast(TimerSession.start_time, Date) <= end_date,
-            TimerSession.end_time.isnot(None)
+            DailyTimeRollup.day >= start_date,
+            DailyTimeRollup.day <= end_date
         ).group_by(
-            extract('dow', TimerSession.start_time)
+            DailyTimeRollup.day
         )
         
         result = await self.db.execute(query)
-        data = {int(row.weekday): row.duration for row in result.all()}
         
-        # Convert to Monday-Sunday (0-6)
-        # PostgreSQL dow: 0=Sunday, 1=Monday, ..., 6=Saturday
-        # We want: 0=Monday, 1=Tuesday, ..., 6=Sunday
-        weekday_map = {1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 0: 6}
-        
-        result_data = [0.0] * 7
-        for pg_dow, duration in data.items():
-            our_dow = weekday_map.get(pg_dow, 0)
-            result_data[our_dow] = round(duration / 3600, 1)
-        
-        return result_data
+        return self._weekday_hours({row.day: row.duration for row in result.all()})
     
+    @cached("plans")
     async def get_priority_distribution(
         self,
         start_date: Optional[date] = None,
@@ -415,30 +466,238 @@ class StatisticsService:
         """Get plan priority distribution"""
         start_date, end_date = self._get_date_range(start_date, end_date)
         
-        query = select(
-            Plan.priority_matrix,
-            func.count(Plan.id).label('count')
+        query = _plans_and_archive(lambda plans: select(
+            plans.priority_matrix,
+            func.count(plans.id).label('count')
         ).where(
-            cast(Plan.created_at, Date) >= start_date,
-            cast(Plan.created_at, Date) <= end_date
+            *day_range(plans.created_at, start_date, end_date)
         ).group_by(
-            Plan.priority_matrix
-        )
+            plans.priority_matrix
+        ))
         
         result = await self.db.execute(query)
-        data = {row.priority_matrix: row.count for row in result.all()}
+        data: Dict[str, int] = {}
+        for row in result.all():
+            data[row.priority_matrix] = data.get(row.priority_matrix, 0) + row.count
+        
+        return self._priority_percentages(data)
+
+    
+    @cached("timer_sessions", "plans", "projects", "transactions", "categories", "accounts")
+    async def get_dashboard(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        heatmap_start_date: Optional[date] = None,
+        heatmap_end_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Get every statistics series in one pass.
         
-        total = sum(data.values()) or 1
+        The daily time rollup, plans and transactions are each aggregated
+        once at the finest grain any chart needs, and the individual series are
+        derived from those rows in Python.
+        """
+        start_date, end_date = self._get_date_range(start_date, end_date)
+        if not heatmap_end_date:
+            heatmap_end_date = date.today()
+        if not heatmap_start_date:
+            heatmap_start_date = date(heatmap_end_date.year, 1, 1)
         
-        # Return in order: urgent_important, not_urgent_important, urgent_not_important, not_urgent_not_important
-        priorities = [
-            'urgent_important',
-            'not_urgent_important',
-            'urgent_not_important',
-            'not_urgent_not_important'
-        ]
+        # Timer totals per day and project, over both ranges
+        timer_query = select(
+            DailyTimeRollup.day.label('date'),
+            DailyTimeRollup.project_id,
+            Project.name.label('project_name'),
+            Project.color.label('project_color'),
+            func.sum(DailyTimeRollup.total_duration).label('duration'),
+            func.sum(DailyTimeRollup.session_count).label('session_count'),
+            func.sum(DailyTimeRollup.focus_score_sum).label('focus_sum'),
+            func.sum(DailyTimeRollup.focus_score_count).label('focus_count')
+        ).outerjoin(
+            Project,
+            Project.id == DailyTimeRollup.project_id
+        ).where(
+            DailyTimeRollup.day >= min(start_date, heatmap_start_date),
+            DailyTimeRollup.day <= max(end_date, heatmap_end_date)
+        ).group_by(
+            DailyTimeRollup.day,
+            DailyTimeRollup.project_id
+        )
+        timer_rows = (await self.db.execute(timer_query)).all()
         
-        return [
-            round((data.get(p, 0) / total) * 100, 1)
-            for p in priorities
-        ]
+        # Plans created in range, by status and priority
+        plan_query = _plans_and_archive(lambda plans: select(
+            plans.status,
+            plans.priority_matrix,
+            func.count(plans.id).label('count')
+        ).where(
+            *day_range(plans.created_at, start_date, end_date)
+        ).group_by(
+            plans.status,
+            plans.priority_matrix
+        ))
+        plan_rows = (await self.db.execute(plan_query)).all()
+        
+        # Plans completed per day
+        completed_query = _plans_and_archive(lambda plans: select(
+            func.date(plans.updated_at, type_=Date).label('date'),
+            func.count(plans.id).label('completed')
+        ).where(
+            plans.status == 'completed',
+            *day_range(plans.updated_at, start_date, end_date)
+        ).group_by(func.date(plans.updated_at, type_=Date)))
+        completed_data: Dict[date, int] = {}
+        for row in (await self.db.execute(completed_query)).all():
+            completed_data[row.date] = completed_data.get(row.date, 0) + row.completed
+        
+        # Income and expense per day and category
+        finance_query = select(
+            Transaction.transaction_date,
+            Transaction.type,
+            Transaction.category_id,
+            Category.name.label('category_name'),
+            Category.color.label('category_color'),
+            func.sum(Transaction.amount).label('amount')
+        ).outerjoin(
+            Category,
+            Category.id == Transaction.category_id
+        ).where(
+            Transaction.type.in_(['income', 'expense']),
+            Transaction.transaction_date >= start_date,
+            Transaction.transaction_date <= end_date
+        ).group_by(
+            Transaction.transaction_date,
+            Transaction.type,
+            Transaction.category_id
+        )
+        finance_rows = (await self.db.execute(finance_query)).all()
+        
+        # Net worth (current)
+        net_worth_query = select(
+            func.sum(case((Account.type == 'asset', Account.balance), else_=0)).label('assets'),
+            func.sum(case((Account.type == 'liability', Account.balance), else_=0)).label('liabilities')
+        )
+        net_worth_row = (await self.db.execute(net_worth_query)).first()
+        
+        # Timer series
+        daily_duration: Dict[date, int] = {}
+        heatmap_duration: Dict[date, int] = {}
+        daily_focus: Dict[date, List[float]] = {}
+        projects: Dict[int, Dict[str, Any]] = {}
+        session_count = 0
+        focus_sum = 0.0
+        focus_count = 0
+        for row in timer_rows:
+            duration = int(row.duration or 0)
+            if heatmap_start_date <= row.date <= heatmap_end_date:
+                heatmap_duration[row.date] = heatmap_duration.get(row.date, 0) + duration
+            if not start_date <= row.date <= end_date:
+                continue
+            
+            daily_duration[row.date] = daily_duration.get(row.date, 0) + duration
+            session_count += row.session_count
+            if row.focus_count:
+                focus_sum += float(row.focus_sum)
+                focus_count += row.focus_count
+                day_focus = daily_focus.setdefault(row.date, [0.0, 0])
+                day_focus[0] += float(row.focus_sum)
+                day_focus[1] += row.focus_count
+            if row.project_id is not None and row.project_name is not None:
+                project = projects.setdefault(row.project_id, {
+                    'name': row.project_name,
+                    'duration': 0,
+                    'color': row.project_color
+                })
+                project['duration'] += duration
+        
+        # Plan series
+        status_counts: Dict[str, int] = {}
+        priority_counts: Dict[str, int] = {}
+        for row in plan_rows:
+            status_counts[row.status] = status_counts.get(row.status, 0) + row.count
+            priority_counts[row.priority_matrix] = priority_counts.get(row.priority_matrix, 0) + row.count
+        
+        # Finance series
+        income_data: Dict[date, float] = {}
+        expense_data: Dict[date, float] = {}
+        categories: Dict[int, Dict[str, Any]] = {}
+        for row in finance_rows:
+            amount = float(row.amount)
+            if row.type == 'income':
+                income_data[row.transaction_date] = income_data.get(row.transaction_date, 0) + amount
+                continue
+            
+            expense_data[row.transaction_date] = expense_data.get(row.transaction_date, 0) + amount
+            if row.category_id is not None and row.category_name is not None:
+                category = categories.setdefault(row.category_id, {
+                    'name': row.category_name,
+                    'value': 0.0,
+                    'itemStyle': {'color': row.category_color}
+                })
+                category['value'] += amount
+        
+        dates = self._date_series(start_date, end_date)
+        total_assets = net_worth_row.assets or 0
+        total_liabilities = abs(net_worth_row.liabilities or 0)
+        
+        return {
+            'overview': {
+                'total_duration': sum(daily_duration.values()),
+                'session_count': session_count,
+                'avg_focus_score': focus_sum / focus_count if focus_count else 0.0,
+                'completed_plans': status_counts.get('completed', 0),
+                'total_plans': sum(status_counts.values()),
+                'total_income': sum(income_data.values()),
+                'total_expense': sum(expense_data.values()),
+                'net_worth': float(total_assets - total_liabilities)
+            },
+            'time_trend': [
+                {
+                    'date': str(d),
+                    'duration': daily_duration.get(d, 0),
+                    'completed_plans': completed_data.get(d, 0)
+                }
+                for d in dates
+            ],
+            'plan_completion': [
+                {
+                    'name': STATUS_NAMES.get(status, status),
+                    'value': count
+                }
+                for status, count in sorted(status_counts.items())
+            ],
+            'project_time': sorted(
+                projects.values(),
+                key=lambda p: p['duration'],
+                reverse=True
+            )[:10],
+            'focus_trend': [
+                {
+                    'date': str(d),
+                    'focus_score': round(daily_focus[d][0] / daily_focus[d][1], 1)
+                }
+                for d in sorted(daily_focus)
+            ],
+            'heatmap': [
+                {
+                    'date': str(d),
+                    'duration': heatmap_duration[d]
+                }
+                for d in sorted(heatmap_duration)
+            ],
+            'finance_trend': [
+                {
+                    'date': str(d),
+                    'income': income_data.get(d, 0),
+                    'expense': expense_data.get(d, 0)
+                }
+                for d in dates
+            ],
+            'expense_category': sorted(
+                categories.values(),
+                key=lambda c: c['value'],
+                reverse=True
+            ),
+            'daily_distribution': self._weekday_hours(daily_duration),
+            'priority_distribution': self._priority_percentages(priority_counts)
+        }
@@ -0,0 +1,88 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case
+from typing import List
+from app.models.tag import Tag, PlanTag, TransactionTag
+from app.models.timer import TimerSession
+from app.models.transaction import Transaction
+from app.schemas.tag import TagStats
+
+
+def tagged_plans(tags: List[str]):
+    """Ids of plans carrying every one of tags"""
+    names = set(tags)
+    return select(PlanTag.plan_id).join(
+        Tag, Tag.id == PlanTag.tag_id
+    ).where(
+        Tag.name.in_(names)
+    ).group_by(PlanTag.plan_id).having(func.count() == len(names))
+
+
+def tagged_transactions(tags: List[str]):
+    """Ids of transactions carrying every one of tags"""
+    names = set(tags)
+    return select(TransactionTag.transaction_id).join(
+        Tag, Tag.id == TransactionTag.tag_id
+    ).where(
+        Tag.name.in_(names)
+    ).group_by(TransactionTag.transaction_id).having(func.count() == len(names))
+
+
+class TagService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_stats(self) -> List[TagStats]:
+        """Per-tag plan and transaction counts, tracked time and income/expense"""
+        plans = select(
+            PlanTag.tag_id,
+            func.count().label('plan_count')
+        ).group_by(PlanTag.tag_id).subquery()
+        
+        tracked = select(
+            PlanTag.tag_id,
+            func.sum(TimerSession.duration).label('seconds')
+        ).join(
+            TimerSession, TimerSession.plan_id == PlanTag.plan_id
+        ).group_by(PlanTag.tag_id).subquery()
+        
+        money = select(
+            TransactionTag.tag_id,
+            func.count().label('transaction_count'),
+            func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
+            func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense')
+        ).join(
+            Transaction, Transaction.id == TransactionTag.transaction_id
+        ).group_by(TransactionTag.tag_id).subquery()
+        
+        query = select(
+            Tag.id,
+            Tag.name,
+            func.coalesce(plans.c.plan_count, 0),
+            func.coalesce(money.c.transaction_count, 0),
+            func.coalesce(tracked.c.seconds, 0),
+            func.coalesce(money.c.income, 0),
+            func.coalesce(money.c.expense, 0)
+        ).outerjoin(
+            plans, plans.c.tag_id == Tag.id
+        ).outerjoin(
+            tracked, tracked.c.tag_id == Tag.id
+        ).outerjoin(
+            money, money.c.tag_id == Tag.id
+        ).order_by(Tag.name)
+        
+        result = await self.db.execute(query)
+        
+        return [
+            TagStats(
+                id=id,
+                name=name,
+                plan_count=plan_count,
+                transaction_count=transaction_count,
+                tracked_seconds=seconds,
+                total_income=income,
+                total_expense=expense
+            )
+            for id, name, plan_count, transaction_count, seconds, income, expense in result.all()
+            # Tags whose last plan or transaction was untagged are kept for reuse
+            if plan_count or transaction_count
+        ]
@@ -1,11 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract, cast, Date
+from sqlalchemy import select, delete, func, and_, extract, cast
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from app.models.timer import TimerSession
 from app.models.active_timer import ActiveTimer
-from app.models.plan import Plan
+from app.models.plan import Plan, PlanArchive
+from app.models.project import Project
+from app.models.time_rollup import DailyTimeRollup, add_to_rollup, daily_rollup_backfill
+from app.services.plan_service import PlanService
+from app.utils.helpers import day_range
+from app.utils.cache import statistics_cache
+from app.utils.pagination import Page, keyset_paginate, page
 from app.schemas.timer import (
     TimerCreate, TimerStart, TimerUpdate, TimerResponse,
     TimerTodayStats, ActiveTimerResponse
@@ -17,41 +23,49 @@ class TimerService:
         self.db = db
     
     # Active Timer Management
+    def _active_timer_query(self):
+        """Active timers joined with the title and description of their plan"""
+        return select(
+            ActiveTimer,
+            Plan.title.label('plan_title'),
+            Plan.description.label('plan_description')
+        ).outerjoin(
+            Plan,
+            Plan.id == ActiveTimer.plan_id
+        )
+    
+    def _to_active_response(
+        self,
+        timer: ActiveTimer,
+        plan_title: Optional[str],
+        plan_description: Optional[str]
+    ) -> ActiveTimerResponse:
+        return ActiveTimerResponse(
+            id=timer.id,
+            planId=timer.plan_id,
+            planTitle=plan_title,
+            planDescription=plan_description,
+            title=timer.title,
+            elapsed=timer.elapsed,
+            isRunning=timer.is_running,
+            startTime=timer.start_time
+        )
+    
     async def get_active_timers(self) -> List[ActiveTimerResponse]:
         """Get all active timers"""
-        query = select(ActiveTimer).order_by(ActiveTimer.created_at.desc())
+        query = self._active_timer_query().order_by(ActiveTimer.created_at.desc())
         result = await self.db.execute(query)
-        timers = list(result.scalars().all())
-        
-        # Populate plan information
-        response = []
-        for timer in timers:
-            timer_data = {
-                "id": timer.id,
-                "planId": timer.plan_id,
-                "planTitle": None,
-                "planDescription": None,
-                "title": timer.title,
-                "elapsed": timer.elapsed,
-                "isRunning": timer.is_running,
-                "startTime": timer.start_time
-            }
-            
-            if timer.plan_id:
-                plan_result = await self.db.execute(
-                    select(Plan).where(Plan.id == timer.plan_id)
-                )
-                plan = plan_result.scalar_one_or_none()
-                if plan:
-                    timer_data["planTitle"] = plan.title
-                    timer_data["planDescription"] = plan.description
-            
-            response.append(ActiveTimerResponse(**timer_data))
-        
-        return response
+        
+        return [
+            self._to_active_response(timer, plan_title, plan_description)
+            for timer, plan_title, plan_description in result.all()
+        ]
     
     async def create_timer(self, data: TimerCreate) -> ActiveTimerResponse:
-        """Create a new timer"""
+        """Create a new timer, moving an archived plan's tree back into plans first"""
+        # Timers reference plans, and plans with a timer are never archived
+        restored = data.plan_id is not None and await PlanService(self.db)._restore([data.plan_id])
+        
         timer = ActiveTimer(
             plan_id=data.plan_id,
             title=data.title,
@@ -61,80 +75,43 @@ class TimerService:
         
         self.db.add(timer)
         await self.db.commit()
-        await self.db.refresh(timer)
-        
-        # Get plan info if exists
-        plan_title = None
-        plan_description = None
-        if timer.plan_id:
-            plan_result = await self.db.execute(
-                select(Plan).where(Plan.id == timer.plan_id)
-            )
-            plan = plan_result.scalar_one_or_none()
-            if plan:
-                plan_title = plan.title
-                plan_description = plan.description
+        if restored:
+            statistics_cache.invalidate("plans")
         
-        return ActiveTimerResponse(
-            id=timer.id,
-            planId=timer.plan_id,
-            planTitle=plan_title,
-            planDescription=plan_description,
-            title=timer.title,
-            elapsed=timer.elapsed,
-            isRunning=timer.is_running,
-            startTime=timer.start_time
+        result = await self.db.execute(
+            self._active_timer_query().where(ActiveTimer.id == timer.id)
         )
+        return self._to_active_response(*result.one())
     
     async def start_timer(self, timer_id: int) -> Optional[ActiveTimerResponse]:
         """Start a timer"""
         result = await self.db.execute(
-            select(ActiveTimer).where(ActiveTimer.id == timer_id)
+            self._active_timer_query().where(ActiveTimer.id == timer_id)
         )
-        timer = result.scalar_one_or_none()
+        row = result.first()
         
-        if not timer:
+        if not row:
             return None
         
+        timer, plan_title, plan_description = row
         timer.is_running = True
         timer.start_time = datetime.utcnow()
         
         await self.db.commit()
-        await self.db.refresh(timer)
-        
-        # Get plan info
-        plan_title = None
-        plan_description = None
-        if timer.plan_id:
-            plan_result = await self.db.execute(
-                select(Plan).where(Plan.id == timer.plan_id)
-            )
-            plan = plan_result.scalar_one_or_none()
-            if plan:
-                plan_title = plan.title
-                plan_description = plan.description
         
-        return ActiveTimerResponse(
-            id=timer.id,
-            planId=timer.plan_id,
-            planTitle=plan_title,
-            planDescription=plan_description,
-            title=timer.title,
-            elapsed=timer.elapsed,
-            isRunning=timer.is_running,
-            startTime=timer.start_time
-        )
+        return self._to_active_response(timer, plan_title, plan_description)
     
     async def pause_timer(self, timer_id: int) -> Optional[ActiveTimerResponse]:
         """Pause a timer"""
         result = await self.db.execute(
-            select(ActiveTimer).where(ActiveTimer.id == timer_id)
+            self._active_timer_query().where(ActiveTimer.id == timer_id)
         )
-        timer = result.scalar_one_or_none()
+        row = result.first()
         
-        if not timer:
+        if not row:
             return None
         
+        timer, plan_title, plan_description = row
         if timer.is_running and timer.start_time:
             # Calculate elapsed time since start
             elapsed_since_start = int((datetime.utcnow() - timer.start_time).total_seconds())
@@ -144,41 +121,27 @@ class TimerService:
         timer.start_time = None
         
         await self.db.commit()
-        await self.db.refresh(timer)
-        
-        # Get plan info
-        plan_title = None
-        plan_description = None
-        if timer.plan_id:
-            plan_result = await self.db.execute(
-                select(Plan).where(Plan.id == timer.plan_id)
-            )
-            plan = plan_result.scalar_one_or_none()
-            if plan:
-                plan_title = plan.title
-                plan_description = plan.description
         
-        return ActiveTimerResponse(
-            id=timer.id,
-            planId=timer.plan_id,
-            planTitle=plan_title,
-            planDescription=plan_description,
-            title=timer.title,
-            elapsed=timer.elapsed,
-            isRunning=timer.is_running,
-            startTime=timer.start_time
-        )
+        return self._to_active_response(timer, plan_title, plan_description)
     
     async def stop_timer(self, timer_id: int, data: Optional[TimerUpdate] = None) -> Optional[TimerResponse]:
         """Stop a timer and save as session"""
         result = await self.db.execute(
-            select(ActiveTimer).where(ActiveTimer.id == timer_id)
+            select(ActiveTimer, Plan, Project.name).outerjoin(
+                Plan,
+                Plan.id == ActiveTimer.plan_id
+            ).outerjoin(
+                Project,
+                Project.id == Plan.project_id
+            ).where(ActiveTimer.id == timer_id)
         )
-        timer = result.scalar_one_or_none()
+        row = result.first()
         
-        if not timer:
+        if not row:
             return None
         
+        timer, plan, project_name = row
+        
         # Calculate final elapsed time
         final_elapsed = timer.elapsed
         if timer.is_running and timer.start_time:
@@ -191,35 +154,60 @@ class TimerService:
             start_time=timer.created_at,
             end_time=datetime.utcnow(),
             duration=final_elapsed,
+            interrupt_count=0,
             notes=data.notes if data else None,
             focus_score=Decimal('85.0')  # Default focus score
         )
         
+        if plan:
+            session.project_id = plan.project_id
+            # Update plan's actual duration
+            plan.actual_duration = (plan.actual_duration or 0) + (final_elapsed // 60)
+        
         self.db.add(session)
+        await self._add_to_rollup(session)
         
         # Delete active timer
         await self.db.delete(timer)
         
         await self.db.commit()
         await self.db.refresh(session)
+        statistics_cache.invalidate("timer_sessions", session.start_time.date())
+        if plan:
+            # actual_duration and updated_at changed; updated_at moves out of past ranges
+            statistics_cache.invalidate("plans")
         
-        # Get plan info
-        plan_title = None
-        if session.plan_id:
-            plan_result = await self.db.execute(
-                select(Plan).where(Plan.id == session.plan_id)
-            )
-            plan = plan_result.scalar_one_or_none()
-            if plan:
-                plan_title = plan.title
-                # Update plan's actual duration
-                plan.actual_duration = (plan.actual_duration or 0) + (final_elapsed // 60)
-                await self.db.commit()
-        
-        session.plan_title = plan_title
+        session.plan_title = plan.title if plan else None
+        session.project_name = project_name
         
         return session
     
+    async def _add_to_rollup(self, session: TimerSession) -> None:
+        """Add a finished session to its daily_time_rollup row"""
+        day = session.start_time.date()
+        focus_count = 1 if session.focus_score is not None else 0
+        
+        await self.db.execute(add_to_rollup({
+            'day': day,
+            'project_id': session.project_id,
+            'plan_id': session.plan_id,
+            'total_duration': session.duration,
+            'session_count': 1,
+            'focus_score_sum': session.focus_score or 0,
+            'focus_score_count': focus_count,
+            'interrupt_count': session.interrupt_count
+        }))
+    
+    async def rebuild_daily_rollup(self) -> int:
+        """Recompute daily_time_rollup from all finished timer sessions"""
+        await self.db.execute(delete(DailyTimeRollup))
+        await self.db.execute(daily_rollup_backfill)
+        await self.db.commit()
+        statistics_cache.invalidate("timer_sessions")
+        
+        result = await self.db.execute(select(func.count(DailyTimeRollup.id)))
+        return result.scalar()
+    
     async def delete_timer(self, timer_id: int) -> bool:
         """Delete a timer"""
         result = await self.db.execute(
@@ -241,35 +229,44 @@ class TimerService:
         limit: int = 100,
         plan_id: Optional[int] = None,
         project_id: Optional[int] = None,
-        date: Optional[date] = None
-    ) -> List[TimerResponse]:
-        """Get timer sessions, optionally filtered by date"""
-        query = select(TimerSession)
+        date: Optional[date] = None,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Get timer sessions newest first, optionally filtered by date"""
+        query = select(
+            TimerSession,
+            func.coalesce(Plan.title, PlanArchive.title),
+            Project.name
+        ).outerjoin(
+            Plan,
+            Plan.id == TimerSession.plan_id
+        ).outerjoin(
+            PlanArchive,
+            PlanArchive.id == TimerSession.plan_id
+        ).outerjoin(
+            Project,
+            Project.id == TimerSession.project_id
+        )
         
         if plan_id:
             query = query.where(TimerSession.plan_id == plan_id)
         if project_id:
             query = query.where(TimerSession.project_id == project_id)
         if date:
-            # For SQLite, use date() function instead of CAST
-            query = query.where(func.date(TimerSession.start_time) == date)
+            query = query.where(*day_range(TimerSession.start_time, date, date))
         
-        query = query.order_by(TimerSession.start_time.desc()).offset(skip).limit(limit)
+        query = keyset_paginate(
+            query, TimerSession.start_time, TimerSession.id, limit, cursor
+        ).offset(skip)
         
         result = await self.db.execute(query)
-        sessions = list(result.scalars().all())
-        
-        # Populate plan titles
-        for session in sessions:
-            if session.plan_id:
-                plan_result = await self.db.execute(
-                    select(Plan).where(Plan.id == session.plan_id)
-                )
-                plan = plan_result.scalar_one_or_none()
-                if plan:
-                    session.plan_title = plan.title
-        
-        return sessions
+        rows = result.all()
+        
+        for session, plan_title, project_name, _ in rows:
+            session.plan_title = plan_title
+            session.project_name = project_name
+        
+        return page(rows, limit)
     
     async def get_today_stats(self) -> TimerTodayStats:
         """Get today's statistics"""
@@ -280,7 +277,7 @@ class TimerService:
             func.count(TimerSession.id).label('session_count'),
             func.avg(TimerSession.focus_score).label('focus_score_avg')
         ).where(
-            func.date(TimerSession.start_time) == today
+            *day_range(TimerSession.start_time, today, today)
         )
         
         result = await self.db.execute(query)
@@ -0,0 +1,115 @@
+import functools
+import inspect
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+
+
+class ResultCache:
+    """In-process LRU cache for query results.
+
+    Every entry remembers the version of each table it was computed from, and
+    writers call invalidate() after committing. Results for ranges entirely in
+    the past only depend on writes dated before today, so ordinary writes for
+    today leave them in place. The cache is per process: with several workers
+    each keeps its own copy.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._past_versions: Dict[str, int] = {}
+
+    def invalidate(self, table: str, day: Optional[date] = None) -> None:
+        """Record a committed write to table, dated day if the row has a date"""
+        self._versions[table] = self._versions.get(table, 0) + 1
+        if day is None or day < date.today():
+            self._past_versions[table] = self._past_versions.get(table, 0) + 1
+
+    def versions(self, tables: Tuple[str, ...], past: bool) -> Tuple[int, ...]:
+        """Current versions of tables, as seen by current or past-range entries"""
+        versions = self._past_versions if past else self._versions
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def get(self, key: Tuple, versions: Tuple[int, ...]) -> Tuple[bool, Any]:
+        """Return (True, value) if key is cached at these versions"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == versions:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Tuple, versions: Tuple[int, ...], value: Any) -> None:
+        """Store value, evicting the least recently used entries"""
+        self._entries[key] = (versions, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+statistics_cache = ResultCache(get_settings().STATS_CACHE_SIZE)
+
+
+def cached(*tables: str):
+    """Cache an async service method's result by its arguments.
+
+    tables lists what the result is computed from. Date arguments that are
+    all before today mark a past range; anything else (including None, which
+    means "relative to today") is keyed by today's date as well. Other
+    arguments, such as an interval name, are only part of the key.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple(
+                (name, value) for name, value in bound.arguments.items()
+                if name != "self"
+            )
+
+            today = date.today()
+            dates = [
+                value for _, value in arguments
+                if value is None or isinstance(value, date)
+            ]
+            past = bool(dates) and all(
+                isinstance(value, date) and value < today
+                for value in dates
+            )
+            key = (method.__qualname__, arguments) + (() if past else (today,))
+
+            # Versions are read before computing, so a write committed while
+            # the query runs leaves this entry stale rather than wrong
+            versions = statistics_cache.versions(tables, past)
+            hit, value = statistics_cache.get(key, versions)
+            if hit:
+                return value
+
+            value = await method(self, *args, **kwargs)
+            statistics_cache.set(key, versions, value)
+            return value
+
+        return wrapper
+
+    return decorator
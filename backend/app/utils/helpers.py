@@ -1,5 +1,6 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import String, type_coerce
 
 
 def format_duration(seconds: int) -> str:
@@ -44,6 +45,19 @@ def get_start_of_month(dt: Optional[datetime] = None) -> datetime:
     return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
+def day_range(column, start_date: date, end_date: date) -> List:
+    """Half-open [start_date, end_date + 1 day) predicates on a DateTime column.
+
+    The bounds are compared as ISO date strings so SQLite can use an index on
+    the column, and values stored with or without microseconds sort correctly.
+    """
+    value = type_coerce(column, String)
+    return [
+        value >= start_date.isoformat(),
+        value < (end_date + timedelta(days=1)).isoformat()
+    ]
+
+
 def priority_matrix_label(priority: str) -> str:
     """Get human readable priority label"""
     labels = {
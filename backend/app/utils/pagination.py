@@ -0,0 +1,64 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+from sqlalchemy import String, tuple_, type_coerce
+
+
+class Page(list):
+    """A page of results; next_cursor is None on the last page"""
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(key: str, id: int) -> str:
+    """Opaque cursor for the row with sort key `key` and primary key `id`"""
+    raw = json.dumps([key, id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key, id = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(key, str) or not isinstance(id, int):
+        raise ValueError("Invalid cursor")
+    return key, id
+
+
+def keyset_paginate(query, column, id_column, limit: int, cursor: Optional[str] = None):
+    """Order newest first by (column, id_column) and resume after cursor.
+
+    The sort key is compared as the text SQLite stored, since rows written
+    through server defaults and through Python differ in datetime format. One
+    extra row is fetched so page() can tell whether another page follows.
+    """
+    key = type_coerce(column, String)
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = query.where(tuple_(key, id_column) < tuple_(value, last_id))
+
+    return query.add_columns(key.label("cursor_key")).order_by(
+        column.desc(),
+        id_column.desc()
+    ).limit(limit + 1)
+
+
+def page(rows: List, limit: int) -> Page:
+    """Build a Page from rows of (item, ..., sort key) returned by keyset_paginate"""
+    result = Page(row[0] for row in rows[:limit])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        result.next_cursor = encode_cursor(last[-1], last[0].id)
+    return result
+
+
+def row_page(rows: List, limit: int) -> Page:
+    """Build a Page of flat rows (column projections with an id column) returned by keyset_paginate"""
+    result = Page(rows[:limit])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        result.next_cursor = encode_cursor(last.cursor_key, last.id)
+    return result
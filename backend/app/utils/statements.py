@@ -0,0 +1,178 @@
+"""Line-by-line parsers for bank statement exports (CSV, OFX, QIF).
+
+Each parser takes an iterable of text lines and yields StatementRow objects as
+it goes, so a statement is never held in memory as a whole.
+"""
+import csv
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator, Optional
+
+STATEMENT_FORMATS = ("csv", "ofx", "qif")
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y%m%d", "%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y")
+
+# Accepted CSV header names per field
+_CSV_COLUMNS = {
+    "date": ("date", "transaction_date", "posted", "日期", "交易日期", "记账日期"),
+    "amount": ("amount", "金额", "交易金额"),
+    "credit": ("credit", "deposit", "收入", "存入"),
+    "debit": ("debit", "withdrawal", "支出", "支取"),
+    "description": ("description", "payee", "name", "memo", "备注", "摘要", "交易对方"),
+    "category": ("category", "分类", "类别"),
+    "account": ("account", "transfer_account", "对方账户"),
+}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+@dataclass
+class StatementRow:
+    """One statement line; amount is positive for money into the account"""
+    line: int
+    transaction_date: date
+    amount: Decimal
+    description: Optional[str] = None
+    category: Optional[str] = None
+    account: Optional[str] = None  # other account of a transfer
+    reference: Optional[str] = None  # bank-assigned id, e.g. OFX FITID
+
+
+def parse_statement(lines: Iterable[str], format: str) -> Iterator[StatementRow]:
+    """Parse a statement in the given format"""
+    parsers = {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}
+    if format not in parsers:
+        raise ValueError(f"Unsupported statement format: {format}")
+    return parsers[format](lines)
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[StatementRow]:
+    """CSV with a header row: a date, a signed amount (or credit/debit) and optional text columns"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for field, aliases in _CSV_COLUMNS.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                columns[field] = index
+                break
+    if "date" not in columns or not ("amount" in columns or {"credit", "debit"} & columns.keys()):
+        raise ValueError("CSV header needs a date column and an amount or credit/debit column")
+
+    def cell(record, field):
+        index = columns.get(field)
+        if index is None or index >= len(record):
+            return None
+        return record[index].strip() or None
+
+    for record in reader:
+        line = reader.line_num
+        if not any(value.strip() for value in record):
+            continue
+        if "amount" in columns:
+            amount = _parse_amount(cell(record, "amount"), line)
+        else:
+            amount = (
+                _parse_amount(cell(record, "credit") or "0", line)
+                - _parse_amount(cell(record, "debit") or "0", line)
+            )
+        yield StatementRow(
+            line=line,
+            transaction_date=_parse_date(cell(record, "date"), line),
+            amount=amount,
+            description=cell(record, "description"),
+            category=cell(record, "category"),
+            account=cell(record, "account")
+        )
+
+
+def parse_ofx(lines: Iterable[str]) -> Iterator[StatementRow]:
+    """STMTTRN records of an OFX file, SGML (1.x) or XML (2.x)"""
+    record = None
+    start = 0
+    for line, text in enumerate(lines, 1):
+        for closing, tag, value in _OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    record, start = {}, line
+                elif record is not None:
+                    yield _ofx_row(record, start)
+                    record = None
+            elif record is not None and not closing and value.strip():
+                record[tag] = value.strip()
+
+
+def _ofx_row(record: dict, line: int) -> StatementRow:
+    posted = record.get("DTPOSTED", "")[:8]
+    name, memo = record.get("NAME"), record.get("MEMO")
+    return StatementRow(
+        line=line,
+        transaction_date=_parse_date(posted, line),
+        amount=_parse_amount(record.get("TRNAMT"), line),
+        description=" - ".join(text for text in (name, memo) if text) or None,
+        reference=record.get("FITID")
+    )
+
+
+def parse_qif(lines: Iterable[str]) -> Iterator[StatementRow]:
+    """QIF bank/card records: D date, T amount, P payee, M memo, L category or [account]"""
+    record = {}
+    start = 0
+    for line, text in enumerate(lines, 1):
+        text = text.rstrip("\r\n")
+        if not text or text.startswith("!"):
+            continue
+        code, value = text[0], text[1:].strip()
+        if code == "^":
+            if record:
+                yield _qif_row(record, start)
+            record = {}
+            continue
+        if not record:
+            start = line
+        # Split lines (S/E/$) repeat codes; only the first of each is kept
+        record.setdefault(code, value)
+    if record:
+        yield _qif_row(record, start)
+
+
+def _qif_row(record: dict, line: int) -> StatementRow:
+    category = record.get("L")
+    account = None
+    if category and category.startswith("[") and category.endswith("]"):
+        account, category = category[1:-1], None
+    payee, memo = record.get("P"), record.get("M")
+    return StatementRow(
+        line=line,
+        transaction_date=_parse_date(record.get("D", "").replace("'", "/"), line),
+        amount=_parse_amount(record.get("T") or record.get("U"), line),
+        description=" - ".join(text for text in (payee, memo) if text) or None,
+        category=category,
+        account=account
+    )
+
+
+def _parse_date(value: Optional[str], line: int) -> date:
+    for format in _DATE_FORMATS:
+        try:
+            return datetime.strptime((value or "").strip(), format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Line {line}: unrecognized date {value!r}")
+
+
+def _parse_amount(value: Optional[str], line: int) -> Decimal:
+    text = (value or "").strip().replace(",", "").replace("¥", "").replace("$", "")
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]
+    try:
+        return Decimal(text).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Line {line}: unrecognized amount {value!r}")
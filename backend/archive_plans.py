@@ -0,0 +1,79 @@
+"""
+归档已完成计划 - 将完成超过 PLAN_ARCHIVE_AFTER_DAYS 天的计划树分批移入 plans_archive
+
+首次运行会升级旧数据库：plans 改为 AUTOINCREMENT（归档计划的 id 不再被复用），
+timer_sessions 和 transactions 去掉指向 plans 的外键（归档后仍保留 plan_id）。
+"""
+import asyncio
+import sys
+from app.config import get_settings
+from app.database import AsyncSessionLocal, init_db
+from app.models.plan import Plan
+from app.models.timer import TimerSession
+from app.models.transaction import Transaction
+from app.services.plan_service import PlanService
+from app.schema import (
+    create_plan_intervals, create_plans_fts, create_tag_links, create_ledger, create_finance_summary,
+    rebuild_table, without_foreign_keys
+)
+
+
+def needs_rebuild(sync_conn, table) -> bool:
+    """表结构是否仍是归档前的旧版本"""
+    if table is Plan.__table__:
+        sql = sync_conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'plans'"
+        ).scalar()
+        return "AUTOINCREMENT" not in sql
+
+    foreign_keys = sync_conn.exec_driver_sql(f"PRAGMA foreign_key_list({table.name})").all()
+    return any(row[2] == "plans" for row in foreign_keys)
+
+
+def upgrade_schema(sync_conn) -> bool:
+    """重建仍是旧结构的表，并恢复其触发器和派生索引"""
+    tables = [
+        table for table in (Plan.__table__, TimerSession.__table__, Transaction.__table__)
+        if needs_rebuild(sync_conn, table)
+    ]
+    if not tables:
+        return False
+
+    sync_conn.exec_driver_sql("BEGIN")
+    for table in tables:
+        rebuild_table(sync_conn, table)
+    create_plan_intervals(sync_conn)
+    create_plans_fts(sync_conn)
+    create_tag_links(sync_conn)
+    create_ledger(sync_conn)
+    create_finance_summary(sync_conn)
+
+    violations = sync_conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+    if violations:
+        raise RuntimeError(f"Foreign key violations after rebuild: {violations}")
+    return True
+
+
+async def archive(older_than_days: int):
+    """升级表结构后分批归档"""
+    settings = get_settings()
+
+    # 建表，旧库先补建 plans_archive、索引和派生表，已是最新结构时不做改动
+    await init_db()
+
+    # 重建被引用的表需关闭外键检查
+    await without_foreign_keys(upgrade_schema)
+
+    async with AsyncSessionLocal() as db:
+        count = await PlanService(db).archive_completed(
+            older_than_days,
+            settings.PLAN_ARCHIVE_BATCH_SIZE
+        )
+
+    print(f"✓ Archived {count} plans completed over {older_than_days} days ago")
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else get_settings().PLAN_ARCHIVE_AFTER_DAYS
+    print("Archiving completed plans...")
+    asyncio.run(archive(days))
@@ -0,0 +1,52 @@
+"""
+导入银行账单 - 流式解析 CSV/OFX/QIF 文件，按内容哈希去重后分批写入交易
+
+用法: python import_statements.py <账户ID> <文件>... [--encoding gbk]
+格式按扩展名识别；重复导入同一账单或有重叠的账单不会产生重复交易。
+"""
+import argparse
+import asyncio
+import os
+import time
+from app.database import AsyncSessionLocal, init_db
+from app.services.accounting_service import AccountingService
+from app.utils.statements import STATEMENT_FORMATS, parse_statement
+
+
+async def import_files(account_id: int, paths, encoding: str):
+    """逐个文件导入，每个文件一个事务"""
+    # 建表，旧库补字段和索引（需补 import_hash），已是最新结构时不做改动
+    await init_db()
+
+    for path in paths:
+        format = os.path.splitext(path)[1].lstrip(".").lower()
+        if format not in STATEMENT_FORMATS:
+            print(f"✗ {path}: unsupported format")
+            continue
+
+        started = time.perf_counter()
+        with open(path, encoding=encoding, newline="") as lines:
+            async with AsyncSessionLocal() as db:
+                result = await AccountingService(db).import_statement(
+                    account_id, parse_statement(lines, format)
+                )
+        if result is None:
+            raise SystemExit(f"Account {account_id} not found")
+
+        print(
+            f"✓ {path}: {result.imported} imported, {result.duplicates} duplicates, "
+            f"{result.skipped} skipped in {time.perf_counter() - started:.2f}s"
+        )
+        for changed_id, delta in result.balance_changes.items():
+            print(f"    account {changed_id}: {delta:+}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import bank statements")
+    parser.add_argument("account_id", type=int)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    args = parser.parse_args()
+
+    print("Importing statements...")
+    asyncio.run(import_files(args.account_id, args.paths, args.encoding))
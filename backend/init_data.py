@@ -7,6 +7,8 @@ from app.models.project import Project
 from app.models.plan import Plan
 from app.models.transaction import Category, Transaction
 from app.models.timer import TimerSession
+from app.services.timer_service import TimerService
+from app.services.project_service import ProjectService
 from datetime import datetime, timedelta, date
 
 
@@ -174,6 +176,12 @@ async def init_sample_data():
             session.add(session_obj)
         
         await session.commit()
+        
+        # Build the daily time rollup for the sample sessions
+        await TimerService(session).rebuild_daily_rollup()
+        
+        # Count the sample plans into their projects
+        await ProjectService(session).reconcile_plan_counts()
         print("Sample data initialized successfully!")
 
 
@@ -62,17 +62,17 @@ async def migrate():
         except Exception as e:
             print(f"Data migration may have already been done: {e}")
         
-        # 创建示例账户
+        # 创建示例账户（金额以分存储）
         try:
             await conn.execute(text("""
                 INSERT INTO accounts (name, type, sub_type, balance, initial_balance, icon, color, is_active, is_default)
                 VALUES 
-                    ('现金', 'asset', 'cash', 1000.00, 1000.00, 'wallet', '#10b981', 1, 1),
-                    ('工商银行', 'asset', 'bank_card', 5000.00, 5000.00, 'building-2', '#3b82f6', 1, 0),
-                    ('微信支付', 'asset', 'wechat', 500.00, 500.00, 'message-circle', '#10b981', 1, 0),
-                    ('支付宝', 'asset', 'alipay', 800.00, 800.00, 'smartphone', '#1890ff', 1, 0),
-                    ('招商银行信用卡', 'liability', 'credit_card', -1200.00, 0.00, 'credit-card', '#ef4444', 1, 0),
-                    ('花呗', 'liability', 'bnpl', -300.00, 0.00, 'shopping-bag', '#f59e0b', 1, 0)
+                    ('现金', 'asset', 'cash', 100000, 100000, 'wallet', '#10b981', 1, 1),
+                    ('工商银行', 'asset', 'bank_card', 500000, 500000, 'building-2', '#3b82f6', 1, 0),
+                    ('微信支付', 'asset', 'wechat', 50000, 50000, 'message-circle', '#10b981', 1, 0),
+                    ('支付宝', 'asset', 'alipay', 80000, 80000, 'smartphone', '#1890ff', 1, 0),
+                    ('招商银行信用卡', 'liability', 'credit_card', -120000, 0, 'credit-card', '#ef4444', 1, 0),
+                    ('花呗', 'liability', 'bnpl', -30000, 0, 'shopping-bag', '#f59e0b', 1, 0)
             """))
             print("✓ Created sample accounts")
         except Exception as e:
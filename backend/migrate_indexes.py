@@ -0,0 +1,34 @@
+"""
+数据库迁移脚本 - 为统计和计时查询添加复合索引（每日计时汇总的键改为唯一），以及计划时间区间索引、全文索引、标签关联表、记账分录、导入去重字段和月度收支汇总，
+并把旧数据库的金额列换算为整数分
+"""
+import asyncio
+from app.database import engine, Base
+from app.schema import (
+    add_columns, rebuild_daily_rollup, create_indexes, create_plan_intervals, create_plans_fts, create_tag_links,
+    create_ledger, create_finance_summary, convert_money, without_foreign_keys
+)
+
+
+async def migrate():
+    """执行数据库迁移"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_columns)
+        await conn.run_sync(rebuild_daily_rollup)
+        await conn.run_sync(create_indexes)
+        await conn.run_sync(create_plan_intervals)
+        await conn.run_sync(create_plans_fts)
+        await conn.run_sync(create_tag_links)
+        await conn.run_sync(create_ledger)
+        await conn.run_sync(create_finance_summary)
+    
+    # 重建被引用的 accounts、categories 需关闭外键检查
+    await without_foreign_keys(convert_money)
+    
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting database migration...")
+    asyncio.run(migrate())
@@ -0,0 +1,21 @@
+"""
+重建每日计时汇总表 (daily_time_rollup)
+"""
+import asyncio
+from app.database import init_db, AsyncSessionLocal
+from app.services.timer_service import TimerService
+
+
+async def rebuild():
+    """根据 timer_sessions 全量重建汇总数据"""
+    await init_db()
+    
+    async with AsyncSessionLocal() as db:
+        rows = await TimerService(db).rebuild_daily_rollup()
+    
+    print(f"✓ daily_time_rollup rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    print("Rebuilding daily time rollup...")
+    asyncio.run(rebuild())
@@ -0,0 +1,35 @@
+"""
+核对账户余额 - 按初始余额和全部交易重算每个账户的余额并报告偏差
+
+用法: python reconcile_balances.py [--fix]
+加 --fix 时在同一事务中把有偏差的账户改为重算结果。
+"""
+import asyncio
+import sys
+import time
+from app.database import init_db, AsyncSessionLocal
+from app.services.account_service import AccountService
+
+
+async def reconcile(fix: bool):
+    """重算并报告（可选修正）账户余额"""
+    await init_db()
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        result = await AccountService(db).reconcile_balances(fix=fix)
+    elapsed = time.perf_counter() - started
+
+    for drift in result.drifted:
+        print(
+            f"  #{drift.account_id} {drift.name}: balance {drift.balance}, "
+            f"expected {drift.expected_balance}, drift {drift.drift:+}"
+        )
+    print(f"✓ Checked {result.checked} accounts in {elapsed:.2f}s, {len(result.drifted)} drifted")
+    if fix:
+        print(f"✓ Fixed {result.fixed} accounts")
+
+
+if __name__ == "__main__":
+    print("Reconciling account balances...")
+    asyncio.run(reconcile("--fix" in sys.argv[1:]))
@@ -0,0 +1,21 @@
+"""
+校正项目计划计数 - 根据 plans 和 plans_archive 表重算 plan_total、plan_completed 和进度
+"""
+import asyncio
+from app.database import init_db, AsyncSessionLocal
+from app.services.project_service import ProjectService
+
+
+async def reconcile():
+    """重建全部项目的计划计数"""
+    await init_db()
+    
+    async with AsyncSessionLocal() as db:
+        count = await ProjectService(db).reconcile_plan_counts()
+    
+    print(f"✓ Reconciled plan counts for {count} projects")
+
+
+if __name__ == "__main__":
+    print("Reconciling project plan counts...")
+    asyncio.run(reconcile())
@@ -0,0 +1,125 @@
+"""
+测试账户汇总和账户列表 - 汇总一条 SQL 完成，总额与可用余额与逐个账户计算一致，列表、详情、创建和更新返回同样的响应
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "account_summary.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+ACCOUNTS = 3000
+
+
+def seed():
+    """直接写入大量账户（金额以分存储），含停用账户、有无信用额度的负债账户"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executemany(
+            "INSERT INTO accounts (name, type, balance, initial_balance, credit_limit, is_active, is_default) "
+            "VALUES (?, ?, ?, 0, ?, ?, 0)",
+            (
+                (
+                    f"账户{i}",
+                    "liability" if i % 3 == 0 else "asset",
+                    -(i * 37 % 100000) if i % 3 == 0 else i * 53 % 1000000,
+                    (i % 4) * 500000 if i % 3 == 0 else None,
+                    i % 10 != 0,
+                )
+                for i in range(ACCOUNTS)
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def expected_available(account):
+    balance = Decimal(account["balance"])
+    if account["type"] == "liability" and account["credit_limit"]:
+        return Decimal(account["credit_limit"]) + balance
+    return balance
+
+
+def test_account_summary():
+    print("=" * 60)
+    print("账户汇总和账户列表测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        card = client.post(f"{BASE_URL}/accounts", json={
+            "name": "信用卡", "type": "liability", "initial_balance": -300.25, "credit_limit": 5000
+        })
+        assert card.status_code == 201
+        card = card.json()
+        assert Decimal(card["available_balance"]) == Decimal("4699.75"), card
+        updated = client.put(f"{BASE_URL}/accounts/{card['id']}", json={"credit_limit": 0}).json()
+        assert Decimal(updated["available_balance"]) == Decimal("-300.25"), updated
+        assert client.get(f"{BASE_URL}/accounts/{card['id']}").json() == updated
+        assert client.get(f"{BASE_URL}/accounts/9999").status_code == 404
+        assert client.put(f"{BASE_URL}/accounts/9999", json={"icon": "x"}).status_code == 404
+        print("✓ 创建、更新和详情返回同样的响应，无额度的负债账户可用余额为余额")
+
+        seed()
+        accounts = client.get(f"{BASE_URL}/accounts").json()
+        assert len(accounts) == ACCOUNTS + 1
+        for account in accounts:
+            assert Decimal(account["available_balance"]) == expected_available(account), account
+        assert client.get(f"{BASE_URL}/accounts/{accounts[5]['id']}").json() == accounts[5]
+        liabilities = client.get(f"{BASE_URL}/accounts", params={"type": "liability", "is_active": True}).json()
+        assert liabilities == [a for a in accounts if a["type"] == "liability" and a["is_active"]]
+        print(f"✓ 列表 {len(accounts)} 个账户的可用余额与逐个计算一致，筛选与列表一致")
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            started = time.perf_counter()
+            summary = client.get(f"{BASE_URL}/accounts/summary").json()
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+        assert len(statements) == 1, statements
+        print(f"✓ 汇总 1 条 SQL: {elapsed * 1000:.1f}ms")
+
+        active = [a for a in accounts if a["is_active"]]
+        assets = [a for a in active if a["type"] == "asset"]
+        liabilities = [a for a in active if a["type"] == "liability"]
+        total_assets = sum(Decimal(a["balance"]) for a in assets)
+        total_liabilities = sum(abs(Decimal(a["balance"])) for a in liabilities)
+        assert Decimal(summary["total_assets"]) == total_assets
+        assert Decimal(summary["total_liabilities"]) == total_liabilities
+        assert Decimal(summary["net_worth"]) == total_assets - total_liabilities
+        assert summary["asset_accounts"] == assets
+        assert summary["liability_accounts"] == liabilities
+        print("✓ 总资产、总负债和各账户与列表中的活跃账户一致，停用账户不计入")
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            conn.execute("UPDATE accounts SET is_active = 0")
+            conn.commit()
+        finally:
+            conn.close()
+        empty = client.get(f"{BASE_URL}/accounts/summary").json()
+        assert Decimal(empty["total_assets"]) == 0 and Decimal(empty["net_worth"]) == 0
+        assert empty["asset_accounts"] == [] and empty["liability_accounts"] == []
+        print("✓ 没有活跃账户时汇总为 0")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_account_summary()
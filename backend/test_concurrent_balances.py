@@ -0,0 +1,132 @@
+"""
+测试并发记账下的账户余额一致性 - 余额应等于初始余额加上全部交易的影响
+"""
+import asyncio
+import os
+import random
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "concurrent_balances.db")
+
+from sqlalchemy import select
+from app.database import init_db, engine, AsyncSessionLocal
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.schemas.account import AccountCreate
+from app.schemas.accounting import TransactionCreate, TransactionUpdate
+from app.services.account_service import AccountService
+from app.services.accounting_service import AccountingService
+
+WORKERS = 12
+OPERATIONS_PER_WORKER = 40
+
+
+async def create_accounts():
+    """创建两个资产账户和一个信用卡账户"""
+    async with AsyncSessionLocal() as db:
+        service = AccountService(db)
+        accounts = [
+            await service.create(AccountCreate(name="储蓄卡", type="asset", initial_balance=Decimal("1000.00"))),
+            await service.create(AccountCreate(name="支付宝", type="asset", initial_balance=Decimal("500.00"))),
+            await service.create(AccountCreate(
+                name="信用卡", type="liability", initial_balance=Decimal("0.00"), credit_limit=Decimal("5000.00")
+            )),
+        ]
+        return [account.id for account in accounts]
+
+
+def random_transaction(rng, account_ids):
+    """生成一笔随机交易"""
+    bank, wallet, credit = account_ids
+    amount = Decimal(rng.randint(1, 20000)) / 100
+    kind = rng.choice(["income", "expense", "transfer", "repayment"])
+
+    if kind == "income":
+        return TransactionCreate(type=kind, amount=amount, to_account_id=rng.choice([bank, wallet]),
+                                 transaction_date=date.today())
+    if kind == "expense":
+        return TransactionCreate(type=kind, amount=amount, from_account_id=rng.choice(account_ids),
+                                 transaction_date=date.today())
+    if kind == "transfer":
+        return TransactionCreate(type=kind, amount=amount, from_account_id=bank, to_account_id=wallet,
+                                 transaction_date=date.today())
+    return TransactionCreate(type=kind, amount=amount, from_account_id=wallet, to_account_id=credit,
+                             transaction_date=date.today())
+
+
+async def worker(seed, account_ids):
+    """每个任务使用独立会话，交替创建、修改和删除交易"""
+    rng = random.Random(seed)
+    created = []
+
+    for _ in range(OPERATIONS_PER_WORKER):
+        async with AsyncSessionLocal() as db:
+            service = AccountingService(db)
+            action = rng.random()
+
+            if created and action < 0.15:
+                await service.delete(created.pop(rng.randrange(len(created))))
+            elif created and action < 0.3:
+                await service.update(
+                    rng.choice(created),
+                    TransactionUpdate(amount=Decimal(rng.randint(1, 20000)) / 100)
+                )
+            else:
+                transaction = await service.create(random_transaction(rng, account_ids))
+                created.append(transaction.id)
+
+
+async def expected_balances(db):
+    """根据初始余额和现存交易重新计算余额"""
+    accounts = (await db.execute(select(Account))).scalars().all()
+    balances = {account.id: Decimal(account.initial_balance) for account in accounts}
+
+    transactions = (await db.execute(select(Transaction))).scalars().all()
+    for transaction in transactions:
+        amount = Decimal(transaction.amount)
+        if transaction.type in ("income", "transfer", "repayment") and transaction.to_account_id:
+            balances[transaction.to_account_id] += amount
+        if transaction.type in ("expense", "transfer", "repayment") and transaction.from_account_id:
+            balances[transaction.from_account_id] -= amount
+
+    return balances, len(transactions)
+
+
+async def test_concurrent_balances():
+    print("=" * 60)
+    print("并发记账余额一致性测试")
+    print("=" * 60)
+
+    await init_db()
+    account_ids = await create_accounts()
+
+    await asyncio.gather(*(worker(seed, account_ids) for seed in range(WORKERS)))
+
+    async with AsyncSessionLocal() as db:
+        balances, transaction_count = await expected_balances(db)
+        accounts = (await db.execute(select(Account))).scalars().all()
+
+    print(f"✓ {WORKERS} 个并发任务共写入 {transaction_count} 笔交易")
+
+    mismatches = 0
+    for account in accounts:
+        actual = Decimal(account.balance).quantize(Decimal("0.01"))
+        expected = balances[account.id].quantize(Decimal("0.01"))
+        if actual != expected:
+            mismatches += 1
+            print(f"✗ {account.name}: 余额 {actual}，应为 {expected}")
+        else:
+            print(f"✓ {account.name}: 余额 {actual}")
+
+    await engine.dispose()
+
+    print("\n" + "=" * 60)
+    assert mismatches == 0, f"{mismatches} 个账户余额不一致"
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_concurrent_balances())
@@ -0,0 +1,199 @@
+"""
+测试月度收支汇总 - 交易增删改只调整所在月份的汇总行，汇总、收支趋势和支出分类读取汇总表且与逐笔求和一致
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "finance_summary.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import sqlite
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.services.accounting_service import AccountingService, finance_totals
+
+BASE_URL = "/api/v1"
+YEARS = 4
+PER_DAY = 30
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def summary_rows():
+    return execute(
+        "SELECT month, type, category_id, from_account_id, to_account_id, total, transaction_count "
+        "FROM monthly_finance_summary ORDER BY 1, 2, 3, 4, 5"
+    )
+
+
+def recomputed_rows():
+    """直接按交易重新汇总，用于与触发器维护的结果比较"""
+    return execute(
+        "SELECT date(transaction_date, 'start of month'), type, category_id, from_account_id, to_account_id, "
+        "sum(amount), count(*) FROM transactions "
+        "GROUP BY 1, 2, 3, 4, 5 ORDER BY 1, 2, 3, 4, 5"
+    )
+
+
+def direct_totals(start_date, end_date):
+    rows = execute(
+        "SELECT type, sum(amount) FROM transactions "
+        "WHERE type IN ('income', 'expense') AND transaction_date BETWEEN ? AND ? GROUP BY type",
+        (start_date, end_date)
+    )
+    return {type: Decimal(total).scaleb(-2) for type, total in rows}
+
+
+def monthly_summary(year, month):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await AccountingService(db).get_monthly_summary(year, month)
+    return run
+
+
+def seed(bank, salary, food, rent):
+    """直接写入多年交易（汇总由触发器维护，金额以分存储）"""
+    rows = []
+    for year in range(2020, 2020 + YEARS):
+        for month in range(1, 13):
+            for day in range(1, 29):
+                for i in range(PER_DAY):
+                    if i == 0:
+                        rows.append(("income", (9000 + day) * 100, salary, None, bank))
+                    else:
+                        rows.append(("expense", i % 97 * 100 + 25, food if i % 3 else rent, bank, None))
+                    rows[-1] += (f"{year}-{month:02d}-{day:02d}",)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category_id, from_account_id, to_account_id, "
+            "transaction_date, tags) VALUES (?, ?, ?, ?, ?, ?, '[]')",
+            rows
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def test_finance_summary():
+    print("=" * 60)
+    print("月度收支汇总测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        bank = client.post(f"{BASE_URL}/accounts", json={
+            "name": "银行卡", "type": "asset", "initial_balance": 0
+        }).json()["id"]
+        salary = client.post(f"{BASE_URL}/accounting/categories", json={"name": "工资", "type": "income"}).json()["id"]
+        food = client.post(f"{BASE_URL}/accounting/categories", json={"name": "餐饮", "type": "expense"}).json()["id"]
+        rent = client.post(f"{BASE_URL}/accounting/categories", json={"name": "房租", "type": "expense"}).json()["id"]
+
+        def transaction(type, amount, day, category_id, **accounts):
+            return client.post(f"{BASE_URL}/accounting/transactions", json={
+                "type": type, "amount": amount, "transaction_date": day, "category_id": category_id, **accounts
+            }).json()
+
+        lunch = transaction("expense", 35.5, "2019-03-10", food, from_account_id=bank)
+        transaction("expense", 20, "2019-03-28", food, from_account_id=bank)
+        transaction("income", 8000, "2019-03-05", salary, to_account_id=bank)
+        assert summary_rows() == [
+            ("2019-03-01", "expense", food, bank, None, 5550, 2),
+            ("2019-03-01", "income", salary, None, bank, 800000, 1),
+        ], summary_rows()
+        print("✓ 新增交易按分累加到所在月份的汇总行")
+
+        before = {row[:5]: row for row in summary_rows()}
+        client.put(f"{BASE_URL}/accounting/transactions/{lunch['id']}", json={"transaction_date": "2019-04-02"})
+        rows = {row[:5]: row for row in summary_rows()}
+        assert rows[("2019-03-01", "expense", food, bank, None)][5:] == (2000, 1)
+        assert rows[("2019-04-01", "expense", food, bank, None)][5:] == (3550, 1)
+        income_key = ("2019-03-01", "income", salary, None, bank)
+        assert rows[income_key] == before[income_key]
+        print("✓ 改期只调整原月份和新月份，其他汇总行不变")
+
+        client.delete(f"{BASE_URL}/accounting/transactions/{lunch['id']}")
+        assert not [row for row in summary_rows() if row[0] == "2019-04-01"]
+        print("✓ 删除月份中最后一笔交易后汇总行随之删除")
+
+        count = seed(bank, salary, food, rent)
+        assert summary_rows() == recomputed_rows()
+        print(f"✓ 批量写入 {count} 笔交易后汇总与逐笔重算一致")
+
+        for start, end in [
+            ("2019-03-01", "2019-03-31"),
+            ("2020-01-15", "2020-01-20"),
+            ("2020-01-31", "2020-02-01"),
+            ("2020-02-10", "2022-11-05"),
+            ("2021-01-01", "2023-12-31"),
+        ]:
+            summary = client.get(f"{BASE_URL}/accounting/summary", params={"start_date": start, "end_date": end}).json()
+            expected = direct_totals(start, end)
+            assert Decimal(summary["total_income"]) == expected.get("income", 0), (start, end, summary)
+            assert Decimal(summary["total_expense"]) == expected.get("expense", 0), (start, end, summary)
+        monthly = client.portal.call(monthly_summary(2019, 3))
+        assert monthly.total_expense == Decimal("20") and monthly.total_income == Decimal("8000")
+        print("✓ 整月、月内、跨月和多年区间的收支汇总与逐笔求和一致")
+
+        started = time.perf_counter()
+        trend = client.get(f"{BASE_URL}/statistics/finance-trend", params={
+            "start_date": "2020-01-01", "end_date": "2023-12-31", "interval": "month"
+        }).json()
+        elapsed = time.perf_counter() - started
+        assert len(trend) == YEARS * 12 and trend[0]["date"] == "2020-01-01"
+        for point in (trend[0], trend[17], trend[-1]):
+            month = date.fromisoformat(point["date"])
+            end = f"{month.year}-{month.month:02d}-28"
+            expected = direct_totals(point["date"], end)
+            assert round(point["income"], 2) == float(expected["income"]), point
+            assert round(point["expense"], 2) == float(expected["expense"]), point
+        read = execute(
+            "SELECT count(*) FROM monthly_finance_summary WHERE month BETWEEN '2020-01-01' AND '2023-12-01'"
+        )[0][0]
+        assert read <= YEARS * 12 * 3, read
+        print(f"✓ {YEARS} 年按月收支趋势 {len(trend)} 个点，读取 {read} 行汇总: {elapsed * 1000:.1f}ms")
+
+        daily = client.get(f"{BASE_URL}/statistics/finance-trend", params={
+            "start_date": "2021-05-01", "end_date": "2021-05-31"
+        }).json()
+        assert len(daily) == 31
+        print("✓ 默认仍按天返回")
+
+        categories = client.get(f"{BASE_URL}/statistics/expense-category", params={
+            "start_date": "2020-03-15", "end_date": "2021-06-30"
+        }).json()
+        expected = dict(execute(
+            "SELECT c.name, sum(t.amount) / 100.0 FROM transactions t JOIN categories c ON c.id = t.category_id "
+            "WHERE t.type = 'expense' AND t.transaction_date BETWEEN '2020-03-15' AND '2021-06-30' GROUP BY c.id"
+        ))
+        assert {item["name"]: round(item["value"], 2) for item in categories} == expected, categories
+        assert categories[0]["value"] >= categories[-1]["value"]
+        print("✓ 支出分类占比与逐笔求和一致")
+
+        sql = str(finance_totals(date(2020, 1, 1), date(2023, 12, 31), ["month", "type"], ["income", "expense"]).compile(
+            dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+        ))
+        plan = " ".join(row[-1] for row in execute("EXPLAIN QUERY PLAN " + sql))
+        assert "transactions" not in plan and "ix_monthly_finance_summary_key" in plan, plan
+        print("✓ 整月区间只读汇总表，不扫描交易")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_finance_summary()
@@ -0,0 +1,170 @@
+"""
+测试记账分录和余额快照 - 任意日期的余额、净资产序列应与逐笔回放交易的结果一致
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "ledger.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.services.account_service import AccountService
+
+BASE_URL = "/api/v1"
+CHECK_DATES = ["2023-12-31", "2024-01-15", "2024-01-31", "2024-02-04", "2024-02-29", "2024-03-19", "2024-03-31"]
+
+
+def snapshot_balances():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await AccountService(db).snapshot_balances()
+    return run
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(sql, parameters).fetchall()
+    finally:
+        conn.close()
+
+
+def replay(client, account):
+    """逐笔回放交易得到各日期的余额"""
+    transactions = client.get(f"{BASE_URL}/accounting/transactions", params={"limit": 1000}).json()
+    balances = {}
+    for day in CHECK_DATES:
+        balance = Decimal(account["initial_balance"])
+        for t in transactions:
+            if t["transaction_date"] > day:
+                continue
+            amount = Decimal(t["amount"])
+            if t["to_account_id"] == account["id"] and t["type"] in ("income", "transfer", "repayment"):
+                balance += amount
+            if t["from_account_id"] == account["id"] and t["type"] in ("expense", "transfer", "repayment"):
+                balance -= amount
+        balances[day] = balance
+    return balances
+
+
+def check_balances(client, accounts):
+    for account in accounts:
+        expected = replay(client, account)
+        for day in CHECK_DATES:
+            actual = client.get(f"{BASE_URL}/accounts/{account['id']}/balance", params={"at": day}).json()
+            assert Decimal(actual["balance"]) == expected[day], (account["name"], day, actual, expected[day])
+
+
+def test_ledger():
+    print("=" * 60)
+    print("记账分录和余额快照测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        def account(name, type, initial_balance):
+            return client.post(f"{BASE_URL}/accounts", json={
+                "name": name, "type": type, "initial_balance": initial_balance
+            }).json()
+
+        def transaction(type, amount, day, **accounts):
+            return client.post(f"{BASE_URL}/accounting/transactions", json={
+                "type": type, "amount": amount, "transaction_date": day, **accounts
+            }).json()
+
+        bank = account("银行卡", "asset", 1000)
+        card = account("信用卡", "liability", 0)
+        accounts = [bank, card]
+
+        salary = transaction("income", 500, "2024-01-15", to_account_id=bank["id"])
+        transaction("expense", 300, "2024-02-05", from_account_id=card["id"])
+        transaction("expense", 200.5, "2024-03-10", from_account_id=bank["id"])
+        transaction("repayment", 100, "2024-03-20", from_account_id=bank["id"], to_account_id=card["id"])
+
+        assert execute("SELECT count(*) FROM postings")[0][0] == 5
+        print("✓ 每笔交易按账户生成分录，还款生成两条")
+
+        written = client.portal.call(snapshot_balances())
+        assert written == 4, written
+        assert client.portal.call(snapshot_balances()) == 0
+        assert execute(
+            "SELECT balance FROM account_balance_snapshots WHERE account_id = ? AND snapshot_date = '2024-03-31'",
+            (bank["id"],)
+        )[0][0] == 119950
+        print(f"✓ 写入 {written} 个月末快照（以分存储），重复运行不再写入")
+
+        check_balances(client, accounts)
+        print("✓ 任意日期余额与回放交易一致")
+
+        client.put(f"{BASE_URL}/accounting/transactions/{salary['id']}", json={"amount": 800})
+        transaction("expense", 50, "2024-01-20", from_account_id=bank["id"])
+        check_balances(client, accounts)
+        latest = execute(
+            "SELECT balance FROM account_balance_snapshots WHERE account_id = ? AND snapshot_date = '2024-03-31'",
+            (bank["id"],)
+        )[0][0]
+        assert latest == 144950, latest
+        print("✓ 修改和补记早期交易后快照同步更新")
+
+        today = date.today().isoformat()
+        for item in accounts:
+            current = client.get(f"{BASE_URL}/accounts/{item['id']}").json()["balance"]
+            at = client.get(f"{BASE_URL}/accounts/{item['id']}/balance").json()
+            assert at["date"] == today and Decimal(at["balance"]) == Decimal(current)
+        print("✓ 今日余额等于账户当前余额")
+
+        series = client.get(f"{BASE_URL}/accounts/net-worth", params={"start_date": "2023-12-01"}).json()
+        assert series[0]["date"] == "2023-12-31" and series[-1]["date"] == today
+        assert Decimal(series[0]["net_worth"]) == 1000
+        summary = client.get(f"{BASE_URL}/accounts/summary").json()
+        assert Decimal(series[-1]["net_worth"]) == Decimal(summary["net_worth"])
+        print(f"✓ 净资产序列 {len(series)} 个点，最后一点与账户汇总一致")
+
+        history = client.get(f"{BASE_URL}/accounts/{bank['id']}/balance-history", params={
+            "start_date": "2024-01-01", "end_date": "2024-03-31"
+        }).json()
+        assert [point["date"] for point in history] == ["2024-01-31", "2024-02-29", "2024-03-31"]
+        assert [Decimal(point["balance"]) for point in history] == [1750, 1750, 1449.5]
+        print("✓ 账户余额走势")
+
+        response = client.get(f"{BASE_URL}/accounts/net-worth", params={"start_date": "2000-01-01", "interval": "day"})
+        assert response.status_code == 400
+        assert client.get(f"{BASE_URL}/accounts/9999/balance").status_code == 404
+        print("✓ 时间点过多返回 400，账户不存在返回 404")
+
+        # 模拟进程在上个月启动、期间从未写过快照
+        sqlite = sqlite3.connect(DB_PATH)
+        try:
+            sqlite.execute("DELETE FROM account_balance_snapshots")
+            sqlite.commit()
+        finally:
+            sqlite.close()
+        AccountService._snapshot_month = date(2000, 1, 1)
+        check_balances(client, accounts)
+        assert execute("SELECT count(*) FROM account_balance_snapshots")[0][0] == written
+        assert client.portal.call(snapshot_balances()) == 0
+        print("✓ 进程跨月后第一次读余额时补写月末快照")
+
+        plan = execute(
+            "EXPLAIN QUERY PLAN SELECT sum(amount) FROM postings "
+            "WHERE account_id = 1 AND posting_date <= '2024-03-19' AND posting_date > '2024-02-29'"
+        )
+        assert any("COVERING INDEX ix_postings_account_order" in row[-1] for row in plan), plan
+        print("✓ 快照之后的分录按索引范围查找")
+
+        client.delete(f"{BASE_URL}/accounting/transactions/{salary['id']}")
+        assert not execute("SELECT 1 FROM postings WHERE transaction_id = ?", (salary["id"],))
+        check_balances(client, accounts)
+        print("✓ 删除交易后分录和快照同步")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_ledger()
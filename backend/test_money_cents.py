@@ -0,0 +1,132 @@
+"""
+测试金额以整数分存储 - 接口往返保持两位小数，SQL 聚合按整数精确求和，旧库的浮点金额在启动时换算为分，未换算的金额读取时报错
+"""
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "money_cents.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.money import Money
+from app.schema import convert_money, without_foreign_keys
+
+BASE_URL = "/api/v1"
+ROWS = 100000
+
+# 旧版本的金额列声明
+OLD_TYPES = {
+    "accounts": {"balance": "NUMERIC(12, 2)", "initial_balance": "NUMERIC(12, 2)", "credit_limit": "NUMERIC(12, 2)"},
+    "transactions": {"amount": "NUMERIC(10, 2)"},
+}
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def downgrade():
+    """把金额列改回旧版本的 NUMERIC 声明并写回浮点数，模拟升级前的数据库"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA foreign_keys=OFF")
+        for table, columns in OLD_TYPES.items():
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+            for name, declared in columns.items():
+                sql = sql.replace(f"{name} INTEGER", f"{name} {declared}", 1)
+            names = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            values = ", ".join(f"{name} / 100.0" if name in columns else name for name in names)
+            conn.execute(sql.replace(f"CREATE TABLE {table} ", f"CREATE TABLE {table}_old ", 1))
+            conn.execute(f"INSERT INTO {table}_old SELECT {values} FROM {table}")
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_old RENAME TO {table}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_money_cents():
+    print("=" * 60)
+    print("金额整数分存储测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        bank = client.post(f"{BASE_URL}/accounts", json={
+            "name": "银行卡", "type": "asset", "initial_balance": 100.1
+        }).json()
+        card = client.post(f"{BASE_URL}/accounts", json={
+            "name": "信用卡", "type": "liability", "initial_balance": 0, "credit_limit": 5000
+        }).json()
+        created = client.post(f"{BASE_URL}/accounting/transactions", json={
+            "type": "expense", "amount": 19.99, "transaction_date": "2024-03-01", "from_account_id": bank["id"]
+        }).json()
+        assert Decimal(created["amount"]) == Decimal("19.99")
+        assert execute("SELECT amount, typeof(amount) FROM transactions WHERE id = ?", (created["id"],)) == [(1999, "integer")]
+        assert execute("SELECT balance, initial_balance FROM accounts WHERE id = ?", (bank["id"],)) == [(8011, 10010)]
+        assert Decimal(client.get(f"{BASE_URL}/accounts/{bank['id']}").json()["balance"]) == Decimal("80.11")
+        print("✓ 金额按分存储为整数，接口返回两位小数")
+
+        execute("DELETE FROM transactions")
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            conn.executemany(
+                "INSERT INTO transactions (type, amount, from_account_id, transaction_date, tags) "
+                "VALUES ('expense', ?, ?, '2024-05-01', '[]')",
+                ((10 if i % 2 else 20, bank["id"]) for i in range(ROWS))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        summary = client.get(f"{BASE_URL}/accounting/summary", params={
+            "start_date": "2024-05-01", "end_date": "2024-05-31"
+        }).json()
+        assert Decimal(summary["total_expense"]) == Decimal("0.15") * ROWS, summary
+        assert execute("SELECT sum(total) FROM monthly_finance_summary")[0][0] == 15 * ROWS
+        print(f"✓ {ROWS} 笔 0.1/0.2 的支出求和无浮点误差")
+
+        downgrade()
+        assert execute("SELECT typeof(amount) FROM transactions LIMIT 1") == [("real",)]
+        try:
+            Money().process_result_value(35.5, None)
+            assert False, "浮点金额应报错而不是截断"
+        except ValueError:
+            pass
+        print("✓ 未换算的浮点金额读取时报错")
+
+    with TestClient(app) as client:
+        for table, columns in OLD_TYPES.items():
+            declared = {row[1]: row[2] for row in execute(f"PRAGMA table_info({table})")}
+            assert all(declared[name] == "INTEGER" for name in columns), declared
+        assert execute("SELECT count(*) FROM transactions WHERE typeof(amount) != 'integer'") == [(0,)]
+        assert execute("SELECT sum(amount) FROM transactions") == [(15 * ROWS,)]
+        assert execute("SELECT balance, initial_balance FROM accounts WHERE id = ?", (bank["id"],)) == [(8011, 10010)]
+        assert execute("SELECT credit_limit FROM accounts WHERE id = ?", (card["id"],)) == [(500000,)]
+        assert execute("SELECT sum(amount) FROM postings") == [(-15 * ROWS,)]
+        assert execute("SELECT sum(total) FROM monthly_finance_summary") == [(15 * ROWS,)]
+        assert execute("PRAGMA foreign_key_check") == []
+        assert Decimal(client.get(f"{BASE_URL}/accounts/{bank['id']}").json()["balance"]) == Decimal("80.11")
+        print("✓ 启动时把旧库的浮点金额换算为分，并重建分录和月度汇总")
+
+        assert not client.portal.call(without_foreign_keys, convert_money)
+        client.post(f"{BASE_URL}/accounting/transactions", json={
+            "type": "income", "amount": 0.3, "transaction_date": "2024-05-02", "to_account_id": bank["id"]
+        })
+        assert execute("SELECT sum(amount) FROM postings") == [(-15 * ROWS + 30,)]
+        print("✓ 已换算的数据库不再重建，触发器继续同步分录")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_money_cents()
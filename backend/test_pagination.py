@@ -0,0 +1,120 @@
+"""
+测试游标分页 - 逐页遍历的结果应与一次性查询一致，且深页不需要排序或跳过行
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "pagination.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+PAGE_SIZE = 7
+
+
+def seed(client):
+    """创建计划、计时会话和交易；交易日期大量重复以覆盖同键的情况"""
+    account = client.post(
+        f"{BASE_URL}/accounts",
+        json={"name": "分页账户", "type": "asset", "initial_balance": 0}
+    ).json()
+
+    for i in range(30):
+        plan = client.post(f"{BASE_URL}/plans", json={"title": f"计划 {i}"}).json()
+        if i % 2 == 0:
+            timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": plan["id"]}).json()
+            client.post(f"{BASE_URL}/timer/{timer['id']}/stop")
+
+    for i in range(40):
+        client.post(f"{BASE_URL}/accounting/transactions", json={
+            "type": "income",
+            "amount": i + 1,
+            "to_account_id": account["id"],
+            "transaction_date": (date.today() - timedelta(days=i % 4)).isoformat()
+        })
+
+
+def walk(client, path, params):
+    """按 X-Next-Cursor 逐页读取，返回全部 id 和最后一页发出的 SQL"""
+    ids = []
+    cursor = None
+    statements = []
+
+    def on_execute(conn, cursor_, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    while True:
+        page_params = dict(params, limit=PAGE_SIZE)
+        if cursor:
+            page_params["cursor"] = cursor
+
+        statements.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            response = client.get(f"{BASE_URL}{path}", params=page_params)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert response.status_code == 200, response.text
+        rows = response.json()
+        assert len(rows) <= PAGE_SIZE
+        ids.extend(row["id"] for row in rows)
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, list(statements)
+
+
+def query_plan(statement, parameters):
+    """返回 EXPLAIN QUERY PLAN 的描述列"""
+    with sqlite3.connect(DB_PATH) as conn:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return [row[3] for row in rows]
+
+
+def test_cursor_pagination():
+    print("=" * 60)
+    print("游标分页测试")
+    print("=" * 60)
+
+    endpoints = [
+        ("/timer/sessions", {}),
+        ("/accounting/transactions", {}),
+        ("/plans", {"exclude_completed": "false"}),
+    ]
+
+    with TestClient(app) as client:
+        seed(client)
+
+        for path, params in endpoints:
+            expected = [row["id"] for row in client.get(
+                f"{BASE_URL}{path}", params=dict(params, limit=1000)
+            ).json()]
+            ids, statements = walk(client, path, params)
+
+            assert ids == expected, f"{path}: 分页结果与一次性查询不一致"
+            assert len(set(ids)) == len(ids), f"{path}: 分页结果有重复"
+
+            details = [detail for statement, parameters in statements
+                       if statement.lstrip().upper().startswith("SELECT")
+                       for detail in query_plan(statement, parameters)]
+            assert not any("TEMP B-TREE" in detail for detail in details), f"{path}: {details}"
+            print(f"✓ {path}: {len(ids)} 行，{(len(ids) - 1) // PAGE_SIZE + 1} 页，按索引顺序读取")
+
+        response = client.get(f"{BASE_URL}/plans", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        print("✓ 无效游标返回 400")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_cursor_pagination()
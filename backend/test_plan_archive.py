@@ -0,0 +1,157 @@
+"""
+测试计划归档 - 完成已久的计划树移入 plans_archive 后，归档视图和统计结果不变
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "plan_archive.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.services.plan_service import PlanService
+
+BASE_URL = "/api/v1"
+STATISTICS = ["overview", "plan-completion", "priority-distribution", "time-trend", "dashboard"]
+
+
+def archive():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await PlanService(db).archive_completed(30, batch_size=1)
+    return run
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def plan_ids(table):
+    return {row[0] for row in execute(f"SELECT id FROM {table}")}
+
+
+def snapshot(client, project_id):
+    """统计、项目和标签汇总"""
+    today = date.today().isoformat()
+    result = {
+        name: client.get(f"{BASE_URL}/statistics/{name}", params={"start_date": "2020-01-01", "end_date": today}).json()
+        for name in STATISTICS
+    }
+    project = client.get(f"{BASE_URL}/projects/{project_id}").json()
+    result["project"] = (project["plan_total"], project["plan_completed"])
+    result["plan_count"] = [p["plan_count"] for p in client.get(f"{BASE_URL}/projects").json()]
+    result["tags"] = client.get(f"{BASE_URL}/tags").json()
+    return result
+
+
+def test_plan_archive():
+    print("=" * 60)
+    print("计划归档测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        project = client.post(f"{BASE_URL}/projects", json={"name": "归档项目"}).json()
+
+        def create(title, **fields):
+            return client.post(f"{BASE_URL}/plans", json={"title": title, "project_id": project["id"], **fields}).json()
+
+        old = create("旧计划", status="completed", tags=["归档"])
+        old_child = create("旧子任务", status="completed", parent_id=old["id"], tags=["归档"])
+        blocked = create("有未完成子任务", status="completed")
+        create("未完成子任务", parent_id=blocked["id"])
+        recent = create("最近完成", status="completed")
+        lone = create("单独旧计划", status="completed")
+        create("待办")
+
+        timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": old_child["id"]}).json()
+        client.post(f"{BASE_URL}/timer/{timer['id']}/stop")
+
+        old_ids = [old["id"], old_child["id"], blocked["id"], lone["id"]]
+        execute(
+            f"UPDATE plans SET updated_at = '2020-06-01 08:00:00' WHERE id IN ({','.join('?' * len(old_ids))})",
+            old_ids
+        )
+
+        before = snapshot(client, project["id"])
+        moved = client.portal.call(archive())
+        assert moved == 3, moved
+        assert plan_ids("plans_archive") == {old["id"], old_child["id"], lone["id"]}
+        assert {blocked["id"], recent["id"]} <= plan_ids("plans")
+        assert not plan_ids("plans") & plan_ids("plans_archive")
+        print(f"✓ 分批归档 {moved} 个计划，含未完成子任务的计划树和最近完成的计划保留")
+
+        assert client.portal.call(archive()) == 0
+        print("✓ 重复归档不再移动计划")
+
+        assert snapshot(client, project["id"]) == before
+        print("✓ 统计、项目计数和标签汇总不变")
+
+        active = client.get(f"{BASE_URL}/plans").json()
+        assert all(plan["status"] != "completed" for plan in active)
+        archived = client.get(f"{BASE_URL}/plans", params={"status": "completed", "exclude_completed": "false"}).json()
+        assert {plan["title"] for plan in archived} == {"旧计划", "有未完成子任务", "最近完成", "单独旧计划"}
+        assert client.get(f"{BASE_URL}/plans/{old_child['id']}").json()["title"] == "旧子任务"
+        print("✓ 归档视图和计划详情包含已归档计划")
+
+        sessions = client.get(f"{BASE_URL}/timer/sessions").json()
+        assert sessions[0]["plan_title"] == "旧子任务"
+        print("✓ 计时记录仍显示已归档计划的标题")
+
+        updated = client.put(f"{BASE_URL}/plans/{old_child['id']}", json={"title": "重新打开", "status": "todo"})
+        assert updated.status_code == 200 and updated.json()["title"] == "重新打开"
+        assert {old["id"], old_child["id"]} <= plan_ids("plans")
+        assert plan_ids("plans_archive") == {lone["id"]}
+        print("✓ 修改已归档计划时整棵计划树移回 plans")
+
+        assert client.delete(f"{BASE_URL}/plans/{lone['id']}").status_code == 200
+        assert not plan_ids("plans_archive")
+        assert client.get(f"{BASE_URL}/plans/{lone['id']}").status_code == 404
+        print("✓ 删除已归档计划")
+
+        newest = create("最新计划", status="completed")
+        execute("UPDATE plans SET updated_at = '2020-06-01 08:00:00' WHERE id = ?", (newest["id"],))
+        assert client.portal.call(archive()) == 1
+        assert create("之后的计划")["id"] > newest["id"]
+        print("✓ 归档后计划 id 不会被复用")
+
+        edge = create("刚满 30 天", status="completed")
+        execute("UPDATE plans SET updated_at = datetime('now', '-30 days', '-5 hours') WHERE id = ?", (edge["id"],))
+        # 本地时间比 UTC 晚 10 小时；按本地时间计算截止时间会漏掉这个计划
+        local_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Etc/GMT+10"
+        time.tzset()
+        try:
+            assert client.portal.call(archive()) == 1
+        finally:
+            if local_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = local_tz
+            time.tzset()
+        assert edge["id"] in plan_ids("plans_archive")
+        print("✓ 截止时间按 UTC 计算，与 updated_at 一致")
+
+        response = client.post(f"{BASE_URL}/timer/create", json={"plan_id": edge["id"]})
+        assert response.status_code == 201, response.text
+        assert response.json()["planTitle"] == "刚满 30 天"
+        assert edge["id"] in plan_ids("plans") and edge["id"] not in plan_ids("plans_archive")
+        assert client.portal.call(archive()) == 0
+        print("✓ 为已归档计划创建计时器时计划树移回 plans，有计时器的计划不再归档")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_plan_archive()
@@ -0,0 +1,101 @@
+"""
+测试批量计划操作 - 数百个计划的创建、修改和删除应在一个事务、固定次数的语句内完成
+"""
+import os
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "plan_bulk.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine, AsyncSessionLocal
+from app.main import app
+from app.services.project_service import ProjectService
+
+BASE_URL = "/api/v1"
+PLAN_COUNT = 300
+
+
+def bulk(client, body):
+    """调用批量接口，返回响应和发出的语句数"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        response = client.post(f"{BASE_URL}/plans/bulk", json=body)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+def counters(client):
+    return {
+        project["id"]: (project["plan_total"], project["plan_completed"], project["progress"])
+        for project in client.get(f"{BASE_URL}/projects").json()
+    }
+
+
+async def reconcile():
+    async with AsyncSessionLocal() as db:
+        await ProjectService(db).reconcile_plan_counts()
+
+
+def test_plan_bulk():
+    print("=" * 60)
+    print("批量计划操作测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        first = client.post(f"{BASE_URL}/projects", json={"name": "本周"}).json()
+        second = client.post(f"{BASE_URL}/projects", json={"name": "下周"}).json()
+
+        result, created_queries = bulk(client, {"create": [
+            {"title": f"计划 {i}", "project_id": first["id"], "tags": ["周计划"]}
+            for i in range(PLAN_COUNT)
+        ]})
+        ids = [plan["id"] for plan in result["created"]]
+        assert len(ids) == PLAN_COUNT and all(plan["created_at"] for plan in result["created"])
+        print(f"✓ 创建 {PLAN_COUNT} 个计划: {created_queries} 条语句")
+
+        child = client.post(f"{BASE_URL}/plans", json={"title": "子计划", "parent_id": ids[-1]}).json()
+
+        result, update_queries = bulk(client, {
+            "update": [
+                {"ids": ids[:150], "status": "completed"},
+                {"ids": ids[150:200], "project_id": second["id"], "priority_matrix": "urgent_important"},
+                {"ids": ids[200:250], "status": "cancelled", "tags": ["搁置"]},
+            ],
+            "delete": ids[280:]
+        })
+        assert result["updated"] == 250
+        assert result["deleted"] == 20 + 1, result
+        assert client.get(f"{BASE_URL}/plans/{child['id']}").status_code == 404
+        assert update_queries <= 16, f"{update_queries} 条语句"
+        print(f"✓ 修改 250 个、删除 21 个计划: {update_queries} 条语句")
+
+        for field in ("status", "priority_matrix", "tags"):
+            response = client.post(f"{BASE_URL}/plans/bulk", json={"update": [{"ids": ids[:1], field: None}]})
+            assert response.status_code == 422, response.text
+        assert client.get(f"{BASE_URL}/plans/{ids[0]}").json()["status"] == "completed"
+        print("✓ 批量修改中 status、priority_matrix、tags 为 null 时拒绝")
+
+        maintained = counters(client)
+        assert maintained[first["id"]][:2] == (150 + 30, 150)
+        assert maintained[second["id"]][:2] == (50, 0)
+
+        client.portal.call(reconcile)
+        assert counters(client) == maintained
+        print("✓ 项目计数与全量重算一致")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_plan_bulk()
@@ -0,0 +1,128 @@
+"""
+测试计划时间冲突检测 - 区间索引的结果应与逐条比较一致，批量接口一次查询返回
+"""
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "plan_conflicts.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+PLAN_COUNT = 300
+SLOT_COUNT = 50
+BASE_TIME = datetime(2026, 1, 5, 8, 0)
+
+
+def random_slot(rng):
+    start = BASE_TIME + timedelta(minutes=15 * rng.randint(0, 2000))
+    return start, start + timedelta(minutes=15 * rng.randint(0, 12))
+
+
+def overlaps(plan, start, end):
+    """原先 check_time_conflict 的判断条件"""
+    if plan["status"] in ("completed", "cancelled") or not plan["start_time"]:
+        return False
+    p_start = datetime.fromisoformat(plan["start_time"])
+    p_end = datetime.fromisoformat(plan["end_time"])
+    return (
+        (p_start <= start and p_end > start)
+        or (p_start < end and p_end >= end)
+        or (p_start >= start and p_end <= end)
+    )
+
+
+def seed(client, rng):
+    """批量创建计划，再修改、完成和删除其中一部分，检验触发器同步；与已有计划冲突的请求会被拒绝"""
+    plans = {}
+    for i in range(PLAN_COUNT):
+        start, end = random_slot(rng)
+        response = client.post(f"{BASE_URL}/plans", json={
+            "title": f"计划 {i}",
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat()
+        } if i % 10 else {"title": f"无时间计划 {i}"})
+        if response.status_code == 201:
+            plans[response.json()["id"]] = response.json()
+
+    ids = list(plans)
+    for plan_id in rng.sample(ids, 40):
+        start, end = random_slot(rng)
+        response = client.put(f"{BASE_URL}/plans/{plan_id}", json={
+            "start_time": start.isoformat(), "end_time": end.isoformat()
+        })
+        if response.status_code == 200:
+            plans[plan_id] = response.json()
+    for plan_id in rng.sample(ids, 30):
+        plans[plan_id] = client.patch(f"{BASE_URL}/plans/{plan_id}/status", params={"status": "completed"}).json()
+    for plan_id in rng.sample(ids, 20):
+        client.delete(f"{BASE_URL}/plans/{plan_id}")
+        del plans[plan_id]
+
+    return list(plans.values())
+
+
+def test_plan_conflicts():
+    print("=" * 60)
+    print("计划时间冲突检测测试")
+    print("=" * 60)
+
+    rng = random.Random(7)
+    with TestClient(app) as client:
+        plans = seed(client, rng)
+        slots = [random_slot(rng) for _ in range(SLOT_COUNT)]
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            response = client.post(f"{BASE_URL}/plans/conflicts", json={"slots": [
+                {"start_time": start.isoformat(), "end_time": end.isoformat()} for start, end in slots
+            ]})
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert response.status_code == 200, response.text
+        results = response.json()
+        assert len(statements) == 1, f"批量检查发出了 {len(statements)} 条查询"
+
+        total = 0
+        for (start, end), result in zip(slots, results):
+            expected = sorted(plan["id"] for plan in plans if overlaps(plan, start, end))
+            actual = sorted(conflict["id"] for conflict in result["conflicts"])
+            assert actual == expected, f"{start} - {end}: {actual} != {expected}"
+            total += len(actual)
+        print(f"✓ {SLOT_COUNT} 个时间段一次查询，共 {total} 个冲突，与逐条比较一致")
+
+        statement, parameters = statements[0]
+        with sqlite3.connect(DB_PATH) as conn:
+            details = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement, parameters)]
+        assert not any(detail.startswith("SCAN plans") for detail in details), details
+        print("✓ 冲突查询经 plan_intervals 索引，不扫描 plans 表")
+
+        start, end = slots[0]
+        conflicting = [plan for plan in plans if overlaps(plan, start, end)]
+        if conflicting:
+            response = client.post(f"{BASE_URL}/plans", json={
+                "title": "冲突计划", "start_time": start.isoformat(), "end_time": end.isoformat()
+            })
+            assert response.status_code == 400
+            print("✓ 创建冲突计划被拒绝")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_plan_conflicts()
@@ -0,0 +1,137 @@
+"""
+测试计划子树删除 - 整棵子树及其引用应在固定次数的语句内处理完毕，每日计时汇总并入无计划的行
+"""
+import asyncio
+import os
+import tempfile
+from datetime import date
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "plan_delete.db")
+
+from sqlalchemy import event, select, func
+from app.database import engine, init_db, AsyncSessionLocal
+from app.models.plan import Plan
+from app.models.timer import TimerSession
+from app.models.active_timer import ActiveTimer
+from app.models.transaction import Transaction
+from app.models.time_rollup import DailyTimeRollup
+from app.schemas.plan import PlanCreate
+from app.schemas.timer import TimerCreate
+from app.schemas.accounting import TransactionCreate
+from app.services.plan_service import PlanService
+from app.services.timer_service import TimerService
+from app.services.accounting_service import AccountingService
+
+DEPTH = 5
+BRANCHING = 3
+
+
+async def build_tree(db):
+    """创建多层计划树，并给每个计划挂上计时会话、计时器和交易"""
+    plans = PlanService(db)
+    timers = TimerService(db)
+    accounting = AccountingService(db)
+
+    root = await plans.create(PlanCreate(title="根计划"))
+    level = [root.id]
+    plan_ids = [root.id]
+    for depth in range(2, DEPTH + 1):
+        next_level = []
+        for parent_id in level:
+            for i in range(BRANCHING):
+                plan = await plans.create(PlanCreate(title=f"L{depth}-{i}", parent_id=parent_id))
+                next_level.append(plan.id)
+        plan_ids.extend(next_level)
+        level = next_level
+
+    for plan_id in plan_ids[::7]:
+        timer = await timers.create_timer(TimerCreate(plan_id=plan_id))
+        await timers.stop_timer(timer.id)
+        await timers.create_timer(TimerCreate(plan_id=plan_id))
+        await accounting.create(TransactionCreate(
+            type="expense", amount=1, plan_id=plan_id, transaction_date=date.today()
+        ))
+
+    keep = await plans.create(PlanCreate(title="保留的计划"))
+    return root.id, len(plan_ids), keep.id
+
+
+async def count(db, query):
+    return (await db.execute(query)).scalar()
+
+
+async def rollup_rows(db):
+    result = await db.execute(select(
+        DailyTimeRollup.day, DailyTimeRollup.project_id, DailyTimeRollup.plan_id,
+        DailyTimeRollup.total_duration, DailyTimeRollup.session_count
+    ).order_by(DailyTimeRollup.day, DailyTimeRollup.project_id, DailyTimeRollup.plan_id))
+    return result.all()
+
+
+async def check_rollup_after_delete():
+    """删除无项目的计划后，其汇总行并入当天无计划的行，之后的会话不会重复计入"""
+    async with AsyncSessionLocal() as db:
+        plans = PlanService(db)
+        timers = TimerService(db)
+        plan = await plans.create(PlanCreate(title="无项目的计划"))
+        for plan_id in (plan.id, plan.id, None):
+            timer = await timers.create_timer(TimerCreate(plan_id=plan_id))
+            await timers.stop_timer(timer.id)
+        assert await plans.delete(plan.id)
+
+        timer = await timers.create_timer(TimerCreate())
+        await timers.stop_timer(timer.id)
+
+        sessions = await count(db, select(func.count(TimerSession.id)).where(TimerSession.end_time.isnot(None)))
+        assert await count(db, select(func.sum(DailyTimeRollup.session_count))) == sessions
+        assert await count(db, select(func.count(DailyTimeRollup.id)).where(DailyTimeRollup.plan_id.is_(None))) == 1
+        incremental = await rollup_rows(db)
+        await timers.rebuild_daily_rollup()
+        assert await rollup_rows(db) == incremental, incremental
+    print(f"✓ 删除无项目的计划后汇总行合并，{sessions} 个会话计数一致，与全量重建相同")
+
+
+async def test_plan_subtree_delete():
+    print("=" * 60)
+    print("计划子树删除测试")
+    print("=" * 60)
+
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        root_id, subtree_size, keep_id = await build_tree(db)
+    print(f"✓ 创建了 {subtree_size} 个计划的子树")
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with AsyncSessionLocal() as db:
+            assert await PlanService(db).delete(root_id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    async with AsyncSessionLocal() as db:
+        assert await count(db, select(func.count(Plan.id))) == 1
+        assert await count(db, select(Plan.id)) == keep_id
+        for model in (TimerSession, ActiveTimer, Transaction):
+            linked = await count(db, select(func.count(model.id)).where(model.plan_id.isnot(None)))
+            total = await count(db, select(func.count(model.id)))
+            assert linked == 0 and total > 0, f"{model.__tablename__}: {linked} 条仍引用已删除计划"
+
+    assert len(statements) <= 8, f"删除发出了 {len(statements)} 条语句"
+    print(f"✓ 子树删除共 {len(statements)} 条语句，计时记录和交易保留并解除关联")
+
+    await check_rollup_after_delete()
+    await engine.dispose()
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_plan_subtree_delete())
@@ -0,0 +1,82 @@
+"""
+测试计划全文搜索 - 词内子串匹配（含中文）、排序、摘要高亮，以及随计划修改同步的索引
+"""
+import os
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "plan_search.db")
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+BASE_URL = "/api/v1"
+
+
+def search(client, q, **params):
+    response = client.get(f"{BASE_URL}/plans", params=dict(params, q=q, exclude_completed="false"))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_plan_search():
+    print("=" * 60)
+    print("计划全文搜索测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        def create(**data):
+            return client.post(f"{BASE_URL}/plans", json=data).json()
+
+        title_hit = create(title="Refactor database layer", description="split services")
+        description_hit = create(title="Weekly review", description="check the database backups")
+        tag_hit = create(title="Backups", tags=["database", "ops"])
+        create(title="Read a novel", description="fiction")
+        parent = create(title="学习计划")
+        subtask = create(title="学习Python编程", parent_id=parent["id"])
+
+        results = search(client, "datab")
+        ids = [plan["id"] for plan in results]
+        assert ids == [title_hit["id"], description_hit["id"], tag_hit["id"]], results
+        assert "<mark>datab</mark>ase" in results[0]["snippet"].lower()
+        print("✓ 子串匹配，标题命中排在描述和标签之前，摘要带高亮")
+
+        assert {plan["id"] for plan in search(client, "database backup")} == {description_hit["id"], tag_hit["id"]}
+        print("✓ 多个词需同时匹配，可分布在不同字段")
+
+        assert {plan["id"] for plan in search(client, "学习")} == {parent["id"], subtask["id"]}
+        print("✓ 搜索包含子计划")
+
+        math = create(title="学习高等数学", description="复习第三章")
+        assert [plan["id"] for plan in search(client, "数学")] == [math["id"]]
+        results = search(client, "等数学")
+        assert [plan["id"] for plan in results] == [math["id"]]
+        assert "<mark>等数学</mark>" in results[0]["snippet"]
+        assert [plan["id"] for plan in search(client, "数学 第三章")] == [math["id"]]
+        assert search(client, "数学 50%") == []
+        print("✓ 中文按词内子串匹配，两个字的词同样可以搜索")
+
+        create(title="复习<b>第三章</b> & 习题")
+        results = search(client, "第三章 习题")
+        assert [plan["snippet"] for plan in results] == [
+            "复习&lt;b&gt;<mark>第三章</mark>&lt;/b&gt; &amp; 习题"
+        ], results
+        print("✓ 摘要中计划原文按 HTML 转义，只有高亮标记是标签")
+
+        client.put(f"{BASE_URL}/plans/{title_hit['id']}", json={"title": "Refactor storage layer"})
+        client.delete(f"{BASE_URL}/plans/{tag_hit['id']}")
+        assert [plan["id"] for plan in search(client, "database")] == [description_hit["id"]]
+        assert [plan["id"] for plan in search(client, "storage")] == [title_hit["id"]]
+        print("✓ 修改和删除后索引同步")
+
+        assert search(client, '"') == [] and search(client, "NOT AND") == []
+        response = client.get(f"{BASE_URL}/plans", params={"q": "database", "cursor": "abc"})
+        assert response.status_code == 400
+        print("✓ 特殊字符按普通文本处理，q 与 cursor 不能同时使用")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_plan_search()
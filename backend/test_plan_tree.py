@@ -0,0 +1,90 @@
+"""
+测试计划树接口 - 完整嵌套结构应由一次查询取回
+"""
+import os
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "plan_tree.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+DEPTH = 4
+BRANCHING = 3
+
+
+def create_subtree(client, parent_id, project_id, level):
+    """在 parent_id 下创建 BRANCHING 叉、共 DEPTH 层的子计划"""
+    if level > DEPTH:
+        return
+    for i in range(BRANCHING):
+        plan = client.post(f"{BASE_URL}/plans", json={
+            "title": f"L{level}-{i}",
+            "parent_id": parent_id,
+            "project_id": project_id
+        }).json()
+        create_subtree(client, plan["id"], project_id, level + 1)
+
+
+def depth_of(nodes):
+    return 1 + max(depth_of(node["children"]) for node in nodes) if nodes else 0
+
+
+def count(nodes):
+    return sum(1 + count(node["children"]) for node in nodes)
+
+
+def test_plan_tree():
+    print("=" * 60)
+    print("计划树接口测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        project = client.post(f"{BASE_URL}/projects", json={"name": "树形项目"}).json()
+        root = client.post(f"{BASE_URL}/plans", json={"title": "根计划", "project_id": project["id"]}).json()
+        create_subtree(client, root["id"], project["id"], 2)
+        client.post(f"{BASE_URL}/plans", json={"title": "其他项目的计划"})
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            tree = client.get(f"{BASE_URL}/plans/tree", params={"project_id": project["id"]}).json()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+        expected = sum(BRANCHING ** level for level in range(DEPTH))
+        assert len(tree) == 1 and tree[0]["title"] == "根计划"
+        assert count(tree) == expected, f"节点数 {count(tree)}，应为 {expected}"
+        assert depth_of(tree) == DEPTH
+        assert tree[0]["children_count"] == BRANCHING
+        assert tree[0]["project_name"] == "树形项目"
+        assert len(statements) == 1, f"发出了 {len(statements)} 条查询"
+        print(f"✓ 完整树: {count(tree)} 个节点，{DEPTH} 层，1 条查询")
+
+        shallow = client.get(
+            f"{BASE_URL}/plans/tree",
+            params={"project_id": project["id"], "max_depth": 2}
+        ).json()
+        assert depth_of(shallow) == 2
+        assert all(node["children"] == [] and node["children_count"] == BRANCHING
+                   for node in shallow[0]["children"])
+        print("✓ max_depth=2 只返回两层，children_count 仍为实际子计划数")
+
+        everything = client.get(f"{BASE_URL}/plans/tree").json()
+        assert len(everything) == 2
+        print("✓ 不指定项目时返回全部根计划")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_plan_tree()
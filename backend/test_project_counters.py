@@ -0,0 +1,99 @@
+"""
+测试项目计划计数器 - 增量维护的计数与进度应与全量重算一致
+"""
+import os
+import random
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "project_counters.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine, AsyncSessionLocal
+from app.main import app
+from app.services.project_service import ProjectService
+
+BASE_URL = "/api/v1"
+STATUSES = ["todo", "in_progress", "completed", "cancelled"]
+
+
+def snapshot(client, project_ids):
+    projects = {project["id"]: project for project in client.get(f"{BASE_URL}/projects").json()}
+    return {
+        project_id: (
+            projects[project_id]["plan_total"],
+            projects[project_id]["plan_completed"],
+            projects[project_id]["progress"]
+        )
+        for project_id in project_ids
+    }
+
+
+async def reconcile():
+    async with AsyncSessionLocal() as db:
+        await ProjectService(db).reconcile_plan_counts()
+
+
+def test_project_counters():
+    print("=" * 60)
+    print("项目计划计数器测试")
+    print("=" * 60)
+
+    rng = random.Random(3)
+    with TestClient(app) as client:
+        project_ids = [
+            client.post(f"{BASE_URL}/projects", json={"name": f"项目 {i}"}).json()["id"]
+            for i in range(3)
+        ]
+
+        plan_ids = []
+        for i in range(60):
+            parent_id = rng.choice(plan_ids) if plan_ids and rng.random() < 0.4 else None
+            plan = client.post(f"{BASE_URL}/plans", json={
+                "title": f"计划 {i}",
+                "project_id": rng.choice(project_ids + [None]),
+                "status": rng.choice(STATUSES),
+                "parent_id": parent_id
+            }).json()
+            plan_ids.append(plan["id"])
+
+        for plan_id in rng.sample(plan_ids, 30):
+            client.put(f"{BASE_URL}/plans/{plan_id}", json={"project_id": rng.choice(project_ids)})
+        for plan_id in rng.sample(plan_ids, 30):
+            client.patch(f"{BASE_URL}/plans/{plan_id}/status", params={"status": rng.choice(STATUSES)})
+        for plan_id in rng.sample(plan_ids, 8):
+            client.delete(f"{BASE_URL}/plans/{plan_id}")
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        remaining = [plan["id"] for plan in client.get(
+            f"{BASE_URL}/plans", params={"exclude_completed": "false", "limit": 1000}
+        ).json()]
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            client.patch(f"{BASE_URL}/plans/{remaining[0]}/status", params={"status": "completed"})
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+        assert not any("count(" in statement.lower() for statement in statements), statements
+        print(f"✓ 修改计划状态不再重新计数，共 {len(statements)} 条语句")
+
+        maintained = snapshot(client, project_ids)
+        client.portal.call(reconcile)
+        recounted = snapshot(client, project_ids)
+
+        for project_id in project_ids:
+            assert maintained[project_id] == recounted[project_id], \
+                f"项目 {project_id}: {maintained[project_id]} != {recounted[project_id]}"
+            total, completed, progress = recounted[project_id]
+            print(f"✓ 项目 {project_id}: {completed}/{total} 完成，进度 {progress}%")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_project_counters()
@@ -0,0 +1,83 @@
+"""
+测试项目列表汇总 - 计划数、计时和收支应由一次查询取回，与项目数量无关
+"""
+import os
+import tempfile
+from datetime import date
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "project_list.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+PROJECT_COUNT = 15
+
+
+def seed(client):
+    """每个项目 i 有 i 个计划、i 次计时、收入 10*i、支出 i"""
+    account = client.post(
+        f"{BASE_URL}/accounts",
+        json={"name": "项目账户", "type": "asset", "initial_balance": 1000}
+    ).json()
+
+    for i in range(PROJECT_COUNT):
+        project = client.post(f"{BASE_URL}/projects", json={"name": f"项目 {i}"}).json()
+        for j in range(i):
+            plan = client.post(f"{BASE_URL}/plans", json={"title": f"计划 {i}-{j}", "project_id": project["id"]}).json()
+            timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": plan["id"]}).json()
+            client.post(f"{BASE_URL}/timer/{timer['id']}/stop")
+        if i:
+            for type, amount, key in (("income", 10 * i, "to_account_id"), ("expense", i, "from_account_id")):
+                client.post(f"{BASE_URL}/accounting/transactions", json={
+                    "type": type, "amount": amount, key: account["id"],
+                    "project_id": project["id"], "transaction_date": date.today().isoformat()
+                })
+
+
+def fetch(client, params):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        projects = client.get(f"{BASE_URL}/projects", params=params).json()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return projects, len(statements)
+
+
+def test_project_list():
+    print("=" * 60)
+    print("项目列表汇总测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        seed(client)
+
+        projects, queries = fetch(client, {})
+        assert len(projects) == PROJECT_COUNT and queries == 1, f"{queries} 条查询"
+        assert [project["plan_count"] for project in projects] == list(range(PROJECT_COUNT))
+        assert all(project["tracked_seconds"] is None for project in projects)
+        print(f"✓ {PROJECT_COUNT} 个项目及计划数: {queries} 条查询")
+
+        projects, queries = fetch(client, {"include_stats": "true"})
+        assert queries == 1, f"{queries} 条查询"
+        for i, project in enumerate(projects):
+            assert project["plan_count"] == i
+            assert project["tracked_seconds"] is not None
+            assert float(project["total_income"]) == 10 * i
+            assert float(project["total_expense"]) == i
+        print(f"✓ 含计时和收支汇总: {queries} 条查询")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_project_list()
@@ -0,0 +1,89 @@
+"""
+测试统计查询的执行计划 - 每个统计接口的查询都应命中索引
+"""
+import asyncio
+import os
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "query_plans.db")
+
+from sqlalchemy import event
+from app.database import engine, init_db, AsyncSessionLocal
+from app.services.statistics_service import StatisticsService
+
+# 维表数据量很小，允许全表扫描
+SMALL_TABLES = {"accounts", "categories", "projects"}
+
+STATISTICS_METHODS = [
+    "get_overview",
+    "get_time_trend",
+    "get_plan_completion",
+    "get_project_time",
+    "get_focus_trend",
+    "get_heatmap",
+    "get_finance_trend",
+    "get_expense_category",
+    "get_daily_distribution",
+    "get_priority_distribution",
+]
+
+
+async def capture_statements(method_name):
+    """执行统计方法并记录其发出的 SQL"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with AsyncSessionLocal() as db:
+            await getattr(StatisticsService(db), method_name)()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    return statements
+
+
+async def full_scans(statement, parameters):
+    """返回执行计划中未使用索引的大表扫描"""
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[3] for row in result.all()]
+
+    return [
+        detail for detail in details
+        if detail.startswith("SCAN ")
+        and "INDEX" not in detail
+        and detail.split()[1] not in SMALL_TABLES
+    ]
+
+
+async def test_statistics_query_plans():
+    print("=" * 60)
+    print("统计查询执行计划检查")
+    print("=" * 60)
+
+    await init_db()
+
+    failures = 0
+    for method_name in STATISTICS_METHODS:
+        statements = await capture_statements(method_name)
+        scans = []
+        for statement, parameters in statements:
+            scans.extend(await full_scans(statement, parameters))
+
+        if scans:
+            failures += 1
+            print(f"✗ {method_name}: {scans}")
+        else:
+            print(f"✓ {method_name}: {len(statements)} 条查询均使用索引")
+
+    print("\n" + "=" * 60)
+    assert failures == 0, f"{failures} 个统计方法存在全表扫描"
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_statistics_query_plans())
@@ -0,0 +1,123 @@
+"""
+测试余额核对 - 按初始余额和全部交易重算余额，报告并修正偏差，交易表按账户覆盖索引一次汇总
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "reconcile_balances.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import sqlite
+from app.main import app
+from app.services.account_service import AccountService
+
+BASE_URL = "/api/v1"
+BULK_ROWS = 100000
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def bulk_transactions(account_ids):
+    """直接写入大量交易（不经过服务层，余额不变；金额以分存储）"""
+    types = ["income", "expense", "transfer", "repayment"]
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, from_account_id, to_account_id, transaction_date, tags) "
+            "VALUES (?, ?, ?, ?, '2024-06-01', '[]')",
+            (
+                (
+                    types[i % 4],
+                    i % 97 * 100 + 25,
+                    None if types[i % 4] == "income" else account_ids[i % 2],
+                    None if types[i % 4] == "expense" else account_ids[(i + 1) % 2],
+                )
+                for i in range(BULK_ROWS)
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_reconcile_balances():
+    print("=" * 60)
+    print("余额核对测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        bank = client.post(f"{BASE_URL}/accounts", json={
+            "name": "银行卡", "type": "asset", "initial_balance": 1000
+        }).json()
+        card = client.post(f"{BASE_URL}/accounts", json={
+            "name": "信用卡", "type": "liability", "initial_balance": 0
+        }).json()
+        client.post(f"{BASE_URL}/accounts", json={"name": "现金", "type": "asset", "initial_balance": 50})
+
+        for data in (
+            {"type": "income", "amount": 300, "to_account_id": bank["id"]},
+            {"type": "expense", "amount": 120.5, "from_account_id": card["id"]},
+            {"type": "repayment", "amount": 100, "from_account_id": bank["id"], "to_account_id": card["id"]},
+        ):
+            client.post(f"{BASE_URL}/accounting/transactions", json={**data, "transaction_date": "2024-05-01"})
+
+        report = client.get(f"{BASE_URL}/accounts/reconcile").json()
+        assert report["checked"] == 3 and report["drifted"] == [] and report["fixed"] == 0, report
+        print("✓ 通过服务层记账的余额无偏差")
+
+        execute("UPDATE accounts SET balance = balance + 750 WHERE id = ?", (bank["id"],))
+        execute("UPDATE accounts SET balance = 0 WHERE id = ?", (card["id"],))
+        report = client.get(f"{BASE_URL}/accounts/reconcile").json()
+        drifts = {item["account_id"]: item for item in report["drifted"]}
+        assert set(drifts) == {bank["id"], card["id"]}, report
+        assert Decimal(drifts[bank["id"]]["drift"]) == Decimal("7.5")
+        assert Decimal(drifts[bank["id"]]["expected_balance"]) == Decimal("1200")
+        assert Decimal(drifts[card["id"]]["expected_balance"]) == Decimal("-20.5")
+        assert client.get(f"{BASE_URL}/accounts/{card['id']}").json()["balance"] == "0.00"
+        print("✓ 报告每个账户的偏差，不修改余额")
+
+        fixed = client.post(f"{BASE_URL}/accounts/reconcile").json()
+        assert fixed["fixed"] == 2, fixed
+        assert Decimal(client.get(f"{BASE_URL}/accounts/{bank['id']}").json()["balance"]) == Decimal("1200")
+        assert Decimal(client.get(f"{BASE_URL}/accounts/{card['id']}").json()["balance"]) == Decimal("-20.5")
+        assert client.get(f"{BASE_URL}/accounts/reconcile").json()["drifted"] == []
+        print("✓ 修正后余额与交易一致")
+
+        bulk_transactions([bank["id"], card["id"]])
+        started = time.perf_counter()
+        report = client.post(f"{BASE_URL}/accounts/reconcile").json()
+        elapsed = time.perf_counter() - started
+        assert report["fixed"] == 2 and elapsed < 3, (report, elapsed)
+        for account in (bank, card):
+            current = client.get(f"{BASE_URL}/accounts/{account['id']}").json()["balance"]
+            ledger = client.get(f"{BASE_URL}/accounts/{account['id']}/balance").json()["balance"]
+            assert Decimal(current) == Decimal(ledger), (current, ledger)
+        print(f"✓ {BULK_ROWS} 笔交易核对并修正: {elapsed:.2f}s，结果与记账分录一致")
+
+        sql = str(AccountService(None)._expected_balances().compile(
+            dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+        ))
+        details = " ".join(row[-1] for row in execute("EXPLAIN QUERY PLAN " + sql))
+        assert "COVERING INDEX ix_transactions_to_account" in details, details
+        assert "COVERING INDEX ix_transactions_from_account" in details, details
+        print("✓ 转入、转出两侧各按覆盖索引顺序汇总")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_reconcile_balances()
@@ -0,0 +1,161 @@
+"""
+测试交易列表的逐笔余额 - 按账户查询时每行返回该笔交易后的余额，跨游标分页与逐笔回放一致，一条 SQL 按分录索引计算
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "running_balance.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+from app.database import engine
+from app.main import app
+from app.services.accounting_service import AccountingService
+
+BASE_URL = "/api/v1"
+ROWS = 30000
+PAGE_SIZE = 500
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(sql, parameters).fetchall()
+    finally:
+        conn.close()
+
+
+def seed(account_ids):
+    """直接写入交易（记账分录由触发器生成，金额以分存储），同一天多笔，含账户内部转账"""
+    types = ["income", "expense", "transfer", "repayment", "expense"]
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, from_account_id, to_account_id, transaction_date, tags) "
+            "VALUES (?, ?, ?, ?, ?, '[]')",
+            (
+                (
+                    types[i % 5],
+                    i % 300 * 100 + 35,
+                    None if types[i % 5] == "income" else account_ids[i % 2],
+                    None if types[i % 5] == "expense"
+                    else account_ids[0] if i % 50 == 2 else account_ids[(i + 1) % 2],
+                    f"20{20 + i % 5}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                )
+                for i in range(ROWS)
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def replay(account_id, initial_balance):
+    """按 (日期, id) 顺序逐笔回放，得到每笔交易后的余额"""
+    rows = execute(
+        "SELECT id, type, amount, from_account_id, to_account_id FROM transactions "
+        "WHERE from_account_id = ? OR to_account_id = ? ORDER BY transaction_date, id",
+        (account_id, account_id)
+    )
+    balance = Decimal(initial_balance)
+    balances = {}
+    for id, type, amount, from_account_id, to_account_id in rows:
+        amount = Decimal(amount).scaleb(-2)
+        if to_account_id == account_id and type in ("income", "transfer", "repayment"):
+            balance += amount
+        if from_account_id == account_id and type in ("expense", "transfer", "repayment"):
+            balance -= amount
+        balances[id] = balance
+    return balances
+
+
+def walk(client, params):
+    """按游标读完全部分页，返回行和每页的 SQL 条数"""
+    rows = []
+    pages = []
+    cursor = None
+    statements = []
+
+    def on_execute(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        while True:
+            page_params = dict(params, limit=PAGE_SIZE, running_balance=True)
+            if cursor:
+                page_params["cursor"] = cursor
+            before = len(statements)
+            response = client.get(f"{BASE_URL}/accounting/transactions", params=page_params)
+            assert response.status_code == 200, response.text
+            pages.append(len(statements) - before)
+            rows.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return rows, pages
+
+
+def test_running_balance():
+    print("=" * 60)
+    print("逐笔余额测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        bank = client.post(f"{BASE_URL}/accounts", json={
+            "name": "银行卡", "type": "asset", "initial_balance": 1000
+        }).json()
+        card = client.post(f"{BASE_URL}/accounts", json={
+            "name": "信用卡", "type": "liability", "initial_balance": 0
+        }).json()
+        seed([bank["id"], card["id"]])
+        expected = replay(bank["id"], bank["initial_balance"])
+
+        started = time.perf_counter()
+        rows, pages = walk(client, {"account_id": bank["id"]})
+        elapsed = time.perf_counter() - started
+        assert len(rows) == len(expected), (len(rows), len(expected))
+        for row in rows:
+            assert Decimal(row["running_balance"]) == expected[row["id"]], row
+        print(f"✓ {len(rows)} 笔交易跨 {len(pages)} 页的余额与逐笔回放一致: {elapsed:.2f}s")
+
+        assert set(pages) == {1}, pages
+        print("✓ 每页 1 条 SQL")
+
+        ledger = client.get(f"{BASE_URL}/accounts/{bank['id']}/balance").json()["balance"]
+        assert Decimal(rows[0]["running_balance"]) == Decimal(ledger)
+        print("✓ 最新一笔后的余额等于按分录计算的当前余额")
+
+        filtered, _ = walk(client, {"account_id": bank["id"], "type": "transfer", "end_date": "2023-06-30"})
+        assert filtered and all(row["type"] == "transfer" for row in filtered)
+        for row in filtered:
+            assert Decimal(row["running_balance"]) == expected[row["id"]], row
+        print(f"✓ 按类型和日期筛选后 {len(filtered)} 行的余额仍按全部交易计算")
+
+        plain = client.get(f"{BASE_URL}/accounting/transactions", params={"account_id": bank["id"], "limit": 5}).json()
+        assert all(row["running_balance"] is None for row in plain)
+        response = client.get(f"{BASE_URL}/accounting/transactions", params={"running_balance": True})
+        assert response.status_code == 400
+        print("✓ 默认不计算余额，未指定账户时返回 400")
+
+        balances = AccountingService(None)._running_balances(bank["id"])
+        sql = str(balances.select().compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        details = [row[-1] for row in execute("EXPLAIN QUERY PLAN " + sql)]
+        assert any("COVERING INDEX ix_postings_account_order" in detail for detail in details), details
+        assert not any("TEMP B-TREE" in detail for detail in details), details
+        print("✓ 窗口求和按分录覆盖索引顺序读取，无需排序")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_running_balance()
@@ -0,0 +1,168 @@
+"""
+测试启动时的结构升级 - 旧版本数据库缺少的项目计数字段、时间区间索引、全文索引、标签、记账分录和月度收支汇总在启动时补建并回填，每日计时汇总去重，旧分词方式的全文索引重建，已存在时不再重复回填
+"""
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "schema_upgrade.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def downgrade(account_id, project_id):
+    """去掉后来加入的派生对象，并直接写入计划和交易，模拟旧版本创建的数据库"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE plan_intervals")
+        conn.execute("DROP TABLE plans_fts")
+        conn.execute("DROP INDEX ix_postings_account_order")
+        conn.execute("DROP TABLE monthly_finance_summary")
+        conn.execute("ALTER TABLE projects DROP COLUMN plan_total")
+        conn.execute("ALTER TABLE projects DROP COLUMN plan_completed")
+        conn.executemany(
+            "INSERT INTO plans (title, status, priority_matrix, project_id, actual_duration, tags) "
+            "VALUES (?, ?, 'important_urgent', ?, 0, '[]')",
+            [("旧项目计划", "completed", project_id), ("旧项目待办", "pending", project_id)]
+        )
+        conn.execute("DROP INDEX ux_daily_time_rollup_key")
+        conn.execute("CREATE INDEX ix_daily_time_rollup_day_project_plan ON daily_time_rollup (day, project_id, plan_id)")
+        conn.execute(
+            "INSERT INTO timer_sessions (start_time, end_time, duration, interrupt_count) "
+            "VALUES ('2024-05-01 09:00:00', '2024-05-01 09:25:00', 1500, 0)"
+        )
+        # 旧版本删除计划后留下的重复键
+        conn.executemany(
+            "INSERT INTO daily_time_rollup (day, total_duration, session_count, focus_score_sum, "
+            "focus_score_count, interrupt_count) VALUES ('2024-05-01', 1500, 1, 0, 0, 0)",
+            [(), ()]
+        )
+        conn.execute(
+            "INSERT INTO plans (title, status, priority_matrix, start_time, end_time, actual_duration, tags) "
+            "VALUES ('复习线性代数', 'pending', 'important_urgent', '2024-05-01 09:00:00', '2024-05-01 10:00:00', "
+            "0, '[\"复习\"]')"
+        )
+        conn.execute(
+            "INSERT INTO transactions (type, amount, to_account_id, transaction_date, tags) "
+            "VALUES ('income', 10000, ?, '2024-05-01', '[\"工资\"]')",
+            (account_id,)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_schema_upgrade():
+    print("=" * 60)
+    print("启动时结构升级测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        bank = client.post(f"{BASE_URL}/accounts", json={
+            "name": "银行卡", "type": "asset", "initial_balance": 0
+        }).json()
+        project = client.post(f"{BASE_URL}/projects", json={"name": "考研"}).json()
+    downgrade(bank["id"], project["id"])
+    print("✓ 模拟旧版本数据库：无项目计数字段、触发器、区间索引和全文索引")
+
+    with TestClient(app) as client:
+        names = {row[0] for row in execute("SELECT name FROM sqlite_master")}
+        assert {"plan_intervals", "plans_fts", "ix_postings_account_order"} <= names
+        assert {"plans_tags_insert", "transactions_tags_insert", "transactions_postings_insert"} <= names
+
+        project = client.get(f"{BASE_URL}/projects/{project['id']}").json()
+        assert (project["plan_total"], project["plan_completed"]) == (2, 1), project
+        assert client.post(f"{BASE_URL}/plans", json={"title": "新计划", "project_id": project["id"]}).status_code == 201
+        assert client.get(f"{BASE_URL}/projects").json()[0]["plan_total"] == 3
+        print("✓ 补充项目计数字段并按现有计划回填，之后的计划写入继续维护")
+
+        response = client.post(f"{BASE_URL}/plans", json={
+            "title": "冲突", "start_time": "2024-05-01T09:30:00", "end_time": "2024-05-01T10:30:00"
+        })
+        assert response.status_code == 400 and "复习线性代数" in response.json()["detail"], response.text
+        response = client.post(f"{BASE_URL}/plans", json={
+            "title": "不冲突", "start_time": "2024-05-01T10:30:00", "end_time": "2024-05-01T11:00:00"
+        })
+        assert response.status_code == 201, response.text
+        print("✓ 启动后补建时间区间索引，回填已有计划，冲突检测可用")
+
+        found = client.get(f"{BASE_URL}/plans", params={"q": "复习"}).json()
+        assert [plan["title"] for plan in found] == ["复习线性代数"], found
+        print("✓ 全文索引补建并回填已有计划")
+
+        tagged = client.get(f"{BASE_URL}/accounting/transactions", params={"tag": "工资"}).json()
+        assert len(tagged) == 1
+        assert execute("SELECT count(*) FROM plan_tags") == [(1,)]
+        balance = client.get(f"{BASE_URL}/accounts/{bank['id']}/balance").json()["balance"]
+        assert Decimal(balance) == Decimal("100"), balance
+        print("✓ 标签关联和记账分录按已有数据回填")
+
+        month = {"start_date": "2024-05-01", "end_date": "2024-05-31"}
+        summary = client.get(f"{BASE_URL}/accounting/summary", params=month).json()
+        assert Decimal(summary["total_income"]) == Decimal("100"), summary
+        client.post(f"{BASE_URL}/accounting/transactions", json={
+            "type": "expense", "amount": 30, "transaction_date": "2024-05-20", "from_account_id": bank["id"]
+        })
+        summary = client.get(f"{BASE_URL}/accounting/summary", params=month).json()
+        assert Decimal(summary["total_expense"]) == Decimal("30"), summary
+        print("✓ 月度收支汇总补建触发器并回填，整月汇总与之后的写入一致")
+
+        assert "ux_daily_time_rollup_key" in names and "ix_daily_time_rollup_day_project_plan" not in names
+        assert execute("SELECT day, project_id, plan_id, session_count FROM daily_time_rollup") == [
+            ("2024-05-01", None, None, 1)
+        ]
+        print("✓ 每日计时汇总按计时记录重建，去掉重复的键后建唯一索引")
+
+    # 旧版本的全文索引用 unicode61 分词，且尚未写入内容
+    execute("DROP TABLE plans_fts")
+    execute(
+        "CREATE VIRTUAL TABLE plans_fts USING fts5("
+        "title, description, tags, content='plans', content_rowid='id', prefix='2 3')"
+    )
+    with TestClient(app) as client:
+        assert "trigram" in execute("SELECT sql FROM sqlite_master WHERE name = 'plans_fts'")[0][0]
+        found = client.get(f"{BASE_URL}/plans", params={"q": "线性代"}).json()
+        assert [plan["title"] for plan in found] == ["复习线性代数"], found
+    print("✓ 旧分词方式的全文索引按 trigram 重建")
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        with TestClient(app):
+            pass
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    rebuilt = [s for s in statements if s.lstrip().startswith(("CREATE", "DELETE", "INSERT INTO plans_fts"))]
+    assert not rebuilt, rebuilt
+    print("✓ 已是最新结构时启动不再建表或回填")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_schema_upgrade()
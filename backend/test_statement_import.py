@@ -0,0 +1,166 @@
+"""
+测试账单导入 - CSV/OFX/QIF 流式解析、按内容哈希去重、分批写入并一次性调整账户余额
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "statement_import.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+YEAR_ROWS = 10000
+
+CSV = """日期,金额,摘要,分类
+2024-01-03,-35.50,咖啡,餐饮
+2024-01-03,-35.50,咖啡,餐饮
+2024-01-05,8000.00,工资,工资
+2024-01-09,0,预授权,
+"""
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000<TRNAMT>-120.00<FITID>A1<NAME>超市
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240111<TRNAMT>-120.00<FITID>A2<NAME>超市
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKTRANSMSGSRSV1></OFX>
+"""
+
+QIF = """!Type:CCard
+D01/15/2024
+T-299.00
+P网购
+L购物
+^
+D01/20'24
+T500.00
+P还款
+L[储蓄卡]
+^
+"""
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(sql, parameters).fetchall()
+    finally:
+        conn.close()
+
+
+def upload(client, account_id, format, body, **params):
+    return client.post(
+        f"{BASE_URL}/accounting/import",
+        params={"account_id": account_id, "format": format, **params},
+        content=body.encode(params.get("encoding", "utf-8"))
+    )
+
+
+def year_of_statements(rows):
+    """一年的信用卡账单，每天约 27 笔"""
+    start = date(2023, 1, 1)
+    yield "date,amount,description,category\n"
+    for i in range(rows):
+        day = start + timedelta(days=i * 365 // rows)
+        yield f"{day.isoformat()},-{i % 200 + 1}.25,商户 {i},餐饮\n"
+
+
+def test_statement_import():
+    print("=" * 60)
+    print("账单导入测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        savings = client.post(f"{BASE_URL}/accounts", json={
+            "name": "储蓄卡", "type": "asset", "initial_balance": 10000
+        }).json()
+        card = client.post(f"{BASE_URL}/accounts", json={
+            "name": "信用卡", "type": "liability", "initial_balance": 0
+        }).json()
+        food = client.post(f"{BASE_URL}/accounting/categories", json={"name": "餐饮", "type": "expense"}).json()
+        salary = client.post(f"{BASE_URL}/accounting/categories", json={"name": "工资", "type": "income"}).json()
+
+        result = upload(client, savings["id"], "csv", CSV).json()
+        assert (result["imported"], result["duplicates"], result["skipped"]) == (3, 0, 1), result
+        assert Decimal(result["balance_changes"][str(savings["id"])]) == Decimal("7929.00")
+        rows = execute("SELECT type, category_id FROM transactions ORDER BY id")
+        assert rows == [("expense", food["id"]), ("expense", food["id"]), ("income", salary["id"])]
+        print("✓ CSV: 同日相同的两笔都导入，分类按名称匹配，零金额跳过")
+
+        result = upload(client, savings["id"], "csv", CSV).json()
+        assert (result["imported"], result["duplicates"]) == (0, 3), result
+        print("✓ 重复导入同一账单不产生重复交易")
+
+        result = upload(client, card["id"], "ofx", OFX).json()
+        assert result["imported"] == 2, result
+        assert upload(client, card["id"], "ofx", OFX).json()["duplicates"] == 2
+        print("✓ OFX: 按 FITID 去重")
+
+        result = upload(client, card["id"], "qif", QIF).json()
+        assert result["imported"] == 2, result
+        repayment = execute(
+            "SELECT type, from_account_id, to_account_id FROM transactions WHERE description = '还款'"
+        )
+        assert repayment == [("repayment", savings["id"], card["id"])]
+        print("✓ QIF: [账户] 识别为还款")
+
+        for account in (savings, card):
+            current = client.get(f"{BASE_URL}/accounts/{account['id']}").json()["balance"]
+            ledger = client.get(f"{BASE_URL}/accounts/{account['id']}/balance").json()["balance"]
+            assert Decimal(current) == Decimal(ledger), (account["name"], current, ledger)
+        assert Decimal(client.get(f"{BASE_URL}/accounts/{card['id']}").json()["balance"]) == Decimal("-39.00")
+        print("✓ 账户余额与分录一致")
+
+        response = upload(client, card["id"], "csv", "日期,金额\n2024-02-30,-1\n")
+        assert response.status_code == 400 and "Line 2" in response.json()["detail"]
+        response = upload(client, card["id"], "qif", "D01/21/2024\nT-5\nL[不存在]\n^\n")
+        assert response.status_code == 400
+        assert execute("SELECT count(*) FROM transactions")[0][0] == 7
+        assert upload(client, 9999, "csv", CSV).status_code == 404
+        print("✓ 无法解析的行返回 400 且不写入任何交易")
+
+        result = upload(client, savings["id"], "csv", "交易日期,支出,收入,交易对方\n2024-03-01,12.00,,地铁\n", encoding="gbk").json()
+        assert result["imported"] == 1
+        print("✓ GBK 编码、支出/收入分列")
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(executemany)
+
+        body = "".join(year_of_statements(YEAR_ROWS))
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        started = time.perf_counter()
+        try:
+            result = upload(client, card["id"], "csv", body).json()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+        elapsed = time.perf_counter() - started
+        assert result["imported"] == YEAR_ROWS, result
+        assert len(statements) < 100 and sum(statements) == YEAR_ROWS // 500, statements
+        assert elapsed < 30, elapsed
+        print(f"✓ 一年账单 {YEAR_ROWS} 行: {elapsed:.2f}s，{len(statements)} 条语句")
+
+        plan = execute(
+            "EXPLAIN QUERY PLAN SELECT import_hash FROM transactions WHERE import_hash IN ('a', 'b')"
+        )
+        assert any("ux_transactions_import_hash" in row[-1] for row in plan), plan
+        print("✓ 去重查询使用 import_hash 索引")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_statement_import()
@@ -0,0 +1,58 @@
+"""
+测试统计结果缓存 - 写入提交后，依赖被修改表的缓存结果（含过去的日期范围）不再返回旧值
+"""
+import os
+import sqlite3
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "statistics_cache.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+BASE_URL = "/api/v1"
+
+
+def execute(sql, parameters=()):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def completed_on(client, day):
+    trend = client.get(f"{BASE_URL}/statistics/time-trend", params={"start_date": day, "end_date": day}).json()
+    return trend[0]["completed_plans"]
+
+
+def test_statistics_cache():
+    print("=" * 60)
+    print("统计结果缓存测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        plan = client.post(f"{BASE_URL}/plans", json={"title": "已完成的计划", "status": "completed"}).json()
+        execute("UPDATE plans SET updated_at = '2024-01-10 08:00:00' WHERE id = ?", (plan["id"],))
+        assert completed_on(client, "2024-01-10") == 1
+        assert completed_on(client, "2024-01-10") == 1
+        print("✓ 过去日期范围的统计结果被缓存")
+
+        # 停止计时会累加计划的实际时长，updated_at 随之移到今天
+        timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": plan["id"]}).json()
+        execute("UPDATE active_timers SET elapsed = 600 WHERE id = ?", (timer["id"],))
+        assert client.post(f"{BASE_URL}/timer/{timer['id']}/stop").status_code == 200
+        assert execute("SELECT date(updated_at) FROM plans WHERE id = ?", (plan["id"],))[0][0] != "2024-01-10"
+        assert completed_on(client, "2024-01-10") == 0
+        print("✓ 停止计时修改计划后，依赖计划表的缓存结果失效")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_statistics_cache()
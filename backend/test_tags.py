@@ -0,0 +1,114 @@
+"""
+测试标签关联表 - 计划和交易的 tags 变更应同步到关联表，标签筛选和汇总走索引
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import date
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "tags.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+BASE_URL = "/api/v1"
+
+
+def titles(client, **params):
+    plans = client.get(f"{BASE_URL}/plans", params=params).json()
+    return sorted(plan["title"] for plan in plans)
+
+
+def uses_index(sql, parameters=()):
+    """标签筛选子查询不应扫描关联表或交易表"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        details = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, parameters)]
+    finally:
+        conn.close()
+    return not any(
+        detail.startswith("SCAN ") and "INDEX" not in detail
+        for detail in details
+    )
+
+
+def test_tags():
+    print("=" * 60)
+    print("标签关联表测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        work = client.post(f"{BASE_URL}/plans", json={"title": "写报告", "tags": ["工作", "写作"]}).json()
+        client.post(f"{BASE_URL}/plans", json={"title": "读书", "tags": ["写作"]})
+        client.post(f"{BASE_URL}/plans", json={"title": "跑步", "tags": []})
+
+        assert titles(client, tag="写作") == ["写报告", "读书"]
+        assert titles(client, tag=["写作", "工作"]) == ["写报告"]
+        assert titles(client, tag="不存在") == []
+        print("✓ 计划按标签筛选，多个标签须全部匹配")
+
+        client.put(f"{BASE_URL}/plans/{work['id']}", json={"tags": ["生活"]})
+        assert titles(client, tag="工作") == []
+        assert titles(client, tag="生活") == ["写报告"]
+        print("✓ 修改计划标签后关联表同步更新")
+
+        timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": work["id"]}).json()
+        client.post(f"{BASE_URL}/timer/{timer['id']}/stop")
+
+        account = client.post(
+            f"{BASE_URL}/accounts",
+            json={"name": "标签账户", "type": "asset", "initial_balance": 1000}
+        ).json()
+        today = date.today().isoformat()
+        for type, amount, key, tags in (
+            ("income", 300, "to_account_id", ["生活", "副业"]),
+            ("expense", 40, "from_account_id", ["生活"]),
+            ("expense", 15, "from_account_id", []),
+        ):
+            client.post(f"{BASE_URL}/accounting/transactions", json={
+                "type": type, "amount": amount, key: account["id"],
+                "tags": tags, "transaction_date": today
+            })
+
+        transactions = client.get(f"{BASE_URL}/accounting/transactions", params={"tag": "生活"}).json()
+        assert sorted(float(t["amount"]) for t in transactions) == [40, 300]
+        transactions = client.get(f"{BASE_URL}/accounting/transactions", params={"tag": ["生活", "副业"]}).json()
+        assert [float(t["amount"]) for t in transactions] == [300]
+        print("✓ 交易按标签筛选")
+
+        stats = {tag["name"]: tag for tag in client.get(f"{BASE_URL}/tags").json()}
+        assert "工作" not in stats, "不再使用的标签不应出现在汇总中"
+        assert stats["写作"]["plan_count"] == 1 and stats["写作"]["transaction_count"] == 0
+        life = stats["生活"]
+        assert life["plan_count"] == 1 and life["transaction_count"] == 2
+        assert life["tracked_seconds"] >= 0
+        assert float(life["total_income"]) == 300 and float(life["total_expense"]) == 40
+        assert float(stats["副业"]["total_expense"]) == 0
+        print(f"✓ 标签汇总: {len(stats)} 个标签")
+
+        client.delete(f"{BASE_URL}/plans/{work['id']}")
+        stats = {tag["name"]: tag for tag in client.get(f"{BASE_URL}/tags").json()}
+        assert stats["生活"]["plan_count"] == 0
+        print("✓ 删除计划后关联表同步清理")
+
+    assert uses_index(
+        "SELECT plan_tags.plan_id FROM plan_tags JOIN tags ON tags.id = plan_tags.tag_id "
+        "WHERE tags.name IN (?) GROUP BY plan_tags.plan_id",
+        ("生活",)
+    )
+    assert uses_index(
+        "SELECT transaction_tags.transaction_id FROM transaction_tags "
+        "JOIN tags ON tags.id = transaction_tags.tag_id WHERE tags.name IN (?) "
+        "GROUP BY transaction_tags.transaction_id",
+        ("生活",)
+    )
+    print("✓ 标签筛选使用索引")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_tags()
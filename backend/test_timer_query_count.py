@@ -0,0 +1,131 @@
+"""
+测试时间追踪接口的 SQL 查询次数 - 计划信息应随主查询一次取回，不随行数增长
+"""
+import os
+import tempfile
+
+# 使用临时数据库，避免改动 focusflow.db
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "timer_queries.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+BASE_URL = "/api/v1"
+
+PLAN_COUNT = 20
+SESSION_COUNT = 30
+
+# 每个接口允许的最大语句数（与数据量无关）
+QUERY_BUDGETS = {
+    "GET /timer/active": 1,
+    "POST /timer/create": 3,  # 含把已归档计划移回 plans 的一条语句
+    "POST /timer/{id}/start": 2,
+    "POST /timer/{id}/pause": 2,
+    "POST /timer/{id}/stop": 6,
+    "GET /timer/sessions": 1,
+}
+
+
+class QueryCounter:
+    """统计一次请求内发出的 SQL 语句"""
+
+    def __init__(self):
+        self.statements = []
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine.sync_engine, "before_cursor_execute", self.on_execute)
+
+
+def seed(client):
+    """创建项目、计划、计时器和计时会话"""
+    project = client.post(f"{BASE_URL}/projects", json={"name": "查询计数"}).json()
+
+    plan_ids = []
+    for i in range(PLAN_COUNT):
+        plan = client.post(
+            f"{BASE_URL}/plans",
+            json={"title": f"计划 {i}", "description": f"描述 {i}", "project_id": project["id"]}
+        ).json()
+        plan_ids.append(plan["id"])
+
+    for i in range(SESSION_COUNT):
+        timer = client.post(
+            f"{BASE_URL}/timer/create",
+            json={"plan_id": plan_ids[i % PLAN_COUNT]}
+        ).json()
+        client.post(f"{BASE_URL}/timer/{timer['id']}/stop")
+
+    for plan_id in plan_ids:
+        client.post(f"{BASE_URL}/timer/create", json={"plan_id": plan_id})
+
+    return project, plan_ids
+
+
+def test_timer_query_counts():
+    print("=" * 60)
+    print("时间追踪接口查询次数检查")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        project, plan_ids = seed(client)
+        counter = QueryCounter()
+        counts = {}
+
+        with counter:
+            active = client.get(f"{BASE_URL}/timer/active").json()
+        counts["GET /timer/active"] = len(counter.statements)
+        assert len(active) == PLAN_COUNT
+        assert all(timer["planTitle"] and timer["planDescription"] for timer in active)
+
+        with counter:
+            timer = client.post(f"{BASE_URL}/timer/create", json={"plan_id": plan_ids[0]}).json()
+        counts["POST /timer/create"] = len(counter.statements)
+        assert timer["planTitle"] == "计划 0"
+
+        with counter:
+            started = client.post(f"{BASE_URL}/timer/{timer['id']}/start").json()
+        counts["POST /timer/{id}/start"] = len(counter.statements)
+        assert started["isRunning"] and started["planDescription"] == "描述 0"
+
+        with counter:
+            paused = client.post(f"{BASE_URL}/timer/{timer['id']}/pause").json()
+        counts["POST /timer/{id}/pause"] = len(counter.statements)
+        assert not paused["isRunning"] and paused["planTitle"] == "计划 0"
+
+        with counter:
+            session = client.post(f"{BASE_URL}/timer/{timer['id']}/stop").json()
+        counts["POST /timer/{id}/stop"] = len(counter.statements)
+        assert session["plan_title"] == "计划 0"
+        assert session["project_name"] == project["name"]
+
+        with counter:
+            sessions = client.get(f"{BASE_URL}/timer/sessions").json()
+        counts["GET /timer/sessions"] = len(counter.statements)
+        assert len(sessions) == SESSION_COUNT + 1
+        assert all(s["plan_title"] and s["project_name"] == project["name"] for s in sessions)
+
+    failures = 0
+    for endpoint, budget in QUERY_BUDGETS.items():
+        if counts[endpoint] > budget:
+            failures += 1
+            print(f"✗ {endpoint}: {counts[endpoint]} 条语句 (上限 {budget})")
+        else:
+            print(f"✓ {endpoint}: {counts[endpoint]} 条语句")
+
+    print("\n" + "=" * 60)
+    assert failures == 0, f"{failures} 个接口超出查询次数上限"
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_timer_query_counts()
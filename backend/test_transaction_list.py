@@ -0,0 +1,163 @@
+"""
+测试交易列表投影 - 一条联表查询直接生成响应，结果与 ORM + 模型校验一致，游标翻页每页一条 SQL，并报告 1000 行分页的吞吐
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+# 使用临时数据库，避免改动 focusflow.db
+DB_PATH = os.path.join(tempfile.mkdtemp(), "transaction_list.db")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + DB_PATH
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+from app.database import engine, AsyncSessionLocal
+from app.main import app
+from app.models.transaction import Transaction
+from app.schemas.accounting import TransactionResponse
+
+BASE_URL = "/api/v1"
+ROWS = 20000
+PAGE_SIZE = 1000
+
+
+def seed(client):
+    accounts = [
+        client.post(f"{BASE_URL}/accounts", json={"name": f"账户 {i}", "type": "asset", "initial_balance": 0}).json()["id"]
+        for i in range(4)
+    ]
+    categories = [
+        client.post(f"{BASE_URL}/accounting/categories", json={
+            "name": f"分类 {i}", "type": "expense", "icon": "tag", "color": "#123456"
+        }).json()["id"]
+        for i in range(5)
+    ]
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category_id, from_account_id, to_account_id, "
+            "transaction_date, description, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    "transfer" if i % 7 == 0 else "expense",
+                    i % 500 * 100 + 50,
+                    None if i % 7 == 0 else categories[i % 5],
+                    accounts[i % 4],
+                    accounts[(i + 1) % 4] if i % 7 == 0 else None,
+                    f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                    f"交易 {i}",
+                    '["标签"]' if i % 3 == 0 else "[]"
+                )
+                for i in range(ROWS)
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return accounts
+
+
+def orm_page(params):
+    """原实现：实体查询 + 三次 selectinload + 逐行复制名称 + 模型校验"""
+    async def run():
+        async with AsyncSessionLocal() as db:
+            query = select(Transaction).options(
+                selectinload(Transaction.category),
+                selectinload(Transaction.from_account),
+                selectinload(Transaction.to_account)
+            )
+            if "account_id" in params:
+                query = query.where(
+                    (Transaction.from_account_id == params["account_id"]) |
+                    (Transaction.to_account_id == params["account_id"])
+                )
+            query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+            result = await db.execute(query.offset(params["offset"]).limit(PAGE_SIZE))
+            rows = []
+            for transaction in result.scalars().all():
+                if transaction.category:
+                    transaction.category_name = transaction.category.name
+                    transaction.category_icon = transaction.category.icon
+                    transaction.category_color = transaction.category.color
+                if transaction.from_account:
+                    transaction.from_account_name = transaction.from_account.name
+                if transaction.to_account:
+                    transaction.to_account_name = transaction.to_account.name
+                rows.append(TransactionResponse.model_validate(transaction).model_dump(mode="json"))
+            return rows
+    return run
+
+
+def walk(client, params):
+    """按游标读完全部分页，返回行、SQL 条数和耗时"""
+    rows = []
+    pages = []
+    cursor = None
+    statements = []
+
+    def on_execute(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    started = time.perf_counter()
+    try:
+        while True:
+            page_params = dict(params, limit=PAGE_SIZE)
+            if cursor:
+                page_params["cursor"] = cursor
+            response = client.get(f"{BASE_URL}/accounting/transactions", params=page_params)
+            assert response.status_code == 200, response.text
+            pages.append(len(statements))
+            rows.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return rows, pages, time.perf_counter() - started
+
+
+def test_transaction_list():
+    print("=" * 60)
+    print("交易列表投影测试")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        accounts = seed(client)
+
+        rows, pages, elapsed = walk(client, {})
+        assert len(rows) == ROWS
+        assert pages == list(range(1, ROWS // PAGE_SIZE + 1)), pages
+        print(f"✓ 按 X-Next-Cursor 游标翻页，每页 1 条 SQL，{len(pages)} 页共 {ROWS} 行")
+
+        started = time.perf_counter()
+        expected = []
+        for offset in range(0, ROWS, PAGE_SIZE):
+            expected.extend(client.portal.call(orm_page({"offset": offset})))
+        orm_elapsed = time.perf_counter() - started
+        assert rows == expected
+        print("✓ 响应与原 ORM + 模型校验的结果逐行一致")
+
+        rate, orm_rate = ROWS / elapsed, ROWS / orm_elapsed
+        # 耗时随机器负载波动，只作参考，不做断言
+        print(f"✓ 1000 行分页吞吐: {rate:,.0f} 行/秒（原实现 {orm_rate:,.0f} 行/秒，{rate / orm_rate:.1f}x）")
+
+        account_rows, _, _ = walk(client, {"account_id": accounts[1]})
+        expected = []
+        for offset in range(0, ROWS, PAGE_SIZE):
+            page = client.portal.call(orm_page({"offset": offset, "account_id": accounts[1]}))
+            if not page:
+                break
+            expected.extend(page)
+        assert account_rows == expected and account_rows
+        print(f"✓ 按账户筛选 {len(account_rows)} 行一致")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+
+
+if __name__ == "__main__":
+    test_transaction_list()
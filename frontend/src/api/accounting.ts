@@ -1,5 +1,5 @@
 import api from './index'
-import type { Transaction, Category, FinanceSummary } from '@/types'
+import type { Transaction, Category, FinanceSummary, ImportResult } from '@/types'
 
 export interface TransactionCreate {
   type: 'income' | 'expense'
@@ -37,6 +37,8 @@ export const accountingApi = {
     account_id?: number
     start_date?: string
     end_date?: string
+    tag?: string[]
+    running_balance?: boolean
   }) =>
     api.get<Transaction[]>('/accounting/transactions', { params }),
 
@@ -52,6 +54,13 @@ export const accountingApi = {
   deleteTransaction: (id: number) =>
     api.delete(`/accounting/transactions/${id}`),
 
+  // Statement import: the file is sent as the raw request body
+  importStatement: (accountId: number, file: File, format: 'csv' | 'ofx' | 'qif', encoding?: string) =>
+    api.post<ImportResult>('/accounting/import', file, {
+      params: { account_id: accountId, format, encoding },
+      headers: { 'Content-Type': 'application/octet-stream' }
+    }),
+
   // Summary
   getSummary: (params?: { start_date?: string; end_date?: string }) =>
     api.get<FinanceSummary>('/accounting/summary', { params })
@@ -25,5 +25,21 @@ export const accountApi = {
   
   // 删除账户
   delete: (id: number) => 
-    axios.delete(`${API_BASE}/accounts/${id}`)
+    axios.delete(`${API_BASE}/accounts/${id}`),
+  
+  // 获取账户在某日的余额
+  getBalanceAt: (id: number, at?: string) => 
+    axios.get(`${API_BASE}/accounts/${id}/balance`, { params: { at } }),
+  
+  // 获取账户余额走势
+  getBalanceHistory: (id: number, params: { start_date: string; end_date?: string; interval?: 'month' | 'day' }) => 
+    axios.get(`${API_BASE}/accounts/${id}/balance-history`, { params }),
+  
+  // 核对账户余额（fix 为 true 时修正偏差）
+  reconcile: (fix = false) => 
+    fix ? axios.post(`${API_BASE}/accounts/reconcile`) : axios.get(`${API_BASE}/accounts/reconcile`),
+  
+  // 获取净资产走势
+  getNetWorth: (params: { start_date: string; end_date?: string; interval?: 'month' | 'day' }) => 
+    axios.get(`${API_BASE}/accounts/net-worth`, { params })
 }
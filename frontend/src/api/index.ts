@@ -7,7 +7,9 @@ const api = axios.create({
   headers: {
     'Content-Type': 'application/json'
   },
-  timeout: 10000
+  timeout: 10000,
+  // Repeat array params (tag=a&tag=b) the way FastAPI reads List query params
+  paramsSerializer: { indexes: null }
 })
 
 // Request interceptor
@@ -1,14 +1,14 @@
 import api from './index'
-import type { Plan, PlanCreate } from '@/types'
+import type { Plan, PlanCreate, PlanTree, PlanBulk, PlanBulkResult } from '@/types'
 
 export const planApi = {
   // Get all plans
-  getAll: (params?: { project_id?: number; status?: string; priority?: string }) =>
+  getAll: (params?: { project_id?: number; status?: string; priority?: string; q?: string; tag?: string[] }) =>
     api.get<Plan[]>('/plans', { params }),
 
   // Get plan tree
-  getTree: (project_id?: number) =>
-    api.get<Plan[]>('/plans/tree', { params: { project_id } }),
+  getTree: (project_id?: number, max_depth?: number) =>
+    api.get<PlanTree[]>('/plans/tree', { params: { project_id, max_depth } }),
 
   // Get plan by ID
   getById: (id: number) =>
@@ -26,6 +26,10 @@ export const planApi = {
   delete: (id: number) =>
     api.delete(`/plans/${id}`),
 
+  // Create, update and delete many plans in one transaction
+  bulk: (data: PlanBulk) =>
+    api.post<PlanBulkResult>('/plans/bulk', data),
+
   // Update plan status
   updateStatus: (id: number, status: string) =>
     api.patch(`/plans/${id}/status`, null, { params: { status } })
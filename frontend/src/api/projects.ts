@@ -3,8 +3,8 @@ import type { Project, ProjectCreate } from '@/types'
 
 export const projectApi = {
   // Get all projects
-  getAll: () =>
-    api.get<Project[]>('/projects'),
+  getAll: (params?: { include_stats?: boolean }) =>
+    api.get<Project[]>('/projects', { params }),
 
   // Get project by ID
   getById: (id: number) =>
@@ -0,0 +1,8 @@
+import api from './index'
+import type { TagStats } from '@/types'
+
+export const tagApi = {
+  // Get tags in use with plan/transaction counts, tracked time and income/expense
+  getStats: () =>
+    api.get<TagStats[]>('/tags')
+}
@@ -72,6 +72,7 @@ export const useAccountingStore = defineStore('accounting', () => {
     account_id?: number
     start_date?: string
     end_date?: string
+    running_balance?: boolean
   }) => {
     loading.value = true
     try {
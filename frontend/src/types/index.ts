@@ -14,10 +14,33 @@ export interface Plan {
   actual_duration: number
   tags: string[]
   children_count: number
+  snippet?: string
   created_at: string
   updated_at: string
 }
 
+export interface PlanTree extends Plan {
+  children: PlanTree[]
+}
+
+export interface PlanBulk {
+  create?: PlanCreate[]
+  update?: {
+    ids: number[]
+    project_id?: number
+    priority_matrix?: string
+    status?: string
+    tags?: string[]
+  }[]
+  delete?: number[]
+}
+
+export interface PlanBulkResult {
+  created: Plan[]
+  updated: number
+  deleted: number
+}
+
 export interface PlanCreate {
   title: string
   description?: string
@@ -43,6 +66,11 @@ export interface Project {
   end_date?: string
   progress: number
   plan_count: number
+  plan_total: number
+  plan_completed: number
+  tracked_seconds?: number
+  total_income?: number
+  total_expense?: number
   created_at: string
   updated_at: string
 }
@@ -103,6 +131,7 @@ export interface Transaction {
   to_account_id?: number
   from_account_name?: string
   to_account_name?: string
+  running_balance?: number
   plan_id?: number
   project_id?: number
   transaction_date: string
@@ -119,6 +148,25 @@ export interface FinanceSummary {
   period: string
 }
 
+export interface ImportResult {
+  imported: number
+  duplicates: number
+  skipped: number
+  balance_changes: Record<number, number>
+}
+
+export interface BalancePoint {
+  date: string
+  balance: number
+}
+
+export interface NetWorthPoint {
+  date: string
+  total_assets: number
+  total_liabilities: number
+  net_worth: number
+}
+
 // Statistics types
 export interface ProjectStats {
   id: number
@@ -128,6 +176,16 @@ export interface ProjectStats {
   session_count: number
 }
 
+export interface TagStats {
+  id: number
+  name: string
+  plan_count: number
+  transaction_count: number
+  tracked_seconds: number
+  total_income: number
+  total_expense: number
+}
+
 export interface HeatmapData {
   date: string
   duration: number